@@ -4,10 +4,18 @@ College Mess Attendance Predictor - Streamlit App
 
 import streamlit as st
 import pandas as pd
-import numpy as np
-import pickle
 from datetime import datetime, timedelta
 
+import predictor
+from drift_monitor import DriftMonitor, DriftReference
+from feature_store import OnlineFeatureStore
+from forecast_table import ForecastTable, table_version
+from metrics import METRICS
+from menu_planner import FATIGUE_WINDOW, OBJECTIVES, forecast_objective, plan_week
+from model_registry import DEFAULT_MESS, ModelRegistry, history_file
+from prediction_cache import PredictionCache, make_key
+from trends_cube import TrendsCube, cube_version
+
 # Page config
 st.set_page_config(
     page_title="Mess Attendance Predictor",
@@ -15,32 +23,109 @@ st.set_page_config(
     layout="wide"
 )
 
-# Load artifacts
+# Diagnostics (sidebar toggle, read before any work so this rerun is timed too).
+# Collection is process-wide; METRICS stays off, and near free, until someone turns it on.
+if st.session_state.get('diagnostics'):
+    METRICS.enable()
+
+# One model bundle per mess, shared by every session. Bundles load on first use and the
+# least recently used are evicted past the memory budget; each get() checks the manifest
+# version, so a rebuilt bundle is picked up on the next rerun.
+@st.cache_resource
+def load_model_registry():
+    return ModelRegistry()
+
+registry = load_model_registry()
+
+# Sidebar inputs
+st.sidebar.header("📋 Input Parameters")
+
+mess_ids = registry.mess_ids()
+mess_id = st.sidebar.selectbox("Mess", mess_ids) if len(mess_ids) > 1 else DEFAULT_MESS
+
+try:
+    with METRICS.span('load_artifacts'):
+        bundle = registry.get(mess_id)
+except Exception as e:
+    st.error(f"Error: {str(e)}")
+    bundle = None
+
+# Capacity, costs and menu of the selected mess (defaults when its bundle has none)
+mess = predictor.mess_params(None if bundle is None else bundle.params)
+menu_items = mess['menu_items']
+if bundle is not None:
+    encoders, feature_names = bundle.encoders, bundle.feature_names
+
+# Predictions shared by every session. Keys embed the bundle version, so messes share the
+# cache; it is cleared only when some mess's bundle changes.
 @st.cache_resource
-def load_artifacts():
+def load_prediction_cache():
+    return PredictionCache()
+
+prediction_cache = load_prediction_cache()
+prediction_cache.bind(tuple(registry.versions().items()))
+
+# Nightly precomputed forecasts (forecast_table.py). Keyed on the file's mtime, and ignored
+# unless it was built from the loaded bundle, so a stale table never serves predictions.
+@st.cache_resource(max_entries=1)
+def load_forecast_table(version):
+    if version is None:
+        return None
     try:
-        with open('models/best_model.pkl', 'rb') as f:
-            model = pickle.load(f)
-        with open('models/scaler.pkl', 'rb') as f:
-            scaler = pickle.load(f)
-        with open('models/label_encoders.pkl', 'rb') as f:
-            encoders = pickle.load(f)
-        with open('models/feature_names.pkl', 'rb') as f:
-            feature_names = pickle.load(f)
-        return model, scaler, encoders, feature_names
+        return ForecastTable.load()
     except Exception as e:
-        st.error(f"Error: {str(e)}")
-        return None, None, None, None
+        st.warning(f"Could not read the forecast table, predicting live: {str(e)}")
+        return None
 
-model, scaler, encoders, feature_names = load_artifacts()
+forecast_table = load_forecast_table(table_version())
+if forecast_table is not None and (bundle is None or forecast_table.bundle_version != bundle.version):
+    forecast_table = None
+
+# Recent actuals for lag/rolling features, per mess (built on first prediction)
+@st.cache_resource
+def load_feature_store(mess_id):
+    try:
+        history = pd.read_csv(history_file(mess_id), parse_dates=['date'])
+        return OnlineFeatureStore.from_history(history)
+    except Exception as e:
+        st.warning(f"No attendance history, using approximate lag features: {str(e)}")
+        return None
+
+# Live inputs vs. the training data, per mess bundle (reference built on first prediction)
+@st.cache_resource
+def load_drift_monitor(mess_id, version, _bundle):
+    try:
+        history = pd.read_csv(history_file(mess_id), parse_dates=['date'])
+        return DriftMonitor(DriftReference.from_bundle(_bundle, history))
+    except Exception as e:
+        st.warning(f"Drift monitoring unavailable: {str(e)}")
+        return None
+
+# Historical trends cube (trends_cube.py), keyed on the file's mtime. A mess missing from
+# the file gets a cube built from its own history instead.
+@st.cache_resource(max_entries=1)
+def load_trends_cube(version):
+    if version is None:
+        return None
+    try:
+        return TrendsCube.load()
+    except Exception as e:
+        st.warning(f"Could not read the trends cube: {str(e)}")
+        return None
+
+@st.cache_resource
+def build_trends_cube(mess_id):
+    try:
+        history = pd.read_csv(history_file(mess_id))
+        return TrendsCube.from_history(history.assign(campus_id=mess_id))
+    except Exception as e:
+        st.warning(f"No attendance history for trends: {str(e)}")
+        return None
 
 # Header
 st.title("🍽️ College Mess Attendance Predictor")
 st.markdown("AI-powered system to optimize food preparation and reduce waste")
 
-# Sidebar inputs
-st.sidebar.header("📋 Input Parameters")
-
 prediction_date = st.sidebar.date_input(
     "Date",
     value=datetime.today() + timedelta(days=1)
@@ -51,23 +136,9 @@ meal_type = st.sidebar.selectbox(
     ['Breakfast', 'Lunch', 'Dinner']
 )
 
-menu_items = {
-    'Breakfast': ['Idli-Sambar', 'Poha', 'Upma', 'Dosa', 'Paratha-Curry', 'Bread-Omelette', 'Puri-Bhaji'],
-    'Lunch': ['Rice-Dal-Sabzi', 'Roti-Paneer', 'Biryani', 'Rice-Sambar', 'Chole-Bhature', 'Fried Rice', 'Pulao'],
-    'Dinner': ['Roti-Dal', 'Rice-Rajma', 'Paratha-Paneer', 'Rice-Curd-Pickle', 'Noodles', 'Rice-Chicken', 'Khichdi']
-}
-
 menu_item = st.sidebar.selectbox("Menu Item", menu_items[meal_type])
 
-menu_popularity_map = {
-    'Biryani': 4.8, 'Chole-Bhature': 4.5, 'Dosa': 4.6, 'Rice-Chicken': 4.7,
-    'Puri-Bhaji': 4.3, 'Fried Rice': 4.2, 'Roti-Paneer': 4.0, 'Paratha-Paneer': 4.1,
-    'Noodles': 4.2, 'Idli-Sambar': 3.9, 'Poha': 3.7, 'Upma': 3.5,
-    'Rice-Dal-Sabzi': 3.4, 'Roti-Dal': 3.3, 'Rice-Rajma': 3.8, 'Rice-Sambar': 3.6,
-    'Rice-Curd-Pickle': 3.2, 'Khichdi': 3.0, 'Bread-Omelette': 3.9, 'Paratha-Curry': 3.7, 'Pulao': 4.0
-}
-
-weather = st.sidebar.selectbox("Weather", ['Sunny', 'Cloudy', 'Rainy'])
+weather = st.sidebar.selectbox("Weather", predictor.WEATHER_TYPES)
 temperature = st.sidebar.slider("Temperature (°C)", 15, 40, 28)
 
 st.sidebar.markdown("---")
@@ -77,153 +148,61 @@ is_start_sem = st.sidebar.checkbox("Start of Semester")
 
 # Feature preparation
 def prepare_features(date, meal_type, menu_item, weather, temperature, is_exam, is_festival, is_start_sem):
-    
-    # Date features
-    year = date.year
-    month = date.month
-    day = date.day
-    day_of_week_num = date.weekday()
-    week_of_year = date.isocalendar()[1]
-    
-    is_weekend = 1 if day_of_week_num >= 5 else 0
-    is_monday = 1 if day_of_week_num == 0 else 0
-    is_friday = 1 if day_of_week_num == 4 else 0
-    is_monsoon = 1 if month in [6, 7, 8, 9] else 0
-    is_end_semester = 0
-    
-    # Cyclical encoding
-    day_sin = np.sin(2 * np.pi * day / 31)
-    day_cos = np.cos(2 * np.pi * day / 31)
-    month_sin = np.sin(2 * np.pi * month / 12)
-    month_cos = np.cos(2 * np.pi * month / 12)
-    dow_sin = np.sin(2 * np.pi * day_of_week_num / 7)
-    dow_cos = np.cos(2 * np.pi * day_of_week_num / 7)
-    
-    # Encode categorical
-    meal_encoded = encoders['meal'].transform([meal_type])[0]
-    weather_encoded = encoders['weather'].transform([weather])[0]
-    
-    # Menu features
-    menu_popularity = menu_popularity_map.get(menu_item, 3.5)
-    menu_historical_avg = 400 if menu_popularity > 4.0 else 350
-    menu_historical_std = 50
-    is_popular_menu = 1 if menu_popularity >= 4.3 else 0
-    is_unpopular_menu = 1 if menu_popularity <= 3.3 else 0
-    menu_count_last_7days = 1
-    
-    # Lag features (approximated - in production, use real historical data)
-    students_lag_1 = 440
-    students_lag_7 = 435
-    students_lag_14 = 430
-    waste_lag_1 = 15
-    waste_lag_7 = 16
-    waste_lag_14 = 15
-    students_same_day_last_week = 438
-    
-    # Rolling features (approximated)
-    students_roll_3d_mean = 440
-    students_roll_3d_std = 20
-    students_roll_7d_mean = 438
-    students_roll_7d_std = 25
-    students_roll_14d_mean = 435
-    students_roll_14d_std = 28
-    students_roll_7d_max = 480
-    students_roll_7d_min = 400
-    
-    # Other features
-    temp_deviation = temperature - 28
-    
-    # Interaction features
-    weekend_x_exam = is_weekend * is_exam
-    weekend_x_festival = is_weekend * is_festival
-    rainy_x_weekend = (1 if weather == 'Rainy' else 0) * is_weekend
-    exam_x_festival = is_exam * is_festival
-    popularity_x_weekend = menu_popularity * is_weekend
-    temp_x_rainy = temperature * (1 if weather == 'Rainy' else 0)
-    
-    # Special conditions
-    special_conditions_count = is_exam + is_festival + is_weekend + is_start_sem
-    has_special_condition = 1 if special_conditions_count > 0 else 0
-    is_normal_day = 1 if special_conditions_count == 0 else 0
-    
-    # Create features dictionary in EXACT order from feature_names
-    features = {
-        'serving_duration_mins': 60,  # Not used in prediction, but model expects it
-        'is_end_semester': is_end_semester,
-        'month_cos': month_cos,
-        'weekend_x_festival': weekend_x_festival,
-        'month_sin': month_sin,
-        'is_unpopular_menu': is_unpopular_menu,
-        'students_roll_7d_mean': students_roll_7d_mean,
-        'exam_x_festival': exam_x_festival,
-        'total_capacity': 800,  # Not used in prediction, but model expects it
-        'students_lag_7': students_lag_7,
-        'is_monsoon': is_monsoon,
-        'students_roll_3d_mean': students_roll_3d_mean,
-        'is_normal_day': is_normal_day,
-        'meal_encoded': meal_encoded,
-        'day_sin': day_sin,
-        'menu_historical_std': menu_historical_std,
-        'students_roll_3d_std': students_roll_3d_std,
-        'is_monday': is_monday,
-        'waste_lag_14': waste_lag_14,
-        'student_satisfaction': 4.0,  # Not used in prediction, but model expects it
-        'popularity_x_weekend': popularity_x_weekend,
-        'waste_lag_7': waste_lag_7,
-        'menu_historical_avg': menu_historical_avg,
-        'weather_encoded': weather_encoded,
-        'is_friday': is_friday,
-        'is_festival': is_festival,
-        'temp_deviation': temp_deviation,
-        'cost_per_kg_rs': 100,  # Not used in prediction, but model expects it
-        'students_roll_7d_max': students_roll_7d_max,
-        'students_lag_1': students_lag_1,
-        'week_of_year': week_of_year,
-        'weekend_x_exam': weekend_x_exam,
-        'students_same_day_last_week': students_same_day_last_week,
-        'temperature_c': temperature,
-        'day_of_week_num': day_of_week_num,
-        'is_weekend': is_weekend,
-        'day': day,
-        'rainy_x_weekend': rainy_x_weekend,
-        'is_start_semester': is_start_sem,
-        'students_roll_7d_std': students_roll_7d_std,
-        'has_special_condition': has_special_condition,
-        'month': month,
-        'menu_count_last_7days': menu_count_last_7days,
-        'is_popular_menu': is_popular_menu,
-        'students_roll_14d_std': students_roll_14d_std,
-        'year': year,
-        'dow_sin': dow_sin,
-        'special_conditions_count': special_conditions_count,
-        'menu_popularity': menu_popularity,
-        'dow_cos': dow_cos,
-        'students_roll_7d_min': students_roll_7d_min,
-        'waste_lag_1': waste_lag_1,
-        'temp_x_rainy': temp_x_rainy,
-        'day_cos': day_cos,
-        'is_exam_period': is_exam,
-        'students_lag_14': students_lag_14,
-        'staff_count': 10,  # Not used in prediction, but model expects it
-        'students_roll_14d_mean': students_roll_14d_mean
-    }
-    
-    return pd.DataFrame([features])[feature_names]  # Ensure correct order
+    history = None
+    feature_store = load_feature_store(mess_id)
+    if feature_store is not None:
+        history = feature_store.lookup_batch([meal_type], [date.strftime('%A')])
+    return predictor.prepare_features_batch(
+        [date], [meal_type], [menu_item], [weather], [temperature],
+        [is_exam], [is_festival], [is_start_sem], encoders, feature_names,
+        history=history, params=mess
+    )
 
 # Predict button
 if st.sidebar.button("🔮 Predict Attendance", type="primary"):
-    if model is None:
+    METRICS.increment('requests_total', kind='predict')
+    if bundle is None:
+        METRICS.increment('errors_total', kind='predict')
         st.error("Model not loaded")
     else:
         with st.spinner("Predicting..."):
-            features_df = prepare_features(
-                prediction_date, meal_type, menu_item, weather,
-                temperature, is_exam, is_festival, is_start_sem
-            )
+            def predict():
+                engine = bundle.engine  # scaler folded into the trees
+                features_df = prepare_features(
+                    prediction_date, meal_type, menu_item, weather,
+                    temperature, is_exam, is_festival, is_start_sem
+                )
+                prediction = int(predictor.predict_batch(engine, None, features_df, mess['total_capacity'])[0])
+                return prediction, features_df.to_numpy(dtype=float)
             
-            features_scaled = scaler.transform(features_df)
-            prediction = model.predict(features_scaled)[0]
-            prediction = max(0, min(800, int(round(prediction))))
+            cell = None
+            if forecast_table is not None:
+                cell = forecast_table.lookup(prediction_date, meal_type, menu_item, weather,
+                                             temperature, is_exam, is_festival, is_start_sem)
+                METRICS.increment('forecast_table_total', kind='predict', result='miss' if cell is None else 'hit')
+            drift_monitor = load_drift_monitor(mess_id, bundle.version, bundle)
+            if cell is not None:
+                prediction = cell[0]
+                # The table skips the feature build, but the monitor must still see the request
+                if drift_monitor is not None:
+                    drift_monitor.observe(prepare_features(
+                        prediction_date, meal_type, menu_item, weather,
+                        temperature, is_exam, is_festival, is_start_sem
+                    ))
+            else:
+                feature_store = load_feature_store(mess_id)
+                key = make_key(
+                    bundle.version, prediction_date, meal_type, menu_item, weather,
+                    temperature, is_exam, is_festival, is_start_sem,
+                    history_token=None if feature_store is None else feature_store.last_date
+                )
+                try:
+                    prediction, features = prediction_cache.get_or_compute(key, predict)
+                except Exception:
+                    METRICS.increment('errors_total', kind='predict')
+                    raise
+                if drift_monitor is not None:
+                    drift_monitor.observe(features)
             
             # Results
             st.markdown("---")
@@ -234,20 +213,22 @@ if st.sidebar.button("🔮 Predict Attendance", type="primary"):
             with col1:
                 st.metric("👥 Expected Attendance", f"{prediction} students")
             
+            food_needed, cost = predictor.food_and_cost(prediction, mess)
+            
             with col2:
-                food_needed = prediction * 0.35 * 1.1
                 st.metric("🍚 Food Required", f"{food_needed:.1f} kg")
             
             with col3:
-                cost = food_needed * 100
                 st.metric("💰 Estimated Cost", f"₹{cost:,.0f}")
             
             # Recommendations
             st.markdown("### 💡 Recommendations")
             
-            if prediction < 350:
+            # Thresholds for an 800-seat mess, scaled to this one
+            size = mess['total_capacity'] / predictor.TOTAL_CAPACITY
+            if prediction < 350 * size:
                 st.warning("⚠️ Low attendance expected. Reduce preparation.")
-            elif prediction > 550:
+            elif prediction > 550 * size:
                 st.success("✅ High attendance expected. Ensure adequate supplies.")
             
             if is_exam:
@@ -257,5 +238,303 @@ if st.sidebar.button("🔮 Predict Attendance", type="primary"):
             if weather == 'Rainy':
                 st.info("🌧️ Rainy weather: Attendance typically higher.")
 
+# Forecast view
+st.sidebar.markdown("---")
+forecast_days = st.sidebar.number_input("Forecast Horizon (days)", min_value=1, max_value=30, value=7)
+
+if st.sidebar.button(f"📅 Forecast Next {forecast_days} Days"):
+    METRICS.increment('requests_total', kind='forecast')
+    if bundle is None:
+        METRICS.increment('errors_total', kind='forecast')
+        st.error("Model not loaded")
+    else:
+        with st.spinner("Forecasting..."):
+            import plotly.express as px
+
+            # Precomputed cells when the whole horizon is in the table, else one predict call
+            forecast_df = None
+            if forecast_table is not None:
+                forecast_df = forecast_table.scheduled(prediction_date, forecast_days, weather, temperature,
+                                                       is_exam, is_festival, is_start_sem)
+                METRICS.increment('forecast_table_total', kind='forecast',
+                                  result='miss' if forecast_df is None else 'hit')
+            if forecast_df is None:
+                try:
+                    forecast_df = predictor.forecast(
+                        bundle.engine, None, encoders, feature_names,
+                        prediction_date, forecast_days,
+                        weather=weather, temperature=temperature,
+                        is_exam=is_exam, is_festival=is_festival, is_start_sem=is_start_sem,
+                        feature_store=load_feature_store(mess_id), params=mess
+                    )
+                except Exception:
+                    METRICS.increment('errors_total', kind='forecast')
+                    raise
+                source = "live prediction"
+            else:
+                source = f"nightly forecast table ({forecast_table.metadata['generated_at']})"
+            
+            st.markdown("---")
+            st.markdown(f"## 📅 {forecast_days}-Day Forecast")
+            st.caption(f"Menu from the weekly rotation; weather, temperature and flags from the sidebar. "
+                       f"Served from the {source}.")
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.metric("👥 Total Meals Served", f"{forecast_df['predicted_students'].sum():,}")
+            
+            with col2:
+                st.metric("🍚 Total Food Required", f"{forecast_df['food_kg'].sum():,.1f} kg")
+            
+            with col3:
+                st.metric("💰 Total Estimated Cost", f"₹{forecast_df['cost_rs'].sum():,.0f}")
+            
+            fig = px.bar(
+                forecast_df, x='date', y='predicted_students', color='meal_type',
+                barmode='group', hover_data=['menu_item'],
+                labels={'predicted_students': 'Expected Attendance', 'date': 'Date', 'meal_type': 'Meal'}
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            
+            st.dataframe(
+                forecast_df.assign(date=forecast_df['date'].dt.date).round({'food_kg': 1, 'cost_rs': 0}),
+                use_container_width=True, hide_index=True
+            )
+
+# What-if sweep view
+if st.sidebar.button("🧪 What-If Sweep"):
+    METRICS.increment('requests_total', kind='sweep')
+    if bundle is None:
+        METRICS.increment('errors_total', kind='sweep')
+        st.error("Model not loaded")
+    else:
+        with st.spinner("Sweeping scenarios..."):
+            import plotly.express as px
+
+            # Every weather x temperature x flag scenario for each of the meal's items, in one predict call
+            try:
+                sweep_df = predictor.scenario_sweep(
+                    bundle.engine, None, encoders, feature_names, prediction_date, meal_type,
+                    menu_items[meal_type], feature_store=load_feature_store(mess_id), params=mess
+                )
+            except Exception:
+                METRICS.increment('errors_total', kind='sweep')
+                raise
+            
+            st.markdown("---")
+            st.markdown(f"## 🧪 What-If Sweep: {menu_item} ({meal_type}, {prediction_date:%a %d %b})")
+            st.caption(f"{len(sweep_df):,} scenarios predicted in one call.")
+            
+            weathers, temperatures = predictor.WEATHER_TYPES, predictor.SWEEP_TEMPERATURES
+            flag_labels = {'is_exam': 'Exam', 'is_festival': 'Festival', 'is_start_sem': 'Semester start'}
+            combos = sweep_df[predictor.SWEEP_FLAGS].drop_duplicates()
+            combo_names = [' + '.join(flag_labels[f] for f in predictor.SWEEP_FLAGS if row[f]) or 'No events'
+                           for _, row in combos.iterrows()]
+            item_df = sweep_df[sweep_df['menu_item'] == menu_item]
+            
+            def flag_heatmap(column, label):
+                # (weather, temperature, flags...) -> (flag combination, weather, temperature)
+                values = item_df[column].to_numpy().reshape(len(weathers), len(temperatures), len(combos))
+                fig = px.imshow(
+                    values.transpose(2, 0, 1), x=temperatures, y=weathers, facet_col=0, facet_col_wrap=4,
+                    aspect='auto', color_continuous_scale='Viridis',
+                    labels={'x': 'Temperature (°C)', 'y': 'Weather', 'color': label}
+                )
+                fig.for_each_annotation(lambda a: a.update(text=combo_names[int(a.text.split('=')[1])]))
+                return fig
+            
+            tab1, tab2, tab3 = st.tabs(["👥 Attendance", "🍚 Food Required", "🍽️ Menu Items"])
+            
+            with tab1:
+                st.plotly_chart(flag_heatmap('predicted_students', 'Students'), use_container_width=True)
+            
+            with tab2:
+                st.plotly_chart(flag_heatmap('food_kg', 'Food (kg)'), use_container_width=True)
+            
+            with tab3:
+                selected = sweep_df[(sweep_df['weather'] == weather) & (sweep_df['is_exam'] == is_exam)
+                                    & (sweep_df['is_festival'] == is_festival)
+                                    & (sweep_df['is_start_sem'] == is_start_sem)]
+                fig = px.imshow(
+                    selected.pivot(index='menu_item', columns='temperature_c', values='predicted_students')
+                        .reindex(menu_items[meal_type]),
+                    aspect='auto', color_continuous_scale='Viridis',
+                    labels={'x': 'Temperature (°C)', 'y': 'Menu Item', 'color': 'Students'}
+                )
+                st.plotly_chart(fig, use_container_width=True)
+                st.caption("Weather and flags from the sidebar.")
+
+# Menu planning view
+menu_objectives = {'Lowest waste per student': 'waste', 'Steadiest daily attendance': 'spread'}
+objective = menu_objectives[st.sidebar.selectbox("Menu Objective", list(menu_objectives))]
+
+if st.sidebar.button("🗓️ Plan Weekly Menu"):
+    METRICS.increment('requests_total', kind='menu_plan')
+    if bundle is None:
+        METRICS.increment('errors_total', kind='menu_plan')
+        st.error("Model not loaded")
+    else:
+        with st.spinner("Searching weekly menus..."):
+            # One predict call scores every item in every slot; the search never calls the model
+            try:
+                common = dict(weather=weather, temperature=temperature, is_exam=is_exam,
+                              is_festival=is_festival, is_start_sem=is_start_sem,
+                              feature_store=load_feature_store(mess_id), params=mess)
+                rmse = bundle.metadata['performance']['test_rmse']
+                plan, weekly_menu, result = plan_week(
+                    bundle.engine, None, encoders, feature_names, prediction_date, objective,
+                    menu_items=menu_items, rmse=rmse, **common
+                )
+                rotation = predictor.forecast(
+                    bundle.engine, None, encoders, feature_names, prediction_date, **common
+                )
+            except Exception:
+                METRICS.increment('errors_total', kind='menu_plan')
+                raise
+            
+            st.markdown("---")
+            st.markdown(f"## 🗓️ Weekly Menu Plan from {prediction_date}")
+            st.caption(f"Objective: {OBJECTIVES[objective]}. Each item is served once per meal, "
+                       f"and an item shared between meals does not repeat within {FATIGUE_WINDOW} days.")
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.metric("🎯 Plan Objective", f"{result['cost']:,.2f}",
+                          f"{result['cost'] - forecast_objective(rotation, objective, mess, rmse):,.2f} vs. rotation",
+                          delta_color="inverse")
+            
+            with col2:
+                st.metric("👥 Total Meals Served", f"{plan['predicted_students'].sum():,}")
+            
+            with col3:
+                st.metric("🔎 Weeks Evaluated", f"{result['evaluated']:,}", f"{result['seconds']:.1f} s",
+                          delta_color="off")
+            
+            st.dataframe(
+                plan.pivot(index='day_of_week', columns='meal_type', values='menu_item')
+                    .reindex(plan['day_of_week'].unique())[list(menu_items)],
+                use_container_width=True
+            )
+            st.dataframe(
+                plan.assign(date=plan['date'].dt.date).round({'food_kg': 1, 'cost_rs': 0, 'waste_cost_rs': 0}),
+                use_container_width=True, hide_index=True
+            )
+
+# Historical trends view
+if st.sidebar.button("📈 Historical Trends"):
+    METRICS.increment('requests_total', kind='trends')
+    import time
+    import plotly.express as px
+
+    trends_cube = load_trends_cube(cube_version())
+    if trends_cube is None or mess_id not in trends_cube.campuses:
+        trends_cube = build_trends_cube(mess_id)
+    
+    # Every number below is a rollup of pre-aggregated cells, never a pass over raw rows
+    start = time.perf_counter()
+    with METRICS.span('trends'):
+        if trends_cube is not None:
+            by_meal = trends_cube.rollup('meal_type', campus_id=mess_id)
+            by_day = trends_cube.rollup('day_of_week', campus_id=mess_id)
+            by_month = trends_cube.rollup(['year', 'month'], campus_id=mess_id)
+            by_item = trends_cube.rollup('menu_item', campus_id=mess_id)
+            overall = trends_cube.rollup('campus_id', campus_id=mess_id).iloc[0]
+            daily_waste_cost = trends_cube.per_day('waste_cost_rs', campus_id=mess_id)
+    elapsed_ms = (time.perf_counter() - start) * 1e3
+    
+    if trends_cube is None:
+        METRICS.increment('errors_total', kind='trends')
+        st.error("No attendance history for this mess")
+    else:
+        st.markdown("---")
+        st.markdown(f"## 📈 Historical Trends: {mess_id}")
+        st.caption(f"{int(overall['rows']):,} meals through {trends_cube.last_dates[mess_id]}, "
+                   f"from {len(trends_cube):,} cube cells in {elapsed_ms:.1f} ms.")
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric("👥 Avg Students per Meal", f"{overall['students_attended_mean']:.0f}",
+                      f"± {overall['students_attended_std']:.0f}", delta_color="off")
+        
+        with col2:
+            st.metric("🗑️ Avg Waste", f"{overall['waste_percentage_mean']:.1f}%")
+        
+        with col3:
+            st.metric("💸 Avg Daily Waste Cost", f"₹{daily_waste_cost:,.0f}")
+        
+        tab1, tab2, tab3 = st.tabs(["👥 Attendance", "📅 Monthly", "🍽️ Menu Items"])
+        
+        with tab1:
+            col1, col2 = st.columns(2)
+            with col1:
+                fig = px.bar(by_meal.reset_index(), x='meal_type', y='students_attended_mean',
+                             error_y='students_attended_std',
+                             labels={'meal_type': 'Meal', 'students_attended_mean': 'Avg Students'})
+                st.plotly_chart(fig, use_container_width=True)
+            with col2:
+                fig = px.bar(by_day.reset_index(), x='day_of_week', y='attendance_rate_mean',
+                             labels={'day_of_week': 'Day', 'attendance_rate_mean': 'Avg Attendance Rate (%)'})
+                st.plotly_chart(fig, use_container_width=True)
+        
+        with tab2:
+            monthly = by_month.reset_index()
+            monthly['month'] = pd.to_datetime(dict(year=monthly['year'], month=monthly['month'], day=1))
+            fig = px.line(monthly, x='month', y=['students_attended_mean', 'waste_percentage_mean'],
+                          facet_row='variable', markers=True, labels={'month': 'Month', 'value': ''})
+            fig.update_yaxes(matches=None)
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with tab3:
+            items = by_item[['rows', 'students_attended_mean', 'waste_percentage_mean', 'waste_cost_rs_sum']]
+            st.dataframe(
+                items.sort_values('waste_cost_rs_sum', ascending=False).round(1).rename(columns={
+                    'rows': 'Meals', 'students_attended_mean': 'Avg Students',
+                    'waste_percentage_mean': 'Avg Waste %', 'waste_cost_rs_sum': 'Total Waste Cost (₹)'}),
+                use_container_width=True
+            )
+
 st.markdown("---")
-st.markdown("**Model:** Gradient Boosting | **Accuracy:** R² = 0.94 | **RMSE:** 29.65 students")
\ No newline at end of file
+if bundle is not None:
+    performance = bundle.metadata['performance']
+    st.markdown(f"**Model:** {bundle.metadata['model_name']} | "
+                f"**Accuracy:** R² = {performance['test_r2']:.2f} | "
+                f"**RMSE:** {performance['test_rmse']:.2f} students | "
+                f"**Mess:** {mess_id} ({mess['total_capacity']} seats) | "
+                f"**Bundle:** `{bundle.version}`")
+    stats = prediction_cache.stats()
+    st.caption(f"⚡ Prediction cache: {stats['hits']} hits / {stats['misses']} misses "
+               f"({stats['hit_rate']:.0%} hit rate), {stats['size']} of {stats['maxsize']} entries")
+    stats = registry.stats()
+    st.caption(f"📚 Model registry: {len(stats['resident'])} of {len(mess_ids)} messes in memory "
+               f"({stats['resident_bytes'] / 1e6:.1f} of {stats['budget_bytes'] / 1e6:.0f} MB), "
+               f"{stats['loads']} loads ({stats['mean_load_ms']:.0f} ms avg), {stats['evictions']} evictions")
+
+# Diagnostics panel
+st.sidebar.markdown("---")
+if st.sidebar.checkbox("🩺 Diagnostics", key='diagnostics'):
+    snapshot = METRICS.snapshot()
+    with st.expander("🩺 Predictor timings and counters", expanded=True):
+        if snapshot['spans']:
+            st.dataframe(pd.DataFrame(snapshot['spans']).T.round(3), use_container_width=True)
+        else:
+            st.caption("No spans recorded yet: run a prediction or forecast.")
+        if snapshot['counters']:
+            st.dataframe(pd.Series(snapshot['counters'], name='value'), use_container_width=True)
+        try:
+            st.caption(f"Prometheus metrics written to `{METRICS.write_prometheus()}`")
+        except OSError as e:
+            st.warning(f"Could not write metrics file: {str(e)}")
+    drift_monitor = None if bundle is None else load_drift_monitor(mess_id, bundle.version, bundle)
+    if drift_monitor is not None:
+        with st.expander("📈 Input drift vs. training data", expanded=True):
+            summary = drift_monitor.summary()
+            residuals = summary['residuals']
+            st.caption(f"{summary['rows']:,} live rows: {len(summary['alerts'])} features in alert, "
+                       f"{len(summary['warnings'])} warning (PSI and mean shift in training SDs).")
+            if residuals['rolling_rmse'] is not None:
+                st.caption(f"Rolling RMSE {residuals['rolling_rmse']:.2f} vs. baseline "
+                           f"{residuals['baseline_rmse']:.2f} over {residuals['rows']} actuals.")
+            st.dataframe(drift_monitor.feature_report().round(3), use_container_width=True)
@@ -0,0 +1,256 @@
+"""
+Attendance Database
+Indexed SQLite store for daily mess actuals, with append-only ingestion and NumPy range reads
+"""
+
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+DB_FILE = 'data/mess.db'
+DEFAULT_CAMPUS = 'main'          # campus_id for single-mess data (no campus_id column)
+ATTENDANCE_TABLE = 'attendance'
+FEATURES_TABLE = 'features'
+
+# Generator columns (generate_data.py) with their SQLite types
+ATTENDANCE_COLUMNS = {
+    'campus_id': 'TEXT NOT NULL',
+    'date': 'TEXT NOT NULL',               # ISO YYYY-MM-DD, sorts chronologically
+    'year': 'INTEGER',
+    'month': 'INTEGER',
+    'day': 'INTEGER',
+    'day_of_week': 'TEXT',
+    'week_of_year': 'INTEGER',
+    'meal_type': 'TEXT NOT NULL',
+    'menu_item': 'TEXT',
+    'menu_popularity': 'REAL',
+    'weather': 'TEXT',
+    'temperature_c': 'REAL',
+    'is_exam_period': 'INTEGER',
+    'is_festival': 'INTEGER',
+    'is_weekend': 'INTEGER',
+    'is_start_semester': 'INTEGER',
+    'is_end_semester': 'INTEGER',
+    'is_monsoon': 'INTEGER',
+    'total_capacity': 'INTEGER',
+    'students_attended': 'INTEGER',
+    'attendance_rate': 'REAL',
+    'food_prepared_kg': 'REAL',
+    'food_consumed_kg': 'REAL',
+    'food_wasted_kg': 'REAL',
+    'waste_percentage': 'REAL',
+    'cost_per_kg_rs': 'REAL',
+    'total_cost_rs': 'REAL',
+    'waste_cost_rs': 'REAL',
+    'staff_count': 'INTEGER',
+    'serving_duration_mins': 'INTEGER',
+    'student_satisfaction': 'REAL',
+}
+FLAG_COLUMNS = ['is_exam_period', 'is_festival', 'is_weekend', 'is_start_semester',
+                'is_end_semester', 'is_monsoon']
+
+# Rows are clustered on the primary key, so one meal's history is contiguous
+KEY_COLUMNS = ['campus_id', 'meal_type', 'date']
+
+# ============================================
+# SCHEMA
+# ============================================
+
+def _sql_type(dtype):
+    if dtype.kind in 'biu':
+        return 'INTEGER'
+    if dtype.kind == 'f':
+        return 'REAL'
+    return 'TEXT'
+
+
+def _numpy_dtype(name, sql_type):
+    """Array dtype for a column read back from SQLite"""
+    if name == 'date':
+        return 'datetime64[D]'
+    if name in FLAG_COLUMNS:
+        return '?'
+    sql_type = sql_type.upper()
+    if sql_type.startswith('INTEGER'):
+        return 'i8'
+    if sql_type.startswith('REAL'):
+        return 'f8'
+    return 'O'
+
+
+def _create_table_sql(table, columns):
+    body = ',\n    '.join(f'{name} {sql_type}' for name, sql_type in columns.items())
+    return (f"CREATE TABLE IF NOT EXISTS {table} (\n    {body},\n"
+            f"    PRIMARY KEY ({', '.join(KEY_COLUMNS)})\n) WITHOUT ROWID;\n"
+            f"CREATE INDEX IF NOT EXISTS {table}_menu_date ON {table} (menu_item, date);")
+
+# ============================================
+# DATABASE
+# ============================================
+
+class AttendanceDB:
+    """One SQLite file holding raw actuals (attendance) and, optionally, processed features
+
+    Both tables are keyed on (campus_id, meal_type, date) and indexed on
+    (menu_item, date). Ingestion is append-only: re-ingesting a
+    (campus, meal, date) that is already stored is rejected, never
+    overwritten. Reads return {column: ndarray}, built straight from the
+    cursor with np.fromiter.
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(_create_table_sql(ATTENDANCE_TABLE, ATTENDANCE_COLUMNS))
+        self._columns = {}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def columns(self, table=ATTENDANCE_TABLE):
+        """{column: declared SQLite type} for a table"""
+        if table not in self._columns:
+            info = self.conn.execute(f'PRAGMA table_info({table})').fetchall()
+            if not info:
+                raise KeyError(f"No table {table!r} in {self.path}")
+            self._columns[table] = {row[1]: row[2] for row in info}
+        return self._columns[table]
+
+    # ---------- ingestion ----------
+
+    def _rows(self, df, columns):
+        """df as tuples of plain Python values in `columns` order"""
+        df = df.copy()
+        if 'campus_id' not in df:
+            df['campus_id'] = DEFAULT_CAMPUS
+        df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
+        missing = [col for col in columns if col not in df]
+        if missing:
+            raise ValueError(f"Missing columns: {missing}")
+        # object dtype boxes numpy scalars into int/float/bool, which sqlite3 can bind
+        return df[columns].astype(object).where(df[columns].notna(), None).itertuples(index=False, name=None)
+
+    def ingest(self, df, table=ATTENDANCE_TABLE):
+        """Append rows in one transaction; returns the number of rows written
+
+        Raises ValueError, writing nothing, if any (campus, meal, date) is
+        already stored.
+        """
+        columns = list(self.columns(table))
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        try:
+            with self.conn:
+                cursor = self.conn.executemany(sql, self._rows(df, columns))
+        except sqlite3.IntegrityError as e:
+            raise ValueError(f"Rows already ingested into {table}: {e}") from e
+        return cursor.rowcount
+
+    def ingest_day(self, day_df, table=ATTENDANCE_TABLE):
+        """Append one day's actuals (every meal, every campus)"""
+        dates = pd.to_datetime(day_df['date']).dt.normalize().unique()
+        if len(dates) != 1:
+            raise ValueError(f"ingest_day expects one date, got {len(dates)}")
+        return self.ingest(day_df, table)
+
+    def import_csv(self, csv_path, table=ATTENDANCE_TABLE, chunk_rows=100_000):
+        """Load a raw or processed CSV; a new table takes its columns from the file"""
+        n_rows = 0
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_rows):
+            if table not in self._existing_tables():
+                columns = {'campus_id': 'TEXT NOT NULL'}
+                columns.update({col: _sql_type(dtype) for col, dtype in chunk.dtypes.items()})
+                for key in KEY_COLUMNS:
+                    columns[key] = columns[key].split()[0] + ' NOT NULL'
+                self.conn.executescript(_create_table_sql(table, columns))
+            n_rows += self.ingest(chunk, table)
+        return n_rows
+
+    def _existing_tables(self):
+        return {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+    # ---------- reads ----------
+
+    def query(self, sql, params=(), columns=None, table=ATTENDANCE_TABLE):
+        """Run a SELECT of `columns` and return {column: ndarray}"""
+        types = self.columns(table)
+        dtype = np.dtype([(name, _numpy_dtype(name, types[name])) for name in columns])
+        rows = np.fromiter(self.conn.execute(sql, params), dtype=dtype)
+        return {name: rows[name] for name in columns}
+
+    def read(self, columns=None, meal_type=None, start_date=None, end_date=None, menu_item=None,
+             campus_id=DEFAULT_CAMPUS, table=ATTENDANCE_TABLE):
+        """Rows in an inclusive date range, ordered by date then meal_type
+
+        Filtering on meal_type uses the primary key, on menu_item the
+        (menu_item, date) index. campus_id=None reads every campus.
+        """
+        columns = list(columns or self.columns(table))
+        where, params = [], []
+        for name, value in [('campus_id', campus_id), ('meal_type', meal_type), ('menu_item', menu_item)]:
+            if value is not None:
+                where.append(f'{name} = ?')
+                params.append(value)
+        if start_date is not None:
+            where.append('date >= ?')
+            params.append(pd.Timestamp(start_date).strftime('%Y-%m-%d'))
+        if end_date is not None:
+            where.append('date <= ?')
+            params.append(pd.Timestamp(end_date).strftime('%Y-%m-%d'))
+
+        sql = f"SELECT {', '.join(columns)} FROM {table}"
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY date, meal_type'
+        return self.query(sql, params, columns, table)
+
+    def last_days(self, meal_type, n_days=14, columns=('date', 'students_attended', 'food_wasted_kg'),
+                  campus_id=DEFAULT_CAMPUS, table=ATTENDANCE_TABLE):
+        """The latest n_days rows of one meal, oldest first (a backwards primary-key scan)"""
+        columns = list(columns)
+        sql = (f"SELECT {', '.join(columns)} FROM {table} "
+               f"WHERE campus_id = ? AND meal_type = ? ORDER BY date DESC LIMIT ?")
+        arrays = self.query(sql, (campus_id, meal_type, n_days), columns, table)
+        return {name: values[::-1] for name, values in arrays.items()}
+
+    def last_date(self, campus_id=DEFAULT_CAMPUS, table=ATTENDANCE_TABLE):
+        """Latest stored date (None when empty)"""
+        row = self.conn.execute(f"SELECT MAX(date) FROM {table} WHERE campus_id = ?", (campus_id,)).fetchone()
+        return None if row[0] is None else pd.Timestamp(row[0])
+
+    def count(self, table=ATTENDANCE_TABLE):
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import mess CSVs into the SQLite attendance store")
+    parser.add_argument('--db', default=DB_FILE)
+    parser.add_argument('--raw', default='data/raw/college_mess_data.csv',
+                        help=f"Raw actuals CSV for the {ATTENDANCE_TABLE} table ('' to skip)")
+    parser.add_argument('--processed', default='data/processed/mess_data_with_features.csv',
+                        help=f"Processed features CSV for the {FEATURES_TABLE} table ('' to skip)")
+    args = parser.parse_args()
+
+    with AttendanceDB(args.db) as db:
+        for csv_path, table in [(args.raw, ATTENDANCE_TABLE), (args.processed, FEATURES_TABLE)]:
+            if csv_path:
+                rows = db.import_csv(csv_path, table)
+                print(f"✅ Imported {rows:,} rows from {csv_path} into {table}")
+    print(f"   Database: {args.db} ({os.path.getsize(args.db) / 1e6:.2f} MB)")
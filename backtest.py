@@ -0,0 +1,345 @@
+"""
+Backtesting
+Rolling-origin replay of history: refit (or warm-start) at each origin on the data known then,
+forecast the next days, and report errors per regime (exams, festivals, monsoon, ...)
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from feature_store import HISTORY_FEATURES
+from features import GroupLayout, build_features
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+CACHE_DIR = 'models/backtest_cache'
+HORIZON_DAYS = 7              # the app's default forecast
+STEP_DAYS = 7                 # weekly origins
+MIN_TRAIN_DAYS = 90           # first origin: this many days after the data starts
+WARM_TREES = 50               # boosting stages added per warm-started origin (retrain.MAX_NEW_TREES)
+
+# History features a forecast takes from the feature store as of its origin. students_same_day_last_week
+# is the row's own: a week back is known for every day of a horizon of up to 7 days.
+ORIGIN_FEATURES = [name for name in HISTORY_FEATURES if name != 'students_same_day_last_week']
+ROLLING_FEATURES = [name for name in HISTORY_FEATURES if name.startswith('students_roll_')]
+
+# Regimes scored separately; a row may be in several. 'normal' is features.is_normal_day
+REGIMES = {
+    'exam': 'is_exam_period',
+    'festival': 'is_festival',
+    'monsoon': 'is_monsoon',
+    'weekend': 'is_weekend',
+    'semester start': 'is_start_semester',
+    'semester end': 'is_end_semester',
+}
+
+# ============================================
+# POINT-IN-TIME FEATURES
+# ============================================
+
+def point_in_time_menu_stats(df):
+    """menu_historical_avg/std of each row from its menu's rows on earlier days only
+
+    build_features computes them over the whole dataset, so every row
+    sees its own and later days' attendance. Here they are expanding
+    statistics that stop the day before, as a forecast made that morning
+    would know them. df is build_features output (date, menu_item, target).
+    """
+    daily = (df.assign(sq=df['students_attended'].astype(float) ** 2)
+               .groupby(['menu_item', 'date'], observed=True)
+               .agg(n=('students_attended', 'size'), s=('students_attended', 'sum'), ss=('sq', 'sum')))
+    # Running totals per menu, shifted one day so a day sees only the days before it
+    before = daily.groupby(level='menu_item', observed=True).cumsum() - daily
+    before = before.reindex(pd.MultiIndex.from_frame(df[['menu_item', 'date']])).to_numpy(float)
+    n, s, ss = before.T
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(n > 0, s / n, np.nan)
+        std = np.where(n > 1, np.sqrt(np.maximum((ss - n * mean ** 2) / (n - 1), 0)), np.nan)
+    return mean, std
+
+
+def menu_stats_before(menu_codes, y, n_menus):
+    """(mean, std) per menu code over the given rows, as the feature store holds them at an origin"""
+    n = np.bincount(menu_codes, minlength=n_menus).astype(float)
+    s = np.bincount(menu_codes, weights=y, minlength=n_menus)
+    ss = np.bincount(menu_codes, weights=y * y, minlength=n_menus)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = s / n
+        std = np.where(n > 1, np.sqrt(np.maximum((ss - n * mean ** 2) / (n - 1), 0)), np.nan)
+    return mean, std
+
+# ============================================
+# SHARED FEATURE MATRIX
+# ============================================
+
+class BacktestMatrix:
+    """Features of every row, built once and memory-mapped by every origin's worker
+
+    Two matrices in feature_names order: X, the training features, and S,
+    each row's features as forecast from the start of its own day, with
+    rolling stats ending the day before, as OnlineFeatureStore.lookup
+    serves them. An origin trains on X of the rows before it and
+    forecasts from S, taking the history features of each meal's row on
+    the origin day, so a forecast 5 days out uses 5-day-old lags, as in
+    the app. With point_in_time=False both are the notebook's features
+    (whole-dataset menu stats, rolling stats including the row itself),
+    which reproduces notebook 03's optimistic single-split errors.
+    Directories are keyed by a hash of the inputs, as tuning.FoldMatrices.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'matrix.json')) as f:
+            self.info = json.load(f)
+        self.feature_names = self.info['feature_names']
+        self.rows = pd.read_parquet(os.path.join(directory, 'rows.parquet'))
+        self.X, self.S = (np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r') for name in ('X', 'S'))
+
+    @classmethod
+    def build(cls, raw, encoders, feature_names, point_in_time=True, cache_dir=CACHE_DIR):
+        df = build_features(raw.drop(columns=['campus_id'], errors='ignore'), encoders=encoders, dropna=False)
+        if point_in_time:
+            df['menu_historical_avg'], df['menu_historical_std'] = point_in_time_menu_stats(df)
+        X = df[feature_names].to_numpy(np.float64)
+        S = X.copy()
+        if point_in_time:
+            layout = GroupLayout(df, ['meal_type'])
+            for name in ROLLING_FEATURES:
+                S[:, feature_names.index(name)] = layout.scatter(layout.shift(layout.take(df[name]), 1))
+
+        dates = pd.DatetimeIndex(df['date'])
+        rows = pd.DataFrame({
+            'date': dates,
+            'day': (dates - dates[0]).days,
+            'meal_type': df['meal_type'].to_numpy(),
+            'menu_item': df['menu_item'].to_numpy(),
+            'menu_code': pd.factorize(df['menu_item'])[0],
+            'students_attended': df['students_attended'].to_numpy(float),
+            'usable': ~(np.isnan(X).any(axis=1) | np.isnan(S).any(axis=1)),
+            'total_capacity': df['total_capacity'].to_numpy(),
+            **{column: df[column].astype(bool).to_numpy() for column in REGIMES.values()},
+        })
+
+        digest = hashlib.sha256()
+        for array in (X, S, rows['students_attended'].to_numpy()):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        digest.update(json.dumps([feature_names, point_in_time]).encode())
+        directory = os.path.join(cache_dir, digest.hexdigest()[:16])
+        if os.path.exists(os.path.join(directory, 'matrix.json')):
+            return cls(directory)
+
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, 'X.npy'), X)
+        np.save(os.path.join(directory, 'S.npy'), S)
+        rows.to_parquet(os.path.join(directory, 'rows.parquet'), index=False)
+        # Written last: its presence marks a complete directory
+        with open(os.path.join(directory, 'matrix.json'), 'w') as f:
+            json.dump({'feature_names': list(feature_names), 'point_in_time': point_in_time}, f)
+        return cls(directory)
+
+    def origins(self, step=STEP_DAYS, min_train_days=MIN_TRAIN_DAYS):
+        """Origin day numbers, every `step` days from min_train_days to the last day"""
+        return list(range(min_train_days, int(self.rows['day'].max()) + 1, step))
+
+    def forecast_rows(self, origin, horizon=HORIZON_DAYS):
+        """(row indices, features) of the days [origin, origin + horizon) as forecast at the origin"""
+        rows = self.rows
+        day = rows['day'].to_numpy()
+        test = np.flatnonzero((day >= origin) & (day < origin + horizon))
+        X = np.array(self.S[test])
+        if self.info['point_in_time']:
+            # History as of the origin: each meal's features on the origin day
+            anchors = dict(zip(rows['meal_type'].to_numpy()[day == origin], np.flatnonzero(day == origin)))
+            anchor = np.array([anchors[meal] for meal in rows['meal_type'].to_numpy()[test]])
+            columns = [self.feature_names.index(name) for name in ORIGIN_FEATURES]
+            X[:, columns] = self.S[anchor][:, columns]
+
+            before = day < origin
+            menu = rows['menu_code'].to_numpy()
+            mean, std = menu_stats_before(menu[before], rows['students_attended'].to_numpy()[before],
+                                          int(menu.max()) + 1)
+            X[:, self.feature_names.index('menu_historical_avg')] = mean[menu[test]]
+            X[:, self.feature_names.index('menu_historical_std')] = std[menu[test]]
+        return test, X
+
+    def training_rows(self, origin, start=0):
+        """Indices of usable rows in [start, origin)"""
+        day = self.rows['day'].to_numpy()
+        return np.flatnonzero(self.rows['usable'].to_numpy() & (day >= start) & (day < origin))
+
+# ============================================
+# ORIGINS
+# ============================================
+
+def fit_model(X, y, hyperparameters):
+    """The stored model's estimator, fitted on unscaled features
+
+    Trees split on thresholds, which StandardScaler does not reorder, so
+    folds skip the scaler the shipped pipeline applies.
+    """
+    from sklearn.ensemble import GradientBoostingRegressor
+
+    return GradientBoostingRegressor(**hyperparameters, random_state=42).fit(X, y)
+
+
+_MATRIX = None
+
+
+def _init_worker(directory):
+    global _MATRIX
+    _MATRIX = BacktestMatrix(directory)
+
+
+def _run_origin(task):
+    """Fit at one origin and forecast its horizon; returns the predictions frame"""
+    origin, horizon, hyperparameters, base = task
+    matrix = _MATRIX
+    y = matrix.rows['students_attended'].to_numpy()
+
+    start = time.perf_counter()
+    if base is None:
+        train = matrix.training_rows(origin)
+        model = fit_model(matrix.X[train], y[train], hyperparameters)
+    else:
+        # Warm start: the first origin's model plus stages fitted on the rows since then
+        from retrain import add_trees
+
+        model, base_origin, n_trees = base
+        train = matrix.training_rows(origin, start=base_origin)
+        if len(train):
+            model = add_trees(model, np.asarray(matrix.X[train]), y[train], n_trees)
+    fit_seconds = time.perf_counter() - start
+
+    test, X = matrix.forecast_rows(origin, horizon)
+    rows = matrix.rows.iloc[test]
+    predicted = np.clip(np.rint(model.predict(X)), 0, rows['total_capacity'].to_numpy())
+    return rows.drop(columns=['day', 'menu_code', 'usable', 'total_capacity']).assign(
+        origin=matrix.rows['date'].iloc[0] + pd.Timedelta(days=origin),
+        horizon_day=rows['day'].to_numpy() - origin + 1,
+        predicted=predicted,
+        error=predicted - rows['students_attended'].to_numpy(),
+        train_rows=len(train),
+        fit_seconds=fit_seconds,
+    )
+
+
+def backtest(matrix, hyperparameters, mode='refit', horizon=HORIZON_DAYS, step=STEP_DAYS,
+             min_train_days=MIN_TRAIN_DAYS, warm_trees=WARM_TREES, n_jobs=None, verbose=True):
+    """Forecast every origin's horizon in a process pool; one row per forecast meal
+
+    mode 'refit' fits a fresh model on everything before each origin.
+    'warm' fits once at the first origin and, at each later one, adds
+    warm_trees stages on the rows since (retrain.add_trees), so origins
+    stay independent and run in parallel.
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    origins = matrix.origins(step, min_train_days)
+    base = None
+    if mode == 'warm':
+        train = matrix.training_rows(origins[0])
+        y = matrix.rows['students_attended'].to_numpy()
+        base = (fit_model(matrix.X[train], y[train], hyperparameters), origins[0], warm_trees)
+    elif mode != 'refit':
+        raise ValueError(f"Unknown backtest mode {mode!r}; choose 'refit' or 'warm'")
+    tasks = [(origin, horizon, hyperparameters, base) for origin in origins]
+
+    start = time.perf_counter()
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(matrix.directory,)) as pool:
+            results = list(pool.map(_run_origin, tasks))
+    else:
+        _init_worker(matrix.directory)
+        results = [_run_origin(task) for task in tasks]
+    predictions = pd.concat(results, ignore_index=True)
+    if verbose:
+        print(f"🔁 {len(origins)} origins ({mode}, {horizon}-day horizon, every {step} days) "
+              f"in {time.perf_counter() - start:.1f}s on {n_jobs} process(es)")
+    return predictions
+
+# ============================================
+# ERROR TABLES
+# ============================================
+
+def _errors(frame):
+    error = frame['error'].to_numpy(float)
+    actual = frame['students_attended'].to_numpy(float)
+    return {
+        'rows': len(frame),
+        'mae': np.abs(error).mean(),
+        'rmse': np.sqrt(np.mean(error ** 2)),
+        'bias': error.mean(),
+        'mape': np.mean(np.abs(error) / actual) * 100,
+    }
+
+
+def error_table(predictions, by):
+    """MAE, RMSE, bias (predicted - actual) and MAPE per value of `by` (e.g. 'meal_type', 'horizon_day')"""
+    return pd.DataFrame({key: _errors(group) for key, group in predictions.groupby(by)}).T
+
+
+def regime_table(predictions):
+    """Errors overall, per regime in REGIMES, and on normal days (none of exam/festival/weekend/semester)"""
+    special = [REGIMES[name] for name in ('exam', 'festival', 'weekend', 'semester start', 'semester end')]
+    masks = {'all': np.ones(len(predictions), dtype=bool)}
+    masks.update({name: predictions[column].to_numpy() for name, column in REGIMES.items()})
+    masks['normal'] = ~predictions[special].any(axis=1).to_numpy()
+    return pd.DataFrame({name: _errors(predictions[mask]) for name, mask in masks.items() if mask.any()}).T
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from model_registry import DEFAULT_MESS, history_file, models_dir
+
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest with per-regime error tables")
+    parser.add_argument('--mess', default=DEFAULT_MESS, help="mess whose history and model settings to use")
+    parser.add_argument('--mode', default='refit', choices=['refit', 'warm'])
+    parser.add_argument('--horizon', type=int, default=HORIZON_DAYS, help="days forecast from each origin")
+    parser.add_argument('--step', type=int, default=STEP_DAYS, help="days between origins")
+    parser.add_argument('--min-train-days', type=int, default=MIN_TRAIN_DAYS)
+    parser.add_argument('--notebook-features', action='store_true',
+                        help="train and forecast on notebook 02's features (whole-dataset menu stats, "
+                             "rolling stats including the row), as the single 80/20 split does")
+    parser.add_argument('--n-jobs', type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument('--output', default=None, help="write every forecast row to this CSV")
+    args = parser.parse_args()
+
+    directory = models_dir(args.mess)
+    with open(f'{directory}/label_encoders.pkl', 'rb') as f:
+        encoders = pickle.load(f)
+    with open(f'{directory}/feature_names.pkl', 'rb') as f:
+        feature_names = list(pickle.load(f))
+    with open(f'{directory}/model_metadata.json') as f:
+        metadata = json.load(f)
+
+    print("\n" + "="*70)
+    print(f"🔙 BACKTEST: mess {args.mess}, {'notebook' if args.notebook_features else 'point-in-time'} features")
+    print("="*70)
+    start = time.perf_counter()
+    matrix = BacktestMatrix.build(pd.read_csv(history_file(args.mess)), encoders, feature_names,
+                                  point_in_time=not args.notebook_features)
+    print(f"🧮 Feature matrix: {len(matrix.rows):,} rows x {len(feature_names)} features, "
+          f"built once in {time.perf_counter() - start:.2f}s ({matrix.directory})")
+
+    predictions = backtest(matrix, metadata['hyperparameters'], args.mode, args.horizon, args.step,
+                           args.min_train_days, n_jobs=args.n_jobs)
+    if args.output:
+        predictions.to_csv(args.output, index=False)
+        print(f"💾 {len(predictions):,} forecasts → {args.output}")
+
+    print(f"\n📊 Errors by regime (single 80/20 split test RMSE: {metadata['performance']['test_rmse']:.2f})")
+    print(regime_table(predictions).round(2).to_string())
+    print("\n🍽️ By meal")
+    print(error_table(predictions, 'meal_type').round(2).to_string())
+    print("\n📅 By days ahead")
+    print(error_table(predictions, 'horizon_day').round(2).to_string())
@@ -0,0 +1,121 @@
+"""
+Attendance Store Benchmark
+Point and range reads from the indexed SQLite store vs. scanning the CSV with pandas
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import numpy as np
+import pandas as pd
+
+from attendance_db import DEFAULT_CAMPUS, AttendanceDB
+from generate_data import generate_sharded_mess_data, make_campuses
+
+RAW_FILE = 'data/raw/college_mess_data.csv'
+COLUMNS = ['date', 'meal_type', 'menu_item', 'students_attended', 'food_wasted_kg']
+
+
+def best_of(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def csv_read(csv_path, campus_id, meal_type=None, menu_item=None, start_date=None, end_date=None):
+    """The current approach: load the whole CSV, then filter"""
+    df = pd.read_csv(csv_path, usecols=lambda c: c in COLUMNS + ['campus_id'])
+    mask = pd.Series(True, index=df.index)
+    if 'campus_id' in df:
+        mask &= df['campus_id'] == campus_id
+    if meal_type is not None:
+        mask &= df['meal_type'] == meal_type
+    if menu_item is not None:
+        mask &= df['menu_item'] == menu_item
+    if start_date is not None:
+        mask &= df['date'] >= start_date
+    if end_date is not None:
+        mask &= df['date'] <= end_date
+    return df[mask].sort_values(['date', 'meal_type'])
+
+
+def run(csv_path, db_path, campus_id, repeats=5):
+    """{query: (csv_s, db_s, rows)}, after checking both return the same rows"""
+    with AttendanceDB(db_path) as db:
+        end = db.last_date(campus_id)
+        month_start = (end - pd.offsets.MonthBegin(1)).strftime('%Y-%m-%d')
+        year_start = (end - pd.DateOffset(years=1)).strftime('%Y-%m-%d')
+        day = end.strftime('%Y-%m-%d')
+        queries = {
+            'point (meal, day)': dict(meal_type='Lunch', start_date=day, end_date=day),
+            'month range': dict(start_date=month_start, end_date=day),
+            'menu item, 1 year': dict(menu_item='Biryani', start_date=year_start),
+        }
+
+        results = {}
+        for name, filters in queries.items():
+            expected = csv_read(csv_path, campus_id, **filters)
+            arrays = db.read(COLUMNS, campus_id=campus_id, **filters)
+            assert np.array_equal(arrays['students_attended'], expected['students_attended'].to_numpy())
+            results[name] = (best_of(lambda: csv_read(csv_path, campus_id, **filters), repeats),
+                             best_of(lambda: db.read(COLUMNS, campus_id=campus_id, **filters), repeats),
+                             len(expected))
+
+        expected = csv_read(csv_path, campus_id, meal_type='Lunch').tail(14)
+        arrays = db.last_days('Lunch', 14, COLUMNS, campus_id)
+        assert np.array_equal(arrays['students_attended'], expected['students_attended'].to_numpy())
+        results['last 14 days'] = (
+            best_of(lambda: csv_read(csv_path, campus_id, meal_type='Lunch').tail(14), repeats),
+            best_of(lambda: db.last_days('Lunch', 14, COLUMNS, campus_id), repeats),
+            14,
+        )
+    return results
+
+
+def build(csv_path, db_path):
+    start = time.perf_counter()
+    with AttendanceDB(db_path) as db:
+        n_rows = db.import_csv(csv_path)
+    elapsed = time.perf_counter() - start
+    return n_rows, elapsed
+
+
+def report(title, csv_path, db_path, campus_id):
+    n_rows, elapsed = build(csv_path, db_path)
+    print("\n" + "="*68)
+    print(f"🗄️  {title}: {n_rows:,} rows "
+          f"(CSV {os.path.getsize(csv_path) / 1e6:.1f} MB, DB {os.path.getsize(db_path) / 1e6:.1f} MB)")
+    print(f"   Import: {elapsed:.2f} s ({n_rows / elapsed:,.0f} rows/s)")
+    print("="*68)
+    print(f"{'Query':<20}{'Rows':>7}{'CSV scan (ms)':>15}{'SQLite (ms)':>13}{'Speedup':>10}")
+    for name, (csv_s, db_s, rows) in run(csv_path, db_path, campus_id).items():
+        print(f"{name:<20}{rows:>7,}{csv_s * 1e3:>15.2f}{db_s * 1e3:>13.3f}{csv_s / db_s:>9.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the SQLite attendance store against CSV scans")
+    parser.add_argument('--campuses', type=int, default=20)
+    parser.add_argument('--start-date', default='2015-01-01')
+    parser.add_argument('--end-date', default='2024-12-31')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report('Repository CSV', RAW_FILE, os.path.join(tmp, 'repo.db'), DEFAULT_CAMPUS)
+
+        campuses = make_campuses(args.campuses)
+        df = generate_sharded_mess_data(campuses, args.start_date, args.end_date)
+        csv_path = os.path.join(tmp, 'campuses.csv')
+        df.to_csv(csv_path, index=False)
+        del df
+        report(f'{args.campuses} campuses, {args.start_date[:4]}-{args.end_date[:4]}',
+               csv_path, os.path.join(tmp, 'campuses.db'), next(iter(campuses)))
@@ -0,0 +1,73 @@
+"""
+Cold Start Benchmark
+Fresh-process time to load the model artifacts and to render the app's first page
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import numpy as np
+
+# Each snippet runs in a new interpreter and prints its own elapsed seconds
+SNIPPETS = {
+    'pickles (4 files + sklearn)': """
+import time; start = time.perf_counter()
+import predictor
+predictor.load_artifacts()
+print(time.perf_counter() - start)
+""",
+    'bundle open (lazy model)': """
+import time; start = time.perf_counter()
+import predictor
+from model_bundle import load_bundle
+load_bundle()
+print(time.perf_counter() - start)
+""",
+    'bundle + first model use': """
+import time; start = time.perf_counter()
+import predictor
+from model_bundle import load_bundle
+load_bundle().model
+print(time.perf_counter() - start)
+""",
+    'app first render': """
+import time, warnings; warnings.filterwarnings('ignore')
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+AppTest.from_file('app.py', default_timeout=60).run()
+print(time.perf_counter() - start)
+""",
+}
+
+
+def cold_start(snippet, repeat=5):
+    """Median and min seconds over `repeat` fresh interpreters"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    timings = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', snippet], capture_output=True,
+                             text=True, check=True, env=env)
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return float(np.median(timings)), min(timings)
+
+
+def run(repeat=5):
+    results = []
+    for name, snippet in SNIPPETS.items():
+        median, best = cold_start(snippet, repeat)
+        results.append({'case': name, 'median_s': median, 'min_s': best})
+    return results
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("🧊 COLD START")
+    print("="*60)
+    print(f"{'Case':<30}{'Median (s)':>12}{'Min (s)':>10}")
+    for r in run():
+        print(f"{r['case']:<30}{r['median_s']:>12.3f}{r['min_s']:>10.3f}")
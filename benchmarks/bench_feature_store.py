@@ -0,0 +1,90 @@
+"""
+Feature Store Parity & Latency Benchmark
+Checks OnlineFeatureStore against notebook 02's groupby/rolling features and times it
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import numpy as np
+import pandas as pd
+
+from feature_store import HISTORY_FEATURES, OnlineFeatureStore
+from generate_data import make_campuses, generate_sharded_mess_data
+
+
+def notebook_features(df):
+    """Lag and rolling features exactly as notebook 02, cells 4 and 5"""
+    df = df.sort_values(['date', 'meal_type']).reset_index(drop=True)
+
+    for lag in [1, 7, 14]:
+        df[f'students_lag_{lag}'] = df.groupby('meal_type')['students_attended'].shift(lag)
+        df[f'waste_lag_{lag}'] = df.groupby('meal_type')['food_wasted_kg'].shift(lag)
+    df['students_same_day_last_week'] = df.groupby(['meal_type', 'day_of_week'])['students_attended'].shift(1)
+
+    for window in [3, 7, 14]:
+        df[f'students_roll_{window}d_mean'] = df.groupby('meal_type')['students_attended'].transform(
+            lambda x: x.rolling(window=window, min_periods=1).mean()
+        )
+        df[f'students_roll_{window}d_std'] = df.groupby('meal_type')['students_attended'].transform(
+            lambda x: x.rolling(window=window, min_periods=1).std()
+        )
+    df['students_roll_7d_max'] = df.groupby('meal_type')['students_attended'].transform(
+        lambda x: x.rolling(window=7, min_periods=1).max()
+    )
+    df['students_roll_7d_min'] = df.groupby('meal_type')['students_attended'].transform(
+        lambda x: x.rolling(window=7, min_periods=1).min()
+    )
+    return df
+
+
+def check_parity(raw):
+    """Max absolute difference between replayed store features and the notebook's"""
+    expected = notebook_features(raw)
+    replayed = OnlineFeatureStore().replay(expected)
+
+    a = expected[HISTORY_FEATURES].to_numpy(dtype=float)
+    b = replayed[HISTORY_FEATURES].to_numpy(dtype=float)
+    assert (np.isnan(a) == np.isnan(b)).all(), "NaN pattern differs"
+    return np.nanmax(np.abs(a - b))
+
+
+def time_store(raw, n_lookups=10_000):
+    """Per-row ingest and per-lookup latency in microseconds"""
+    ordered = raw.sort_values(['date', 'meal_type'])
+    store = OnlineFeatureStore()
+
+    start = time.perf_counter()
+    for row in ordered.itertuples(index=False):
+        store.ingest(row.meal_type, row.day_of_week, row.students_attended,
+                     row.food_wasted_kg, row.date)
+    ingest_us = (time.perf_counter() - start) / len(ordered) * 1e6
+
+    start = time.perf_counter()
+    for i in range(n_lookups):
+        store.lookup('Lunch', 'Monday')
+    lookup_us = (time.perf_counter() - start) / n_lookups * 1e6
+    return ingest_us, lookup_us
+
+
+if __name__ == "__main__":
+    raw = pd.read_csv('data/raw/college_mess_data.csv', parse_dates=['date'])
+
+    print("\n" + "="*60)
+    print("🧮 FEATURE STORE PARITY (vs notebook 02)")
+    print("="*60)
+    print(f"Max abs difference over {len(raw)} rows: {check_parity(raw):.2e}")
+
+    print("\n" + "="*60)
+    print("⏱️  FEATURE STORE LATENCY")
+    print("="*60)
+    print(f"{'History rows':>14}{'Ingest (µs/row)':>18}{'Lookup (µs)':>14}")
+    for n_campuses, end in [(1, '2024-10-24'), (1, '2034-12-31'), (1, '2124-12-31')]:
+        history = generate_sharded_mess_data(make_campuses(n_campuses), '2024-01-01', end, workers=1)
+        ingest_us, lookup_us = time_store(history.drop(columns='campus_id'))
+        print(f"{len(history):>14,}{ingest_us:>18.1f}{lookup_us:>14.1f}")
@@ -0,0 +1,147 @@
+"""
+Feature Pipeline Benchmark
+features.build_features vs. notebook 02's pandas cells, from 852 rows to millions
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import numpy as np
+import pandas as pd
+
+from bench_feature_store import notebook_features
+from features import FEATURE_ORDER, build_features
+from generate_data import make_campuses, generate_sharded_mess_data
+
+
+def notebook_pipeline(raw):
+    """Notebook 02, cells 2-12, as it was written (groupby lambdas and map)"""
+    df = raw.copy()
+    df['date'] = pd.to_datetime(df['date'])
+
+    # Cell 3: temporal
+    df['year'] = df['date'].dt.year
+    df['month'] = df['date'].dt.month
+    df['day'] = df['date'].dt.day
+    df['day_of_week_num'] = df['date'].dt.dayofweek
+    df['week_of_year'] = df['date'].dt.isocalendar().week
+    df['is_monday'] = (df['day_of_week_num'] == 0).astype(int)
+    df['is_friday'] = (df['day_of_week_num'] == 4).astype(int)
+    df['day_sin'] = np.sin(2 * np.pi * df['day'] / 31)
+    df['day_cos'] = np.cos(2 * np.pi * df['day'] / 31)
+    df['month_sin'] = np.sin(2 * np.pi * df['month'] / 12)
+    df['month_cos'] = np.cos(2 * np.pi * df['month'] / 12)
+    df['dow_sin'] = np.sin(2 * np.pi * df['day_of_week_num'] / 7)
+    df['dow_cos'] = np.cos(2 * np.pi * df['day_of_week_num'] / 7)
+
+    # Cells 4-5: lags and rolling statistics
+    df = notebook_features(df)
+
+    # Cell 6: interactions
+    df['weekend_x_exam'] = df['is_weekend'].astype(int) * df['is_exam_period'].astype(int)
+    df['weekend_x_festival'] = df['is_weekend'].astype(int) * df['is_festival'].astype(int)
+    df['rainy_x_weekend'] = (df['weather'] == 'Rainy').astype(int) * df['is_weekend'].astype(int)
+    df['exam_x_festival'] = df['is_exam_period'].astype(int) * df['is_festival'].astype(int)
+    df['popularity_x_weekend'] = df['menu_popularity'] * df['is_weekend'].astype(int)
+    df['temp_x_rainy'] = df['temperature_c'] * (df['weather'] == 'Rainy').astype(int)
+
+    # Cell 7: menu
+    df['menu_count_last_7days'] = df.groupby('menu_item').cumcount()
+    df['menu_historical_avg'] = df['menu_item'].map(df.groupby('menu_item')['students_attended'].mean())
+    df['menu_historical_std'] = df['menu_item'].map(df.groupby('menu_item')['students_attended'].std())
+    df['is_popular_menu'] = df['menu_item'].isin(
+        ['Biryani', 'Chole-Bhature', 'Rice-Chicken', 'Puri-Bhaji', 'Dosa']).astype(int)
+    df['is_unpopular_menu'] = df['menu_item'].isin(['Khichdi', 'Rice-Curd-Pickle', 'Upma']).astype(int)
+
+    # Cell 8: aggregates
+    df['daily_total_attendance'] = df['date'].map(df.groupby('date')['students_attended'].sum())
+    df['daily_avg_attendance'] = df['date'].map(df.groupby('date')['students_attended'].mean())
+    df['pct_of_daily_attendance'] = df['students_attended'] / df['daily_total_attendance'] * 100
+    df['week_year'] = df['date'].dt.strftime('%Y-%W')
+    df['weekly_avg_attendance'] = df['week_year'].map(df.groupby('week_year')['students_attended'].mean())
+
+    # Cell 9: special events
+    df['special_conditions_count'] = (
+        df['is_exam_period'].astype(int) + df['is_festival'].astype(int) +
+        df['is_weekend'].astype(int) + df['is_start_semester'].astype(int) +
+        df['is_end_semester'].astype(int)
+    )
+    df['has_special_condition'] = (df['special_conditions_count'] > 0).astype(int)
+    df['is_normal_day'] = (df['special_conditions_count'] == 0).astype(int)
+
+    # Cell 10: ratios
+    df['meal_type_avg'] = df['meal_type'].map(df.groupby('meal_type')['students_attended'].mean())
+    df['deviation_from_meal_avg'] = df['students_attended'] - df['meal_type_avg']
+    df['pct_deviation_from_meal_avg'] = df['deviation_from_meal_avg'] / df['meal_type_avg'] * 100
+    df['dow_avg'] = df['day_of_week'].map(df.groupby('day_of_week')['students_attended'].mean())
+    df['deviation_from_dow_avg'] = df['students_attended'] - df['dow_avg']
+    df['temp_deviation'] = df['temperature_c'] - df['temperature_c'].mean()
+
+    # Cell 12: drop warm-up rows
+    return df.dropna()
+
+
+def check_parity(raw):
+    """Max absolute difference over the numeric features; string columns must match"""
+    expected = notebook_pipeline(raw).reset_index(drop=True)
+    actual = build_features(raw).reset_index(drop=True)
+    assert list(expected.columns) == list(actual.columns), "Column order differs"
+    assert (expected['week_year'] == actual['week_year']).all(), "week_year differs"
+
+    numeric = [c for c in FEATURE_ORDER if c != 'week_year']
+    a = expected[numeric].to_numpy(dtype=float)
+    b = actual[numeric].to_numpy(dtype=float)
+    return np.abs(a - b).max()
+
+
+def best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes=((1, '2024-10-24'), (1, '2034-12-31'), (1, '2124-12-31'), (10, '2124-12-31')),
+        repeat=3):
+    """Best-of-`repeat` wall time for both pipelines at each dataset size
+
+    Multi-campus data is benchmarked without campus_id so that both
+    pipelines group identically.
+    """
+    results = []
+    for n_campuses, end in sizes:
+        raw = generate_sharded_mess_data(make_campuses(n_campuses), '2024-01-01', end, workers=1)
+        raw = raw.drop(columns='campus_id')
+        runs = 1 if len(raw) > 1_000_000 else repeat
+        notebook_s = best_time(lambda: notebook_pipeline(raw), runs)
+        vectorized_s = best_time(lambda: build_features(raw), runs)
+        results.append({
+            'rows': len(raw),
+            'notebook_s': notebook_s,
+            'vectorized_s': vectorized_s,
+            'speedup': notebook_s / vectorized_s,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    raw = pd.read_csv('data/raw/college_mess_data.csv')
+
+    print("\n" + "="*60)
+    print("🧮 FEATURE PIPELINE PARITY (vs notebook 02)")
+    print("="*60)
+    print(f"Max abs difference over {len(raw)} raw rows: {check_parity(raw):.2e}")
+
+    print("\n" + "="*60)
+    print("⏱️  FEATURE PIPELINE SCALING")
+    print("="*60)
+    print(f"{'Rows':>12}{'Notebook (s)':>15}{'Vectorized (s)':>17}{'Speedup':>10}")
+    for r in run():
+        print(f"{r['rows']:>12,}{r['notebook_s']:>15.3f}{r['vectorized_s']:>17.3f}{r['speedup']:>9.1f}x")
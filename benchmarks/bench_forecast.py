@@ -0,0 +1,72 @@
+"""
+Forecast Latency Benchmark
+One batched forecast call vs. one prepare_features + predict round trip per (day, meal)
+"""
+
+import os
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.filterwarnings('ignore')
+
+import pandas as pd
+
+import predictor
+from generate_data import MEAL_TYPES, MenuScheduler
+
+
+def per_row_forecast(model, scaler, encoders, feature_names, start_date, n_days):
+    """The Predict-button path, repeated once per (day, meal)"""
+    menu = MenuScheduler().weekly_menu
+    predictions = []
+    for date in pd.date_range(start_date, periods=n_days, freq='D'):
+        for meal in MEAL_TYPES:
+            features = predictor.prepare_features_batch(
+                [date], [meal], [menu[date.day_name()][meal]], ['Sunny'], [28],
+                [False], [False], [False], encoders, feature_names
+            )
+            predictions.append(predictor.predict_batch(model, scaler, features)[0])
+    return predictions
+
+
+def run(horizons=(7, 30, 90), repeat=5):
+    """Best-of-`repeat` wall time for both paths at each horizon"""
+    model, scaler, encoders, feature_names = predictor.load_artifacts()
+    results = []
+    for n_days in horizons:
+        timings = {}
+        for name, fn in [
+            ('per_row', lambda: per_row_forecast(model, scaler, encoders, feature_names,
+                                                 '2024-11-01', n_days)),
+            ('batched', lambda: predictor.forecast(model, scaler, encoders, feature_names,
+                                                   '2024-11-01', n_days)),
+        ]:
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fn()
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+
+        results.append({
+            'days': n_days,
+            'cells': n_days * len(MEAL_TYPES),
+            'per_row_ms': timings['per_row'] * 1000,
+            'batched_ms': timings['batched'] * 1000,
+            'speedup': timings['per_row'] / timings['batched'],
+        })
+    return results
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("⏱️  FORECAST LATENCY")
+    print("="*60)
+    print(f"{'Days':>6}{'Cells':>8}{'Per-row (ms)':>15}{'Batched (ms)':>15}{'Speedup':>10}")
+    for r in run():
+        print(f"{r['days']:>6}{r['cells']:>8}{r['per_row_ms']:>15.1f}"
+              f"{r['batched_ms']:>15.1f}{r['speedup']:>9.1f}x")
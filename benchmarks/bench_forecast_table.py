@@ -0,0 +1,81 @@
+"""
+Forecast Table Benchmark
+Table lookups vs. live inference for the app's Predict and 14-day Forecast, with a parity check
+"""
+
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.filterwarnings('ignore')
+
+import pandas as pd
+
+import predictor
+from feature_store import OnlineFeatureStore
+from forecast_table import HISTORY_FILE, ForecastTable, build_table, write_table
+from model_bundle import load_bundle
+
+START = pd.Timestamp('2024-11-01')
+
+
+def best_of(fn, repeats=20):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    bundle = load_bundle()
+    store = OnlineFeatureStore.from_history(pd.read_csv(HISTORY_FILE, parse_dates=['date']))
+    model_args = (bundle.engine, None, bundle.encoders, bundle.feature_names)
+
+    start = time.perf_counter()
+    table = build_table(*model_args, START, feature_store=store)
+    build_s = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_table(table, os.path.join(tmp, 'table.parquet'), bundle_version=bundle.version)
+        start = time.perf_counter()
+        lookup = ForecastTable.load(path)
+        load_s = time.perf_counter() - start
+
+    # Every cell must equal the live Predict path
+    history = store.lookup_batch(table['meal_type'], table['date'].dt.day_name())
+    for i in range(len(table)):
+        row = table.iloc[i]
+        features = predictor.prepare_features_batch(
+            [row['date']], [row['meal_type']], [row['menu_item']], [row['weather']], [28],
+            [False], [False], [False], bundle.encoders, bundle.feature_names, history=history.iloc[[i]]
+        )
+        assert predictor.predict_batch(bundle.engine, None, features)[0] == row['predicted_students']
+
+    def live_predict():
+        history = store.lookup_batch(['Lunch'], ['Monday'])
+        features = predictor.prepare_features_batch(
+            [START + pd.Timedelta(days=3)], ['Lunch'], ['Biryani'], ['Sunny'], [28],
+            [False], [False], [False], bundle.encoders, bundle.feature_names, history=history
+        )
+        return predictor.predict_batch(bundle.engine, None, features)[0]
+
+    live_forecast = lambda: predictor.forecast(*model_args, START, 14, feature_store=store)
+    pd.testing.assert_frame_equal(live_forecast(), lookup.scheduled(START, 14, 'Sunny'), check_dtype=False)
+
+    print("\n" + "="*60)
+    print(f"📋 FORECAST TABLE ({len(table):,} cells, built in {build_s * 1e3:.0f} ms, loaded in {load_s * 1e3:.1f} ms)")
+    print("="*60)
+    print(f"{'Request':<20}{'Live (ms)':>12}{'Table (ms)':>12}{'Speedup':>10}")
+    for name, live, cached in [
+        ('Predict', live_predict, lambda: lookup.lookup(START + pd.Timedelta(days=3), 'Lunch', 'Biryani', 'Sunny')),
+        ('14-day Forecast', live_forecast, lambda: lookup.scheduled(START, 14, 'Sunny')),
+    ]:
+        live_s, table_s = best_of(live), best_of(cached)
+        print(f"{name:<20}{live_s * 1e3:>12.2f}{table_s * 1e3:>12.3f}{live_s / table_s:>9.0f}x")
+    print("\n✅ Every table cell matches live inference")
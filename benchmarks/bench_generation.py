@@ -0,0 +1,68 @@
+"""
+Generation Throughput Benchmark
+Compares the row-by-row generator against the vectorized NumPy engine
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_data as gd
+
+# (label, start_date, end_date)
+SCALES = [
+    ('1 semester', '2024-01-01', '2024-10-24'),
+    ('5 years', '2020-01-01', '2024-12-31'),
+    ('20 years', '2005-01-01', '2024-12-31'),
+]
+
+
+def time_call(fn, repeat=3):
+    """Best wall-clock time of `repeat` calls, plus the last result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(scales=SCALES, repeat=3):
+    """Time both engines at each scale and return a list of result dicts"""
+    results = []
+    for label, start_date, end_date in scales:
+        loop_s, loop_df = time_call(
+            lambda: gd.generate_college_mess_data(start_date, end_date, verbose=False),
+            repeat
+        )
+        vec_s, vec_df = time_call(
+            lambda: gd.generate_college_mess_data_vectorized(start_date, end_date, seed=42),
+            repeat
+        )
+        assert list(loop_df.columns) == list(vec_df.columns), "schema mismatch"
+
+        rows = len(vec_df)
+        results.append({
+            'scale': label,
+            'rows': rows,
+            'loop_s': loop_s,
+            'vectorized_s': vec_s,
+            'loop_rows_per_s': rows / loop_s,
+            'vectorized_rows_per_s': rows / vec_s,
+            'speedup': loop_s / vec_s,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    print("\n" + "="*72)
+    print("⏱️  DATA GENERATION THROUGHPUT")
+    print("="*72)
+    print(f"{'Scale':<12}{'Rows':>10}{'Loop (s)':>12}{'Vector (s)':>12}"
+          f"{'Vector rows/s':>16}{'Speedup':>10}")
+    for r in run():
+        print(f"{r['scale']:<12}{r['rows']:>10,}{r['loop_s']:>12.3f}{r['vectorized_s']:>12.4f}"
+              f"{r['vectorized_rows_per_s']:>16,.0f}{r['speedup']:>9.1f}x")
@@ -0,0 +1,110 @@
+"""
+Menu Planner Benchmark
+Batched slot scoring vs. one predict call per slot, and local search vs. exact and random-sampling baselines
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.filterwarnings('ignore')
+
+import numpy as np
+import pandas as pd
+
+import menu_planner
+import predictor
+from feature_store import OnlineFeatureStore
+from model_bundle import load_bundle
+
+HISTORY_FILE = 'data/raw/college_mess_data.csv'
+
+
+def per_slot_scores(bundle, store, week_start):
+    """The Predict-button path, once per (meal, day, item)"""
+    predicted = []
+    for meal, items in predictor.MENU_ITEMS.items():
+        for date in pd.date_range(week_start, periods=menu_planner.DAYS_PER_WEEK):
+            history = store.lookup_batch([meal], [date.day_name()])
+            for item in items:
+                features = predictor.prepare_features_batch(
+                    [date], [meal], [item], ['Sunny'], [28], [False], [False], [False],
+                    bundle.encoders, bundle.feature_names, history=history
+                )
+                predicted.append(predictor.predict_batch(bundle.engine, None, features)[0])
+    return np.array(predicted, dtype=float)
+
+
+def exact_waste_optimum(scores):
+    """Waste per student falls as expected students served rise, a sum of per-meal terms,
+    so the best of each meal's 7! orders by attendance gives the optimum"""
+    orders = np.array(list(itertools.permutations(range(menu_planner.DAYS_PER_WEEK))))
+    days = np.arange(menu_planner.DAYS_PER_WEEK)
+    week = np.tile(np.arange(scores.predicted.shape[2]), (len(scores.meal_types), 1))
+    for m in range(len(scores.meal_types)):
+        served = scores.predicted[m, days, orders]
+        week[m, :menu_planner.DAYS_PER_WEEK] = orders[served.sum(axis=1).argmax()]
+    return scores.cost(week, 'waste')
+
+
+def random_sampling(scores, objective, n_weeks, seed=0):
+    """Best of n_weeks random feasible weeks, for the same evaluation budget"""
+    rng = np.random.default_rng(seed)
+    best = np.inf
+    for start in range(0, n_weeks, 20_000):
+        weeks = scores.random_weeks(min(20_000, n_weeks - start), rng)
+        best = min(best, scores.cost(weeks, objective).min())
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark weekly menu planning")
+    parser.add_argument('--week-start', default='2024-11-04')
+    args = parser.parse_args()
+
+    bundle = load_bundle()
+    store = OnlineFeatureStore.from_history(pd.read_csv(HISTORY_FILE, parse_dates=['date']))
+    model_args = (bundle.engine, None, bundle.encoders, bundle.feature_names, args.week_start)
+
+    print("\n" + "="*64)
+    print("🗓️  SLOT SCORING (3 meals x 7 days x 7 items)")
+    print("="*64)
+    start = time.perf_counter()
+    slow = per_slot_scores(bundle, store, args.week_start)
+    per_slot_s = time.perf_counter() - start
+    start = time.perf_counter()
+    scores = menu_planner.score_week(*model_args, feature_store=store)
+    batched_s = time.perf_counter() - start
+    assert np.array_equal(scores.predicted.ravel(), slow), "batched scores differ from per-slot scores"
+    print(f"Per-slot predict calls: {per_slot_s * 1e3:8.1f} ms ({len(slow)} calls)")
+    print(f"One batched call:       {batched_s * 1e3:8.1f} ms ({per_slot_s / batched_s:.0f}x, identical scores)")
+
+    print("\n" + "="*64)
+    print("🔎 SEARCH")
+    print("="*64)
+    print(f"{'Objective':<10}{'Local search':>14}{'Seconds':>9}{'Weeks':>11}{'Random':>11}{'Exact':>11}")
+    for objective in menu_planner.OBJECTIVES:
+        result = menu_planner.local_search(scores, objective)
+        random_best = random_sampling(scores, objective, result['evaluated'])
+        exact = f"{exact_waste_optimum(scores):>11,.2f}" if objective == 'waste' else f"{'-':>11}"
+        print(f"{objective:<10}{result['cost']:>14,.2f}{result['seconds']:>9.2f}{result['evaluated']:>11,}"
+              f"{random_best:>11,.2f}{exact}")
+
+    # The plan plugs straight into forecast(), which must predict the same numbers
+    plan, weekly_menu, _ = menu_planner.plan_week(*model_args, objective='spread', feature_store=store)
+    check = predictor.forecast(*model_args, weekly_menu=weekly_menu, feature_store=store)
+    assert np.array_equal(check['predicted_students'].to_numpy(), plan['predicted_students'].to_numpy())
+
+    # Overlapping lists (the fixed rotation serves Roti-Paneer at lunch and dinner) exercise the fatigue check
+    menu_items = {meal: list(predictor.MENU_ITEMS[meal]) for meal in predictor.MENU_ITEMS}
+    menu_items['Dinner'].append('Roti-Paneer')
+    overlap = menu_planner.score_week(*model_args, menu_items=menu_items, feature_store=store)
+    result = menu_planner.local_search(overlap, 'waste')
+    print(f"\n✅ Plan matches forecast(weekly_menu=plan); overlapping lists: "
+          f"{result['violations']} fatigue violations")
@@ -0,0 +1,96 @@
+"""
+Model Registry Benchmark
+Request latency, loads and evictions of the per-mess LRU under different memory budgets,
+vs. loading every mess at startup and loading a bundle per request
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.filterwarnings('ignore')
+
+import numpy as np
+
+from model_bundle import BUNDLE_DIR, load_bundle
+from model_registry import ModelRegistry, bundle_dir
+
+
+def make_registry_dir(root, n_messes):
+    """n copies of the main bundle, one per mess id (loading cost is what matters here)"""
+    mess_ids = [f"M{i + 1:03d}" for i in range(n_messes)]
+    for mess_id in mess_ids:
+        shutil.copytree(BUNDLE_DIR, bundle_dir(mess_id, root))
+    return mess_ids
+
+
+def zipf_requests(mess_ids, n_requests, a=1.2, seed=0):
+    """Skewed traffic: a few busy messes, a long tail of quiet ones"""
+    rng = np.random.default_rng(seed)
+    weights = 1 / np.arange(1, len(mess_ids) + 1) ** a
+    return rng.choice(mess_ids, n_requests, p=weights / weights.sum())
+
+
+def timed_requests(get, requests):
+    latencies = np.empty(len(requests))
+    for i, mess_id in enumerate(requests):
+        start = time.perf_counter()
+        get(mess_id)
+        latencies[i] = time.perf_counter() - start
+    return latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the per-mess model registry")
+    parser.add_argument('--messes', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mess_ids = make_registry_dir(tmp, args.messes)
+        requests = zipf_requests(mess_ids, args.requests)
+        bundle = load_bundle(bundle_dir(mess_ids[0], tmp))
+        bundle.engine
+        per_bundle = bundle.nbytes()
+
+        print("\n" + "="*84)
+        print(f"📚 MODEL REGISTRY: {args.messes} messes, {args.requests:,} Zipf requests, "
+              f"{per_bundle / 1e3:.0f} KB per bundle")
+        print("="*84)
+        print(f"{'Strategy':<26}{'Resident MB':>12}{'Hit rate':>10}{'Loads':>8}{'Evictions':>11}"
+              f"{'p50 µs':>9}{'p99 ms':>8}")
+
+        start = time.perf_counter()
+        eager = {mess_id: load_bundle(bundle_dir(mess_id, tmp)) for mess_id in mess_ids}
+        for b in eager.values():
+            b.engine
+        startup = time.perf_counter() - start
+        latencies = timed_requests(eager.__getitem__, requests)
+        resident = sum(b.nbytes() for b in eager.values())
+        print(f"{'load all at startup':<26}{resident / 1e6:>12.2f}{'100%':>10}{args.messes:>8}{0:>11}"
+              f"{np.median(latencies) * 1e6:>9.1f}{np.percentile(latencies, 99) * 1e3:>8.2f}"
+              f"   ({startup:.2f} s startup)")
+        del eager
+
+        def per_request(mess_id):
+            load_bundle(bundle_dir(mess_id, tmp)).engine
+        latencies = timed_requests(per_request, requests)
+        print(f"{'load per request':<26}{per_bundle / 1e6:>12.2f}{'0%':>10}{args.requests:>8}{0:>11}"
+              f"{np.median(latencies) * 1e6:>9.1f}{np.percentile(latencies, 99) * 1e3:>8.2f}")
+
+        for fraction in (0.1, 0.25, 0.5, 1.0):
+            budget_mb = fraction * args.messes * per_bundle / 1e6
+            registry = ModelRegistry(budget_mb=budget_mb, registry_dir=tmp)
+            latencies = timed_requests(registry.get, requests)
+            stats = registry.stats()
+            print(f"{f'LRU, budget {fraction:.0%} of all':<26}{stats['resident_bytes'] / 1e6:>12.2f}"
+                  f"{stats['hit_rate']:>10.0%}{stats['loads']:>8}{stats['evictions']:>11}"
+                  f"{np.median(latencies) * 1e6:>9.1f}{np.percentile(latencies, 99) * 1e3:>8.2f}"
+                  f"   (load {stats['mean_load_ms']:.1f} ms)")
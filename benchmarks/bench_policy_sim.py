@@ -0,0 +1,59 @@
+"""
+Policy Simulator Benchmark
+Simulated meal-days per second by worker count, vs. calling the vectorized generator once per semester
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.filterwarnings('ignore')
+
+import numpy as np
+
+import policy_sim
+from generate_data import generate_college_mess_data_vectorized
+
+
+def per_semester_baseline(n_reps):
+    """One generator call per replicated semester, scored with the fixed 10% buffer"""
+    start = time.perf_counter()
+    for seed in range(n_reps):
+        df = generate_college_mess_data_vectorized(policy_sim.SEMESTER_START, policy_sim.SEMESTER_END, seed=seed)
+        df['food_wasted_kg'].sum()
+    elapsed = time.perf_counter() - start
+    return n_reps * len(df) / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the policy simulator")
+    parser.add_argument('--reps', type=int, default=10_000)
+    args = parser.parse_args()
+
+    worker_counts = sorted({1, 2, os.cpu_count() or 1})
+    print("\n" + "="*60)
+    print(f"🎲 POLICY SIMULATOR ({args.reps:,} semesters, {len(policy_sim.POLICIES)} policies)")
+    print("="*60)
+    print(f"{'Engine':<26}{'Seconds':>10}{'Meal-days/s':>16}")
+
+    baseline_rate = per_semester_baseline(50)
+    print(f"{'generator per semester':<26}{'':>10}{baseline_rate:>16,.0f}")
+
+    reference = None
+    for workers in worker_counts:
+        results, stats = policy_sim.run(args.reps, workers=workers)
+        print(f"{f'batched, {workers} worker(s)':<26}{stats['seconds']:>10.2f}{stats['meal_days_per_sec']:>16,.0f}")
+        if reference is None:
+            reference = results
+        else:
+            for name in results:
+                for metric in results[name]:
+                    assert np.array_equal(results[name][metric], reference[name][metric]), \
+                        "results depend on the worker count"
+
+    print(f"\n✅ Identical results for {', '.join(map(str, worker_counts))} workers")
@@ -0,0 +1,90 @@
+"""
+Retraining Benchmark
+Incremental retrain (new days only) vs. full refit, as history grows
+"""
+
+import argparse
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.filterwarnings('ignore')
+
+import pandas as pd
+
+import retrain
+from generate_data import START_DATE, generate_college_mess_data
+
+
+def make_models_dir(raw, data_end, directory):
+    """models/ as if fully trained on rows up to data_end, with its TrainingState"""
+    with open('models/label_encoders.pkl', 'rb') as f:
+        encoders = pickle.load(f)
+    with open('models/feature_names.pkl', 'rb') as f:
+        feature_names = list(pickle.load(f))
+    with open('models/model_metadata.json') as f:
+        metadata = json.load(f)
+
+    model, scaler, state, n_rows = retrain.full_refit(
+        raw[pd.to_datetime(raw['date']) <= data_end], encoders, feature_names, metadata['hyperparameters']
+    )
+    metadata.update({'training_samples': n_rows, 'data_end': str(state.data_end.date())})
+
+    os.makedirs(directory, exist_ok=True)
+    for name, obj in [('best_model.pkl', model), ('scaler.pkl', scaler),
+                      ('label_encoders.pkl', encoders), ('feature_names.pkl', feature_names)]:
+        with open(os.path.join(directory, name), 'wb') as f:
+            pickle.dump(obj, f)
+    with open(os.path.join(directory, 'model_metadata.json'), 'w') as f:
+        json.dump(metadata, f)
+    state.save(os.path.join(directory, retrain.STATE_FILE))
+
+
+def run(years=(1, 3, 5), new_days=30):
+    """Seconds to absorb `new_days` of data after `years` of history, both ways"""
+    results = []
+    for n_years in years:
+        end = pd.Timestamp(START_DATE) + pd.DateOffset(years=n_years) - pd.Timedelta(days=1)
+        raw = generate_college_mess_data(end_date=end.strftime('%Y-%m-%d'))
+        raw['date'] = pd.to_datetime(raw['date']).dt.strftime('%Y-%m-%d')
+        data_end = end - pd.Timedelta(days=new_days)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            raw_file = os.path.join(tmp, 'raw.csv')
+            raw.to_csv(raw_file, index=False)
+            base = os.path.join(tmp, 'base')
+            make_models_dir(raw, data_end, base)
+
+            row = {'years': n_years, 'history_rows': len(raw), 'new_days': new_days}
+            for mode, force_full in [('incremental', False), ('full', True)]:
+                models_dir = os.path.join(tmp, mode)
+                shutil.copytree(base, models_dir)
+                start = time.perf_counter()
+                summary = retrain.retrain(raw_file, models_dir, os.path.join(models_dir, 'bundle'),
+                                          drift_ratio=float('inf'), force_full=force_full, verbose=False)
+                row[f'{mode}_s'] = time.perf_counter() - start
+                row[f'{mode}_trees'] = summary['trees_after']
+            results.append(row)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time incremental retraining against full refits")
+    parser.add_argument('--new-days', type=int, default=30)
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print(f"🔁 RETRAIN {args.new_days} NEW DAYS")
+    print("="*60)
+    print(f"{'Years':>6}{'Rows':>8}{'Incremental (s)':>17}{'Full (s)':>10}{'Speedup':>9}{'Trees':>8}")
+    for r in run(new_days=args.new_days):
+        print(f"{r['years']:>6}{r['history_rows']:>8,}{r['incremental_s']:>17.2f}{r['full_s']:>10.2f}"
+              f"{r['full_s'] / r['incremental_s']:>8.1f}x{r['incremental_trees']:>8}")
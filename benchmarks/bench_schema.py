@@ -0,0 +1,68 @@
+"""
+Schema Loader Benchmark
+Memory per row and peak memory of schema.load_csv vs. a plain pd.read_csv, on multi-campus raw and feature CSVs
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.filterwarnings('ignore')
+
+import pandas as pd
+
+from features import build_features
+from generate_data import generate_sharded_mess_data, make_campuses
+from schema import load_csv
+
+
+def measure(load):
+    """(seconds, peak traced MB, resident bytes per row) of one load
+
+    Timed without tracing, since tracemalloc slows every allocation.
+    """
+    start = time.perf_counter()
+    df = load()
+    elapsed = time.perf_counter() - start
+    per_row = df.memory_usage(deep=True).sum() / len(df)
+    del df
+
+    tracemalloc.start()
+    load()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1e6, per_row
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the typed CSV loader")
+    parser.add_argument('--campuses', type=int, default=20)
+    parser.add_argument('--start-date', default='2015-01-01')
+    parser.add_argument('--end-date', default='2024-12-31')
+    args = parser.parse_args()
+
+    raw = generate_sharded_mess_data(make_campuses(args.campuses), args.start_date, args.end_date)
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {'raw': os.path.join(tmp, 'raw.csv'), 'features': os.path.join(tmp, 'features.csv')}
+        raw.to_csv(files['raw'], index=False)
+        build_features(raw).to_csv(files['features'], index=False)
+        n_rows = len(raw)
+        del raw
+
+        print("\n" + "="*72)
+        print(f"🧮 TYPED LOADING: {args.campuses} campuses, {args.start_date[:4]}-{args.end_date[:4]} ({n_rows:,} rows)")
+        print("="*72)
+        print(f"{'File':<10}{'Loader':<16}{'Seconds':>9}{'Peak MB':>10}{'Bytes/row':>11}{'Less memory':>13}")
+        for name, path in files.items():
+            default = measure(lambda: pd.read_csv(path, parse_dates=['date']))
+            typed = measure(lambda: load_csv(path))
+            for loader, (seconds, peak, per_row) in [('pd.read_csv', default), ('load_csv', typed)]:
+                ratio = f"{default[2] / per_row:>12.1f}x" if loader == 'load_csv' else ''
+                print(f"{name:<10}{loader:<16}{seconds:>9.2f}{peak:>10.0f}{per_row:>11,.0f}{ratio}")
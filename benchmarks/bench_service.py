@@ -0,0 +1,133 @@
+"""
+Prediction Service Load Test
+Starts service.py and drives it with concurrent keep-alive clients; reports throughput and p50/p99
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import numpy as np
+
+from generate_data import MEAL_TYPES
+
+WEATHER = ['Sunny', 'Cloudy', 'Rainy']
+
+
+async def request(reader, writer, method, path, payload=None):
+    """One HTTP/1.1 round trip on an open connection; returns (status, body)"""
+    body = b'' if payload is None else json.dumps(payload).encode()
+    writer.write(f'{method} {path} HTTP/1.1\r\nHost: localhost\r\n'
+                 f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n'.encode() + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(host, port, n_requests, seed, latencies):
+    rng = np.random.default_rng(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    for _ in range(n_requests):
+        payload = {
+            'date': f'2024-11-{rng.integers(1, 29):02d}',
+            'meal_type': MEAL_TYPES[rng.integers(len(MEAL_TYPES))],
+            'weather': WEATHER[rng.integers(len(WEATHER))],
+            'temperature': float(rng.integers(15, 40)),
+            'is_exam': bool(rng.random() < 0.2),
+        }
+        start = time.perf_counter()
+        status, _ = await request(reader, writer, 'POST', '/predict', payload)
+        latencies.append(time.perf_counter() - start)
+        assert status == 200, status
+    writer.close()
+
+
+async def load(host, port, concurrency, n_requests):
+    """Run `concurrency` clients splitting n_requests; returns stats and server health"""
+    latencies = []
+    per_client = n_requests // concurrency
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, per_client, seed, latencies)
+                           for seed in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, health = await request(reader, writer, 'GET', '/health')
+    writer.close()
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'throughput_rps': len(latencies) / elapsed,
+        'p50_ms': np.percentile(latencies_ms, 50),
+        'p99_ms': np.percentile(latencies_ms, 99),
+        'mean_batch_size': health['mean_batch_size'],
+    }
+
+
+def start_service(port, max_batch_size, max_wait_ms):
+    process = subprocess.Popen(
+        [sys.executable, 'service.py', '--port', str(port),
+         '--max-batch-size', str(max_batch_size), '--max-wait-ms', str(max_wait_ms)],
+        stdout=subprocess.PIPE, text=True
+    )
+    for line in process.stdout:           # wait for the "Serving" line
+        if 'Serving' in line:
+            return process
+    raise RuntimeError("service.py exited before serving")
+
+
+def run(configs=((1, 0.0), (8, 2.0), (32, 2.0), (64, 5.0)), concurrency=64, n_requests=4000,
+        port=8601):
+    """Load-test a fresh service for each (max_batch_size, max_wait_ms)"""
+    results = []
+    for max_batch_size, max_wait_ms in configs:
+        process = start_service(port, max_batch_size, max_wait_ms)
+        try:
+            stats = asyncio.run(load('127.0.0.1', port, concurrency, n_requests))
+        finally:
+            process.terminate()
+            process.wait()
+        results.append({'max_batch_size': max_batch_size, 'max_wait_ms': max_wait_ms, **stats})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the prediction service")
+    parser.add_argument('--concurrency', type=int, default=64, help="Concurrent keep-alive clients")
+    parser.add_argument('--requests', type=int, default=4000, help="Total requests per configuration")
+    parser.add_argument('--url', default=None,
+                        help="host:port of a running service (default: start one per configuration)")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print(f"🚦 PREDICTION SERVICE LOAD ({args.concurrency} clients, {args.requests:,} requests)")
+    print("="*60)
+    if args.url:
+        host, port = args.url.split(':')
+        stats = asyncio.run(load(host, int(port), args.concurrency, args.requests))
+        results = [{'max_batch_size': '-', 'max_wait_ms': '-', **stats}]
+    else:
+        results = run(concurrency=args.concurrency, n_requests=args.requests)
+
+    print(f"{'Max batch':>10}{'Wait (ms)':>11}{'Req/s':>9}{'p50 (ms)':>10}{'p99 (ms)':>10}{'Mean batch':>12}")
+    for r in results:
+        print(f"{r['max_batch_size']:>10}{r['max_wait_ms']:>11}{r['throughput_rps']:>9.0f}"
+              f"{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['mean_batch_size']:>12.1f}")
@@ -0,0 +1,58 @@
+"""
+Sharded Generation Scaling Benchmark
+Times generate_sharded_mess_data at increasing worker counts
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import generate_data as gd
+
+N_CAMPUSES = 20
+START_DATE = '2010-01-01'
+END_DATE = '2024-12-31'
+
+
+def run(n_campuses=N_CAMPUSES, start_date=START_DATE, end_date=END_DATE, worker_counts=None):
+    """Time the sharded run per worker count and check outputs are identical"""
+    if worker_counts is None:
+        cores = os.cpu_count() or 1
+        worker_counts = sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+
+    campuses = gd.make_campuses(n_campuses)
+    results = []
+    reference = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        df = gd.generate_sharded_mess_data(campuses, start_date, end_date, workers=workers)
+        elapsed = time.perf_counter() - start
+
+        if reference is None:
+            reference = df
+        else:
+            pd.testing.assert_frame_equal(reference, df)
+
+        results.append({
+            'workers': workers,
+            'rows': len(df),
+            'seconds': elapsed,
+            'rows_per_s': len(df) / elapsed,
+            'speedup': results[0]['seconds'] / elapsed if results else 1.0,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print(f"⏱️  SHARDED GENERATION: {N_CAMPUSES} campuses, {START_DATE} to {END_DATE}")
+    print("="*60)
+    print(f"{'Workers':>8}{'Rows':>12}{'Seconds':>10}{'Rows/s':>14}{'Speedup':>10}")
+    for r in run():
+        print(f"{r['workers']:>8}{r['rows']:>12,}{r['seconds']:>10.3f}"
+              f"{r['rows_per_s']:>14,.0f}{r['speedup']:>9.2f}x")
+    print("\n✅ Output identical for every worker count")
@@ -0,0 +1,61 @@
+"""
+What-If Sweep Benchmark
+One batched scenario_sweep call vs. one prediction per scenario (a sidebar change and rerun each)
+"""
+
+import os
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.filterwarnings('ignore')
+
+import numpy as np
+import pandas as pd
+
+import predictor
+from feature_store import OnlineFeatureStore
+from model_bundle import load_bundle
+
+HISTORY_FILE = 'data/raw/college_mess_data.csv'
+DATE, MEAL = '2024-11-07', 'Lunch'
+
+
+def per_scenario(bundle, store, grid):
+    history = store.lookup_batch([MEAL], [pd.Timestamp(DATE).day_name()])
+    predictions = []
+    for row in grid.itertuples():
+        features = predictor.prepare_features_batch(
+            [DATE], [MEAL], [row.menu_item], [row.weather], [row.temperature_c],
+            [row.is_exam], [row.is_festival], [row.is_start_sem],
+            bundle.encoders, bundle.feature_names, history=history
+        )
+        predictions.append(predictor.predict_batch(bundle.engine, None, features)[0])
+    return np.array(predictions)
+
+
+if __name__ == "__main__":
+    bundle = load_bundle()
+    store = OnlineFeatureStore.from_history(pd.read_csv(HISTORY_FILE, parse_dates=['date']))
+
+    print("\n" + "="*60)
+    print(f"🧪 WHAT-IF SWEEP ({MEAL}, {DATE})")
+    print("="*60)
+    print(f"{'Grid':<22}{'Cells':>7}{'Batched (ms)':>14}{'Per cell (ms)':>15}{'Speedup':>10}")
+    for label, items in [('1 menu item', ['Biryani']), (f'all {MEAL} items', predictor.MENU_ITEMS[MEAL])]:
+        args = (bundle.engine, None, bundle.encoders, bundle.feature_names, DATE, MEAL, items)
+        predictor.scenario_sweep(*args, feature_store=store)  # warm up
+        start = time.perf_counter()
+        sweep = predictor.scenario_sweep(*args, feature_store=store)
+        batched_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        slow = per_scenario(bundle, store, sweep)
+        per_cell_s = time.perf_counter() - start
+        assert np.array_equal(slow, sweep['predicted_students'].to_numpy()), "sweep differs from single predictions"
+        print(f"{label:<22}{len(sweep):>7,}{batched_s * 1e3:>14.1f}{per_cell_s * 1e3:>15.0f}"
+              f"{per_cell_s / batched_s:>9.0f}x")
+    print("\n✅ Batched sweep matches one prediction per scenario")
@@ -0,0 +1,99 @@
+"""
+Tree Engine Parity & Latency Benchmark
+TreeEnsemble (scaler folded) vs. scaler.transform + GradientBoostingRegressor.predict
+"""
+
+import os
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.filterwarnings('ignore')
+
+import numpy as np
+import pandas as pd
+
+import predictor
+from features import build_features
+from tree_engine import TreeEnsemble
+
+
+def test_split(encoders, feature_names):
+    """Notebook 03's chronological 20% test rows, rebuilt from the raw data"""
+    df = build_features(pd.read_csv('data/raw/college_mess_data.csv'), encoders=encoders)
+    X = df[feature_names].reset_index(drop=True)
+    return X.iloc[int(len(X) * 0.8):]
+
+
+def check_parity(model, scaler, engine, X_test):
+    """Bit-for-bit comparison on test_predictions.csv and on edge-of-split inputs"""
+    saved = pd.read_csv('data/processed/test_predictions.csv', float_precision='round_trip')
+    sklearn_pred = model.predict(scaler.transform(X_test))
+    engine_pred = engine.predict(X_test)
+    assert np.array_equal(sklearn_pred, saved['predicted'].to_numpy()), "sklearn no longer reproduces the file"
+    assert np.array_equal(engine_pred, saved['predicted'].to_numpy()), "engine differs from the file"
+
+    # Every split threshold, and the doubles either side of it, in some row
+    split = np.isfinite(engine.threshold)
+    edges = np.tile(X_test.to_numpy(dtype=float)[0], (3 * split.sum(), 1))
+    for j, (t, f) in enumerate(zip(engine.threshold[split], engine.feature[split])):
+        edges[3 * j:3 * j + 3, f] = [t, np.nextafter(t, np.inf), np.nextafter(t, -np.inf)]
+    assert np.array_equal(engine.predict(edges), model.predict(scaler.transform(edges))), \
+        "engine differs at a split edge"
+    return len(X_test), len(edges)
+
+
+def latency_us(fn, repeat):
+    """Per-call latencies in microseconds"""
+    timings = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings[i] = time.perf_counter() - start
+    return timings * 1e6
+
+
+def run(batch_sizes=(1, 10, 100, 1000, 10000), repeat=200):
+    """p50/p99 latency of both paths for DataFrame batches of each size"""
+    model, scaler, encoders, feature_names = predictor.load_artifacts()
+    engine = TreeEnsemble.from_model(model, scaler)
+    X_test = test_split(encoders, feature_names)
+
+    results = []
+    rng = np.random.default_rng(0)
+    for n in batch_sizes:
+        batch = X_test.iloc[rng.integers(0, len(X_test), n)]
+        n_repeat = max(5, repeat // max(1, n // 100))
+        sklearn_us = latency_us(lambda: model.predict(scaler.transform(batch)), n_repeat)
+        engine_us = latency_us(lambda: engine.predict(batch), n_repeat)
+        results.append({
+            'rows': n,
+            'sklearn_p50_us': np.percentile(sklearn_us, 50),
+            'sklearn_p99_us': np.percentile(sklearn_us, 99),
+            'engine_p50_us': np.percentile(engine_us, 50),
+            'engine_p99_us': np.percentile(engine_us, 99),
+            'speedup': np.percentile(sklearn_us, 50) / np.percentile(engine_us, 50),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    model, scaler, encoders, feature_names = predictor.load_artifacts()
+    engine = TreeEnsemble.from_model(model, scaler)
+
+    print("\n" + "="*60)
+    print("🧮 TREE ENGINE PARITY (bit-for-bit)")
+    print("="*60)
+    n_test, n_edges = check_parity(model, scaler, engine, test_split(encoders, feature_names))
+    print(f"✅ {n_test} test_predictions.csv rows and {n_edges} split-edge rows identical")
+
+    print("\n" + "="*60)
+    print("⏱️  TREE ENGINE LATENCY (µs per call)")
+    print("="*60)
+    print(f"{'Rows':>7}{'sklearn p50':>13}{'p99':>10}{'engine p50':>13}{'p99':>10}{'Speedup':>10}")
+    for r in run():
+        print(f"{r['rows']:>7,}{r['sklearn_p50_us']:>13.0f}{r['sklearn_p99_us']:>10.0f}"
+              f"{r['engine_p50_us']:>13.0f}{r['engine_p99_us']:>10.0f}{r['speedup']:>9.1f}x")
@@ -0,0 +1,114 @@
+"""
+Trends Cube Benchmark
+Historical trends dashboard from raw rows vs. from the pre-aggregated cube as history grows,
+cost of ingesting one day, and a check that incremental and rebuilt cubes agree with pandas
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.filterwarnings('ignore')
+
+import numpy as np
+
+from generate_data import generate_sharded_mess_data, make_campuses
+from trends_cube import TrendsCube
+
+STATS = ['mean', 'std', 'min', 'max']
+
+
+def dashboard_from_rows(raw, campus_id):
+    """The trends page computed directly from raw rows (what the cube replaces); campus None = all"""
+    rows = raw if campus_id is None else raw[raw['campus_id'] == campus_id]
+    return {
+        'meal': rows.groupby('meal_type')['students_attended'].agg(STATS),
+        'day': rows.groupby('day_of_week')['attendance_rate'].mean(),
+        'month': rows.groupby(['year', 'month'])[['students_attended', 'waste_percentage']].mean(),
+        'item': rows.groupby('menu_item')['waste_cost_rs'].sum(),
+        'daily_waste_cost': rows.groupby(['campus_id', 'date'], observed=True)['waste_cost_rs'].sum().mean(),
+    }
+
+
+def dashboard_from_cube(cube, campus_id):
+    """The same numbers as rollups of cube cells (as app.py's trends page)"""
+    by_meal = cube.rollup('meal_type', campus_id=campus_id)
+    by_month = cube.rollup(['year', 'month'], campus_id=campus_id)
+    return {
+        'meal': by_meal[[f'students_attended_{s}' for s in STATS]].set_axis(STATS, axis=1),
+        'day': cube.rollup('day_of_week', campus_id=campus_id)['attendance_rate_mean'],
+        'month': by_month[['students_attended_mean', 'waste_percentage_mean']],
+        'item': cube.rollup('menu_item', campus_id=campus_id)['waste_cost_rs_sum'],
+        'daily_waste_cost': cube.per_day('waste_cost_rs', campus_id=campus_id),
+    }
+
+
+def same_dashboard(a, b):
+    return (np.allclose(a['meal'].sort_index(), b['meal'].sort_index())
+            and np.allclose(a['day'].sort_index(), b['day'].sort_index())
+            and np.allclose(a['month'].sort_index(), b['month'].sort_index())
+            and np.allclose(a['item'].sort_index(), b['item'].sort_index())
+            and np.isclose(a['daily_waste_cost'], b['daily_waste_cost']))
+
+
+def timed(fn, repeats):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the historical trends cube")
+    parser.add_argument('--campuses', type=int, nargs='+', default=[4, 32, 128])
+    parser.add_argument('--start-date', default='2022-01-01')
+    parser.add_argument('--end-date', default='2024-10-24')
+    parser.add_argument('--repeats', type=int, default=10)
+    args = parser.parse_args()
+
+    print("\n" + "="*92)
+    print(f"📈 TRENDS CUBE: trends dashboard, history {args.start_date} → {args.end_date}")
+    print("="*92)
+    print(f"{'Campuses':>9}{'Raw rows':>12}{'Cells':>9}{'Dashboard':>12}{'Raw ms':>9}{'Cube ms':>9}{'Speedup':>9}"
+          f"{'Build s':>9}{'Ingest day ms':>15}")
+
+    for n_campuses in args.campuses:
+        raw = generate_sharded_mess_data(make_campuses(n_campuses), args.start_date, args.end_date)
+        campus_id = raw['campus_id'].iloc[0]
+        dates = np.sort(raw['date'].unique())
+        history, last_day = raw[raw['date'] < dates[-1]], raw[raw['date'] == dates[-1]]
+
+        start = time.perf_counter()
+        cube = TrendsCube.from_history(history)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        cube.ingest(last_day)
+        ingest = time.perf_counter() - start
+
+        for label, dashboard_campus in (('one campus', campus_id), ('all', None)):
+            from_rows = timed(lambda: dashboard_from_rows(raw, dashboard_campus), args.repeats)
+            from_cube = timed(lambda: dashboard_from_cube(cube, dashboard_campus), args.repeats)
+            assert same_dashboard(dashboard_from_rows(raw, dashboard_campus),
+                                  dashboard_from_cube(cube, dashboard_campus)), "cube and raw dashboards differ"
+            if dashboard_campus is None:
+                print(f"{'':>30}{label:>12}{from_rows * 1e3:>9.1f}{from_cube * 1e3:>9.1f}{from_rows / from_cube:>8.0f}x")
+            else:
+                print(f"{n_campuses:>9}{len(raw):>12,}{len(cube):>9,}{label:>12}{from_rows * 1e3:>9.1f}"
+                      f"{from_cube * 1e3:>9.1f}{from_rows / from_cube:>8.0f}x{build:>9.2f}{ingest * 1e3:>15.1f}")
+
+    # Day-by-day ingestion reaches the same cells as one rebuild
+    tail = raw[raw['date'] >= dates[-30]]
+    incremental = TrendsCube.from_history(raw[raw['date'] < dates[-30]])
+    for day, rows in tail.groupby('date'):
+        incremental.ingest(rows)
+    rebuilt = TrendsCube.from_history(raw)
+    a, b = incremental.cells.to_frame().sort_index(), rebuilt.cells.to_frame().sort_index()
+    assert a.index.equals(b.index) and np.allclose(a, b), "incremental and rebuilt cubes differ"
+    assert incremental.days.to_frame().sort_index().equals(rebuilt.days.to_frame().sort_index()), "day counts differ"
+    print("\n✅ 30 days ingested one at a time match a rebuild, and every dashboard matched pandas on raw rows")
@@ -0,0 +1,94 @@
+"""
+Hyperparameter Search Benchmark
+tuning.tune (successive halving + early stopping) vs. an exhaustive GridSearchCV on the same folds
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.filterwarnings('ignore')
+
+import numpy as np
+import pandas as pd
+
+import tuning
+from features import build_features
+from model_bundle import load_bundle
+
+
+def training_split():
+    bundle = load_bundle()
+    df = build_features(pd.read_csv('data/raw/college_mess_data.csv'), encoders=bundle.encoders)
+    train = df.iloc[:int(len(df) * 0.8)]
+    return train[bundle.feature_names], train['students_attended'], train['date']
+
+
+def grid_search(X, y, splits, candidates, n_estimators=(100, 200, 300)):
+    """Notebook-style search: every candidate x tree count refit from scratch on every fold"""
+    from sklearn.ensemble import GradientBoostingRegressor
+    from sklearn.model_selection import GridSearchCV
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    grid = [{**{f'gradientboostingregressor__{k}': [v] for k, v in params.items()},
+             'gradientboostingregressor__n_estimators': list(n_estimators)} for params in candidates]
+    search = GridSearchCV(make_pipeline(StandardScaler(), GradientBoostingRegressor(random_state=42)),
+                          grid, cv=splits, scoring='neg_root_mean_squared_error', n_jobs=-1)
+    search.fit(X, y)
+    best = {k.split('__')[1]: v for k, v in search.best_params_.items()}
+    return best, -search.best_score_, len(search.cv_results_['params']) * len(splits)
+
+
+def run(n_candidates=27, n_splits=5):
+    """Both searches over the same random sample of the Gradient Boosting grid"""
+    X, y, dates = training_split()
+    splits = tuning.rolling_origin_splits(len(X), n_splits, dates=dates)
+    candidates = tuning.param_candidates(tuning.PARAM_GRIDS['Gradient Boosting'], n_candidates)
+
+    start = time.perf_counter()
+    grid_best, grid_rmse, grid_fits = grid_search(X, y, splits, candidates)
+    grid_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = tuning.tune(X, y, 'Gradient Boosting', dates=dates, n_splits=n_splits,
+                         n_candidates=n_candidates, verbose=False)
+    halving_s = time.perf_counter() - start
+
+    # Score both winners on all folds the same way, so the comparison is fair
+    folds = tuning.FoldMatrices.build(X, y, splits)
+    def cv_rmse(params):
+        params = dict(params)
+        n = params.pop('n_estimators')
+        return float(np.mean([tuning.staged_rmse('Gradient Boosting', params, *folds.fold(i),
+                                                 n_estimators=n, patience=n)[-1]
+                              for i in range(folds.n_folds)]))
+
+    return [
+        {'search': 'grid', 'fits': grid_fits, 'seconds': grid_s, 'cv_rmse': cv_rmse(grid_best),
+         'best_params': grid_best},
+        {'search': 'halving', 'fits': result['fits'], 'seconds': halving_s,
+         'cv_rmse': cv_rmse(result['best_params']), 'best_params': result['best_params']},
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare successive halving with exhaustive grid search")
+    parser.add_argument('--candidates', type=int, default=27, help="Grid combinations sampled for both searches")
+    parser.add_argument('--splits', type=int, default=5)
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print(f"⚙️  HYPERPARAMETER SEARCH ({args.candidates} candidates, {args.splits} rolling-origin folds)")
+    print("="*60)
+    results = run(args.candidates, args.splits)
+
+    print(f"{'Search':>9}{'Fits':>7}{'Time (s)':>10}{'CV RMSE':>9}  Best parameters")
+    for r in results:
+        print(f"{r['search']:>9}{r['fits']:>7}{r['seconds']:>10.1f}{r['cv_rmse']:>9.2f}  {r['best_params']}")
+    print(f"\n⚡ Speedup: {results[0]['seconds'] / results[1]['seconds']:.1f}x")
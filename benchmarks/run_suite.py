@@ -0,0 +1,220 @@
+"""
+Benchmark Suite
+Generation, feature engineering, training, cold start and inference latency, saved as JSON
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import warnings
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.filterwarnings('ignore')
+
+import numpy as np
+import pandas as pd
+
+import bench_cold_start
+import bench_features
+import bench_generation
+import predictor
+from features import build_features
+from generate_data import MEAL_TYPES, MenuScheduler
+from model_bundle import load_bundle
+
+RESULTS_DIR = 'benchmarks/results'
+SECTIONS = ['generation', 'features', 'fit', 'cold_start', 'latency']
+
+# ============================================
+# SECTIONS
+# ============================================
+
+def bench_generation_section(quick):
+    scales = bench_generation.SCALES[:2] if quick else bench_generation.SCALES
+    return bench_generation.run(scales, repeat=1 if quick else 3)
+
+
+def bench_features_section(quick):
+    sizes = ((1, '2024-10-24'), (1, '2034-12-31')) if quick else \
+        ((1, '2024-10-24'), (1, '2034-12-31'), (1, '2124-12-31'), (10, '2124-12-31'))
+    return bench_features.run(sizes, repeat=1 if quick else 3)
+
+
+def bench_fit_section(quick):
+    """Refit the production model with its stored hyperparameters on notebook 03's split"""
+    from sklearn.ensemble import GradientBoostingRegressor
+    from sklearn.preprocessing import StandardScaler
+
+    _, _, encoders, feature_names = predictor.load_artifacts()
+    with open('models/model_metadata.json') as f:
+        metadata = json.load(f)
+
+    df = build_features(pd.read_csv('data/raw/college_mess_data.csv'), encoders=encoders)
+    X, y = df[feature_names], df['students_attended']
+    split = int(len(X) * 0.8)
+
+    results = []
+    for _ in range(1 if quick else 3):
+        start = time.perf_counter()
+        scaler = StandardScaler().fit(X.iloc[:split])
+        model = GradientBoostingRegressor(**metadata['hyperparameters'], random_state=42)
+        model.fit(scaler.transform(X.iloc[:split]), y.iloc[:split])
+        fit_s = time.perf_counter() - start
+
+        pred = model.predict(scaler.transform(X.iloc[split:]))
+        results.append({
+            'train_rows': split,
+            'fit_s': fit_s,
+            'test_rmse': float(np.sqrt(np.mean((pred - y.iloc[split:].to_numpy()) ** 2))),
+            'stored_test_rmse': metadata['performance']['test_rmse'],
+        })
+    return min(results, key=lambda r: r['fit_s'])
+
+
+def bench_cold_start_section(quick):
+    return bench_cold_start.run(repeat=3 if quick else 5)
+
+
+def _percentiles(seconds):
+    ms = np.asarray(seconds) * 1000
+    return {'p50_ms': np.percentile(ms, 50), 'p95_ms': np.percentile(ms, 95),
+            'p99_ms': np.percentile(ms, 99), 'calls': len(ms)}
+
+
+def bench_latency_section(quick):
+    """prepare_features_batch + predict per call, sklearn path and flat-array engine"""
+    model, scaler, encoders, feature_names = predictor.load_artifacts()
+    engine = load_bundle().engine
+    menu = MenuScheduler().weekly_menu
+    rng = np.random.default_rng(0)
+
+    def inputs(n):
+        dates = pd.Timestamp('2024-11-01') + pd.to_timedelta(rng.integers(0, 60, n), unit='D')
+        meals = np.array(MEAL_TYPES, dtype=object)[rng.integers(0, 3, n)]
+        menus = [menu[d.day_name()][m] for d, m in zip(dates, meals)]
+        weather = np.array(predictor.WEATHER_TYPES, dtype=object)[rng.integers(0, 3, n)]
+        return (dates, meals, menus, weather, rng.integers(15, 41, n).astype(float),
+                rng.random(n) < 0.2, rng.random(n) < 0.05, rng.random(n) < 0.05)
+
+    results = []
+    for label, n, calls in [('single', 1, 200), ('forecast_week', 21, 100), ('batch_1000', 1000, 20)]:
+        calls = max(5, calls // 4) if quick else calls
+        for path, fn in [
+            ('sklearn', lambda f: predictor.predict_batch(model, scaler, f)),
+            ('engine', lambda f: predictor.predict_batch(engine, None, f)),
+        ]:
+            timings = []
+            for _ in range(calls):
+                args = inputs(n)
+                start = time.perf_counter()
+                fn(predictor.prepare_features_batch(*args, encoders, feature_names))
+                timings.append(time.perf_counter() - start)
+            results.append({'case': label, 'rows': n, 'path': path, **_percentiles(timings)})
+    return results
+
+
+RUNNERS = {
+    'generation': bench_generation_section,
+    'features': bench_features_section,
+    'fit': bench_fit_section,
+    'cold_start': bench_cold_start_section,
+    'latency': bench_latency_section,
+}
+
+# ============================================
+# RESULTS
+# ============================================
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def environment():
+    import sklearn
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def flatten(results, prefix=''):
+    """{'a.b[case=x].c': number} for every numeric leaf, for comparing runs"""
+    flat = {}
+    if isinstance(results, dict):
+        for key, value in results.items():
+            flat.update(flatten(value, f'{prefix}.{key}' if prefix else key))
+    elif isinstance(results, list):
+        for i, item in enumerate(results):
+            labels = [f'{k}={item[k]}' for k in ('scale', 'case', 'rows', 'path')
+                      if isinstance(item, dict) and k in item]
+            flat.update(flatten(item, f"{prefix}[{','.join(labels) or i}]"))
+    elif isinstance(results, (int, float)) and not isinstance(results, bool):
+        flat[prefix] = float(results)
+    return flat
+
+
+def compare(old, new, threshold=0.10):
+    """Print time-like metrics that moved by more than `threshold` between two runs"""
+    old_flat, new_flat = flatten(old['results']), flatten(new['results'])
+    timed = [k for k in new_flat if k in old_flat and k.endswith(('_s', '_ms', '_us'))]
+    print(f"\n📊 {old['commit']} → {new['commit']} ({len(timed)} timings compared)")
+    for key in sorted(timed):
+        before, after = old_flat[key], new_flat[key]
+        change = (after - before) / before if before else 0.0
+        if abs(change) > threshold:
+            flag = '🔺 slower' if change > 0 else '🟢 faster'
+            print(f"   {flag} {change:+7.1%}  {key}: {before:.4g} → {after:.4g}")
+
+
+def save(report, results_dir=RESULTS_DIR):
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"{report['timestamp'].replace(':', '').replace(' ', '_')}"
+                                     f"_{report['commit']}.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, default=float)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and save results as JSON")
+    parser.add_argument('--only', default=','.join(SECTIONS),
+                        help=f"Comma-separated sections ({', '.join(SECTIONS)})")
+    parser.add_argument('--quick', action='store_true', help="Smaller scales and fewer repeats")
+    parser.add_argument('--compare', metavar='OLD_JSON', help="Flag timings that moved vs an earlier run")
+    parser.add_argument('--output-dir', default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'quick': args.quick,
+        'environment': environment(),
+        'results': {},
+    }
+    for section in args.only.split(','):
+        print(f"⏱️  {section}...", flush=True)
+        start = time.perf_counter()
+        report['results'][section] = RUNNERS[section](args.quick)
+        print(f"   done in {time.perf_counter() - start:.1f}s")
+
+    path = save(report, args.output_dir)
+    print(f"\n✅ Results saved to {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), json.loads(json.dumps(report, default=float)))
@@ -0,0 +1,170 @@
+"""
+Columnar Data I/O
+Streaming, month-partitioned Parquet storage for raw and processed mess data
+"""
+
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from schema import apply_schema
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+RAW_DATASET = 'data/raw/college_mess_data'
+PROCESSED_DATASET = 'data/processed/mess_data_with_features'
+
+# Hive partition key ('YYYY-MM'), derived from the date column
+PARTITION_COL = 'year_month'
+
+# ============================================
+# COMPACT DTYPES
+# ============================================
+
+def compact_dtypes(df):
+    """Return df with compact, chunk-independent dtypes from schema.SCHEMA
+
+    Declared columns get their registered dtype (labels categorical, flags
+    bool/int8, counters small ints, measurements float32). Undeclared
+    columns fall back on their dtype kind, never on the values in a chunk,
+    so every chunk of a stream gets the same schema.
+    """
+    return apply_schema(df)
+
+# ============================================
+# WRITER
+# ============================================
+
+def _iter_chunks(data, chunk_rows):
+    """Re-chunk a DataFrame or an iterable of DataFrames to ~chunk_rows rows
+
+    Large frames are sliced and small ones (e.g. one campus-year shard)
+    are buffered, so the dataset ends up with few, reasonably sized files.
+    """
+    if isinstance(data, pd.DataFrame):
+        data = [data]
+
+    buffer, buffered = [], 0
+    for frame in data:
+        for start in range(0, len(frame), chunk_rows):
+            piece = frame.iloc[start:start + chunk_rows]
+            buffer.append(piece)
+            buffered += len(piece)
+            if buffered >= chunk_rows:
+                yield pd.concat(buffer, ignore_index=True)
+                buffer, buffered = [], 0
+    if buffer:
+        yield pd.concat(buffer, ignore_index=True)
+
+
+def write_partitioned(data, root, chunk_rows=250_000, overwrite=True):
+    """Stream rows into a month-partitioned Parquet dataset under `root`
+
+    `data` is a DataFrame or any iterable of DataFrame chunks (e.g. the
+    shards from generate_data.iter_sharded_mess_data), so only one chunk
+    is held in memory at a time. Each chunk is written as one file per
+    `year_month=YYYY-MM/` directory. Returns the number of rows written.
+    """
+    if overwrite and os.path.isdir(root):
+        shutil.rmtree(root)
+    os.makedirs(root, exist_ok=True)
+
+    schema = None
+    n_rows = 0
+    for i, chunk in enumerate(_iter_chunks(data, chunk_rows)):
+        if chunk.empty:
+            continue
+        chunk = compact_dtypes(chunk)
+        chunk[PARTITION_COL] = pd.to_datetime(chunk['date']).dt.strftime('%Y-%m')
+        # Group each month's rows together so every file gets one row group
+        chunk = chunk.sort_values(PARTITION_COL, kind='stable')
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if schema is None:
+            schema = table.schema
+        else:
+            table = table.cast(schema)
+
+        pq.write_to_dataset(
+            table, root,
+            partition_cols=[PARTITION_COL],
+            basename_template=f"part-{i:05d}-{{i}}.parquet",
+            compression='zstd',
+        )
+        n_rows += len(chunk)
+    return n_rows
+
+
+def csv_to_partitioned(csv_path, root, chunk_rows=250_000):
+    """Convert a CSV file to a partitioned dataset without loading it whole"""
+    reader = pd.read_csv(csv_path, parse_dates=['date'], chunksize=chunk_rows)
+    return write_partitioned(reader, root, chunk_rows=chunk_rows)
+
+# ============================================
+# READER
+# ============================================
+
+def _date_filter(start_date, end_date):
+    """Dataset filter on the partition key (for pruning) and the date column"""
+    expr = None
+    if start_date is not None:
+        start = pd.Timestamp(start_date)
+        cond = ((ds.field(PARTITION_COL) >= start.strftime('%Y-%m')) &
+                (ds.field('date') >= pa.scalar(start)))
+        expr = cond
+    if end_date is not None:
+        end = pd.Timestamp(end_date)
+        cond = ((ds.field(PARTITION_COL) <= end.strftime('%Y-%m')) &
+                (ds.field('date') <= pa.scalar(end)))
+        expr = cond if expr is None else expr & cond
+    return expr
+
+
+def read_partitioned(root, columns=None, start_date=None, end_date=None):
+    """Load selected columns and an inclusive date range from a dataset
+
+    Only the month partitions overlapping [start_date, end_date] are
+    opened, and only `columns` (default: all) are decoded. Rows come back
+    month by month, in write order within each month.
+    """
+    dataset = ds.dataset(root, format='parquet', partitioning='hive')
+    if columns is None:
+        columns = [name for name in dataset.schema.names if name != PARTITION_COL]
+
+    table = dataset.to_table(columns=columns, filter=_date_filter(start_date, end_date))
+    return table.to_pandas()
+
+
+def dataset_size_bytes(root):
+    """Total on-disk size of a dataset directory or file"""
+    if os.path.isfile(root):
+        return os.path.getsize(root)
+    return sum(
+        os.path.getsize(os.path.join(dirpath, name))
+        for dirpath, _, names in os.walk(root)
+        for name in names
+    )
+
+# ============================================
+# MAIN EXECUTION
+# ============================================
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert mess CSVs to partitioned Parquet")
+    parser.add_argument('csv', nargs='?', default='data/processed/mess_data_with_features.csv')
+    parser.add_argument('root', nargs='?', default=PROCESSED_DATASET)
+    args = parser.parse_args()
+
+    rows = csv_to_partitioned(args.csv, args.root)
+    csv_mb = os.path.getsize(args.csv) / 1e6
+    pq_mb = dataset_size_bytes(args.root) / 1e6
+    print(f"✅ Wrote {rows:,} rows to {args.root}")
+    print(f"   CSV: {csv_mb:.2f} MB → Parquet: {pq_mb:.2f} MB ({csv_mb / pq_mb:.1f}x smaller)")
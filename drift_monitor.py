@@ -0,0 +1,392 @@
+"""
+Drift Monitor
+Constant-memory streaming statistics of live model inputs and residuals, compared against the training data
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+import predictor
+from retrain import DRIFT_RATIO
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+N_BINS = 10                # per-feature histogram bins, at training deciles
+RESIDUAL_DAYS = 28         # days of actuals in the rolling RMSE
+MIN_ROWS = 100             # live rows before a feature gets a drift status
+
+# Population stability index: < 0.1 stable, 0.1-0.2 moderate shift, > 0.2 significant
+PSI_WARN = 0.1
+PSI_ALERT = 0.2
+Z_ALERT = 0.5              # |live mean - training mean| in training standard deviations
+PSI_FLOOR = 1e-4           # bin share floor, so empty bins do not make the PSI infinite
+
+# Raw columns an actual needs: the request inputs plus what was served
+ACTUAL_COLUMNS = ['date', 'meal_type', 'menu_item', 'weather', 'temperature_c', 'is_exam_period',
+                  'is_festival', 'is_start_semester', 'students_attended', 'food_wasted_kg']
+ACTUAL_NUMERIC = ['temperature_c', 'is_exam_period', 'is_festival', 'is_start_semester',
+                  'students_attended', 'food_wasted_kg']
+
+# ============================================
+# STREAMING STATISTICS
+# ============================================
+
+def combine_moments(n_a, mean_a, m2_a, n_b, mean_b, m2_b):
+    """Chan et al.'s pairwise update: (count, mean, M2) of two disjoint sets of rows
+
+    M2 is the sum of squared deviations from the mean (variance = M2 / n).
+    Works elementwise on per-feature arrays, and is exact in any merge order.
+    """
+    n = n_a + n_b
+    if n == 0:
+        return n, mean_a, m2_a
+    delta = mean_b - mean_a
+    mean = mean_a + delta * (n_b / n)
+    m2 = m2_a + m2_b + delta ** 2 * (n_a * n_b / n)
+    return n, mean, m2
+
+
+class DriftReference:
+    """What the model was trained on: the scaler's mean_/var_, decile bin edges and bin shares, baseline RMSE
+
+    Built from the training rows themselves (build_features over the raw
+    history up to the model's data end), whose mean and variance equal the
+    scaler's. `version` is the bundle version the statistics belong to.
+    """
+
+    def __init__(self, feature_names, mean, var, edges, expected, baseline_rmse, version=None):
+        self.feature_names = list(feature_names)
+        self.mean = np.asarray(mean, dtype=float)
+        self.var = np.asarray(var, dtype=float)
+        self.edges = np.asarray(edges, dtype=float)          # (n_features, N_BINS - 1) interior edges
+        self.expected = np.asarray(expected, dtype=float)    # (n_features, N_BINS) training bin shares
+        self.baseline_rmse = float(baseline_rmse)
+        self.version = version
+
+    @classmethod
+    def from_training(cls, X, scaler, baseline_rmse, version=None, n_bins=N_BINS):
+        """Reference for training matrix X (rows x features, in scaler order)"""
+        X = np.asarray(X, dtype=float)
+        edges = np.quantile(X, np.linspace(0, 1, n_bins + 1)[1:-1], axis=0).T
+        counts = bin_counts(X, edges)
+        return cls(scaler.feature_names_in_, scaler.mean_, scaler.var_, edges,
+                   counts / counts.sum(axis=1, keepdims=True), baseline_rmse, version)
+
+    @classmethod
+    def from_bundle(cls, bundle, raw):
+        """Reference for a bundle, from the raw history it was trained on"""
+        training = training_rows(bundle, raw)
+        return cls.from_training(training[bundle.feature_names], bundle.scaler,
+                                 bundle.metadata['performance']['test_rmse'], bundle.version)
+
+
+def training_rows(bundle, raw):
+    """The bundle's training rows, as build_features output
+
+    They end at metadata['data_end'] or, for bundles that record none, are
+    the first metadata['training_samples'] rows (notebook 03's split), as
+    in retrain.
+    """
+    from features import build_features
+
+    df = build_features(raw, encoders=bundle.encoders)
+    data_end = bundle.metadata.get('data_end')
+    if data_end is None:
+        return df.iloc[:bundle.metadata['training_samples']]
+    return df[df['date'] <= pd.Timestamp(data_end)]
+
+
+def bin_counts(X, edges):
+    """Rows of X per histogram bin, shape (n_features, n_bins)
+
+    A value goes in the bin after the last edge it exceeds, so values outside
+    the training range land in the first or last bin.
+    """
+    X = np.asarray(X, dtype=float)
+    bins = (X[:, :, None] > edges[None, :, :]).sum(axis=2)
+    n_features, n_bins = edges.shape[0], edges.shape[1] + 1
+    flat = bins + np.arange(n_features) * n_bins
+    return np.bincount(flat.ravel(), minlength=n_features * n_bins).reshape(n_features, n_bins)
+
+
+def psi(expected, actual, floor=PSI_FLOOR):
+    """Population stability index per row of bin shares"""
+    expected = np.maximum(expected, floor)
+    actual = np.maximum(actual, floor)
+    return ((actual - expected) * np.log(actual / expected)).sum(axis=-1)
+
+# ============================================
+# MONITOR
+# ============================================
+
+class DriftMonitor:
+    """Running moments and histograms of live features, and daily residual sums of actuals
+
+    Memory is fixed by the feature count and RESIDUAL_DAYS, however many
+    rows are observed. observe() takes feature matrices (a prediction
+    request's features); observe_residuals() takes actual headcounts with
+    what was predicted for them. snapshot() is a small JSON-serializable
+    dict, and merge() adds one in exactly, so worker processes can each
+    monitor their own traffic and a collector sums them. Thread-safe.
+    """
+
+    def __init__(self, reference, residual_days=RESIDUAL_DAYS):
+        self.reference = reference
+        self.residual_days = residual_days
+        n_features, n_bins = reference.expected.shape
+        self.count = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.counts = np.zeros((n_features, n_bins), dtype=np.int64)
+        self.residuals = {}    # 'YYYY-MM-DD' -> [sum of squared errors, rows]
+        self.lock = threading.Lock()
+
+    # ---------- observation ----------
+
+    def observe(self, features):
+        """Add prediction inputs (DataFrame or array in the reference's feature order)"""
+        if hasattr(features, 'columns') and list(features.columns) != self.reference.feature_names:
+            features = features[self.reference.feature_names]
+        X = np.asarray(features, dtype=float)
+        if X.ndim == 1:
+            X = X[None, :]
+        if not len(X):
+            return
+        batch_mean = X.mean(axis=0)
+        batch_m2 = ((X - batch_mean) ** 2).sum(axis=0)
+        counts = bin_counts(X, self.reference.edges)
+        with self.lock:
+            self.count, self.mean, self.m2 = combine_moments(self.count, self.mean, self.m2,
+                                                             len(X), batch_mean, batch_m2)
+            self.counts += counts
+
+    def observe_residuals(self, dates, predicted, actual):
+        """Add actual headcounts and their predictions; dates may be one value or one per row"""
+        errors = np.asarray(actual, dtype=float) - np.asarray(predicted, dtype=float)
+        days = pd.DatetimeIndex(np.broadcast_to(pd.to_datetime(np.atleast_1d(dates)).values,
+                                                errors.shape)).strftime('%Y-%m-%d')
+        sums = pd.Series(errors ** 2).groupby(days).agg(['sum', 'count'])
+        with self.lock:
+            for day, (sum_sq, n) in zip(sums.index, sums.to_numpy()):
+                entry = self.residuals.setdefault(day, [0.0, 0])
+                entry[0] += float(sum_sq)
+                entry[1] += int(n)
+            self._prune()
+
+    def _prune(self):
+        """Keep only the latest residual_days days (lock held)"""
+        if self.residuals:
+            cutoff = pd.Timestamp(max(self.residuals)) - pd.Timedelta(days=self.residual_days - 1)
+            for day in [d for d in self.residuals if pd.Timestamp(d) < cutoff]:
+                del self.residuals[day]
+
+    # ---------- snapshot / merge ----------
+
+    def snapshot(self):
+        """State as plain lists and numbers (JSON-serializable), tagged with the reference version"""
+        with self.lock:
+            return {
+                'version': self.reference.version,
+                'count': self.count,
+                'mean': self.mean.tolist(),
+                'm2': self.m2.tolist(),
+                'counts': self.counts.tolist(),
+                'residuals': {day: list(entry) for day, entry in self.residuals.items()},
+            }
+
+    def merge(self, snapshot):
+        """Add another monitor's snapshot (same reference version) into this one"""
+        if snapshot['version'] != self.reference.version:
+            raise ValueError(f"Snapshot is for bundle {snapshot['version']}, "
+                             f"this monitor for {self.reference.version}")
+        with self.lock:
+            self.count, self.mean, self.m2 = combine_moments(
+                self.count, self.mean, self.m2,
+                snapshot['count'], np.asarray(snapshot['mean']), np.asarray(snapshot['m2']))
+            self.counts += np.asarray(snapshot['counts'], dtype=np.int64)
+            for day, (sum_sq, n) in snapshot['residuals'].items():
+                entry = self.residuals.setdefault(day, [0.0, 0])
+                entry[0] += sum_sq
+                entry[1] += n
+            self._prune()
+        return self
+
+    @classmethod
+    def from_snapshots(cls, reference, snapshots):
+        monitor = cls(reference)
+        for snapshot in snapshots:
+            monitor.merge(snapshot)
+        return monitor
+
+    # ---------- report ----------
+
+    def feature_report(self):
+        """One row per feature, most shifted first: live vs. training mean, z-shift, variance ratio, PSI, status
+
+        z_shift is the live mean's distance from the scaler's mean_ in
+        training standard deviations; var_ratio is live variance over the
+        scaler's var_. Status is 'alert' past PSI_ALERT or Z_ALERT, 'warn'
+        past PSI_WARN, and 'too few rows' until MIN_ROWS are observed.
+        """
+        reference = self.reference
+        with self.lock:
+            count, mean, m2, counts = self.count, self.mean.copy(), self.m2.copy(), self.counts.copy()
+        std = np.sqrt(reference.var)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_shift = np.where(std > 0, (mean - reference.mean) / std, 0.0)
+            var_ratio = np.where(reference.var > 0, (m2 / max(count, 1)) / reference.var, np.nan)
+        scores = psi(reference.expected, counts / max(count, 1))
+        status = np.select(
+            [count < MIN_ROWS, (scores > PSI_ALERT) | (np.abs(z_shift) > Z_ALERT), scores > PSI_WARN],
+            ['too few rows', 'alert', 'warn'], default='ok')
+        report = pd.DataFrame({
+            'live_mean': mean,
+            'train_mean': reference.mean,
+            'z_shift': z_shift,
+            'var_ratio': var_ratio,
+            'psi': scores,
+            'status': status,
+        }, index=pd.Index(reference.feature_names, name='feature'))
+        return report.sort_values('psi', ascending=False)
+
+    def residual_summary(self):
+        """Rolling RMSE of the last residual_days days of actuals against the model's test RMSE"""
+        with self.lock:
+            sum_sq = sum(entry[0] for entry in self.residuals.values())
+            n = sum(entry[1] for entry in self.residuals.values())
+            days = sorted(self.residuals)
+        rmse = float(np.sqrt(sum_sq / n)) if n else None
+        baseline = self.reference.baseline_rmse
+        return {
+            'rolling_rmse': rmse,
+            'baseline_rmse': baseline,
+            'ratio': None if rmse is None else rmse / baseline,
+            'drifted': rmse is not None and rmse > DRIFT_RATIO * baseline,
+            'rows': n,
+            'first_day': days[0] if days else None,
+            'last_day': days[-1] if days else None,
+        }
+
+    def summary(self):
+        report = self.feature_report()
+        return {
+            'version': self.reference.version,
+            'rows': self.count,
+            'alerts': report.index[report['status'] == 'alert'].tolist(),
+            'warnings': report.index[report['status'] == 'warn'].tolist(),
+            'residuals': self.residual_summary(),
+        }
+
+# ============================================
+# ACTUALS
+# ============================================
+
+def validate_actuals(raw, encoders):
+    """Actual rows checked and typed before anything is ingested; raises ValueError
+
+    Every row needs ACTUAL_COLUMNS: a parseable date, a meal and weather
+    the encoders know, a menu item and numeric counts and flags. A (date,
+    meal) may appear once. Returns a copy with parsed dates and floats.
+    """
+    if len(raw) == 0:
+        raise ValueError("No actual rows given")
+    missing = sorted(set(ACTUAL_COLUMNS) - set(raw.columns))
+    if missing:
+        raise ValueError(f"Actuals need {missing}")
+    raw = raw.copy()
+
+    dates = raw['date']
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        # Strings only: pandas would read a bare number as nanoseconds since 1970
+        dates = pd.to_datetime(dates.map(lambda v: v if isinstance(v, str) else None), errors='coerce')
+    if dates.isna().any():
+        raise ValueError(f"Invalid date in rows {raw.index[dates.isna()].tolist()} (use YYYY-MM-DD)")
+    raw['date'] = dates
+    for col, key in [('meal_type', 'meal'), ('weather', 'weather')]:
+        unknown = raw[col].map(lambda v: not isinstance(v, str) or v not in encoders[key].classes_)
+        if unknown.any():
+            raise ValueError(f"Unknown {col} {raw.loc[unknown, col].unique().tolist()}")
+    if raw['menu_item'].map(lambda v: not isinstance(v, str)).any():
+        raise ValueError("Every actual needs a menu_item")
+    for col in ACTUAL_NUMERIC:
+        values = pd.to_numeric(raw[col].map(lambda v: v if not isinstance(v, str) else None), errors='coerce')
+        if values.isna().any():
+            raise ValueError(f"Non-numeric {col} in rows {raw.index[values.isna()].tolist()}")
+        raw[col] = values.astype(float)
+    duplicated = raw.duplicated(['date', 'meal_type'])
+    if duplicated.any():
+        raise ValueError(f"Duplicate (date, meal_type) in rows {raw.index[duplicated].tolist()}")
+    return raw
+
+
+def ingest_actuals(monitor, raw, engine, encoders, feature_names, feature_store=None, params=None):
+    """Score raw actuals as they arrive, then ingest them into the feature store
+
+    Each day is predicted from the inputs it actually had (menu, weather,
+    temperature, flags) and the store's history before that day, exactly
+    as a request made the day before would have been. Its features and
+    residuals go to the monitor, and the day is ingested before the next.
+    Every row is validated first (validate_actuals), so a bad row changes
+    nothing. Returns the predictions, aligned with raw's index.
+    """
+    raw = validate_actuals(raw, encoders)
+    predictions = pd.Series(0, index=raw.index)
+    capacity = predictor.mess_params(params)['total_capacity']
+    for date, day in raw.sort_values(['date', 'meal_type'], kind='stable').groupby('date', sort=True):
+        history = None
+        if feature_store is not None:
+            history = feature_store.lookup_batch(day['meal_type'], day['date'].dt.day_name())
+        features = predictor.prepare_features_batch(
+            day['date'], day['meal_type'].to_numpy(object), day['menu_item'].to_numpy(object),
+            day['weather'].to_numpy(object), day['temperature_c'], day['is_exam_period'], day['is_festival'],
+            day['is_start_semester'], encoders, feature_names, history=history, params=params
+        )
+        predicted = predictor.predict_batch(engine, None, features, capacity)
+        monitor.observe(features)
+        monitor.observe_residuals(date, predicted, day['students_attended'])
+        predictions[day.index] = predicted
+        if feature_store is not None:
+            feature_store.ingest_day(day.assign(day_of_week=day['date'].dt.day_name()))
+    return predictions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from feature_store import OnlineFeatureStore
+    from model_bundle import BUNDLE_DIR, load_bundle
+
+    parser = argparse.ArgumentParser(description="Replay actuals newer than the model's training data "
+                                                 "through the drift monitor")
+    parser.add_argument('--history', default='data/raw/college_mess_data.csv')
+    parser.add_argument('--bundle-dir', default=BUNDLE_DIR)
+    parser.add_argument('--top', type=int, default=10, help="features to list")
+    args = parser.parse_args()
+
+    bundle = load_bundle(args.bundle_dir)
+    raw = pd.read_csv(args.history, parse_dates=['date'])
+    monitor = DriftMonitor(DriftReference.from_bundle(bundle, raw))
+
+    # The store starts where the training data ends; everything after is "live"
+    training_end = training_rows(bundle, raw)['date'].max()
+    store = OnlineFeatureStore.from_history(raw[raw['date'] <= training_end])
+    live = raw[raw['date'] > training_end]
+    ingest_actuals(monitor, live, bundle.engine, bundle.encoders, bundle.feature_names, store, bundle.params)
+
+    report = monitor.feature_report()
+    residuals = monitor.residual_summary()
+    print("\n" + "="*78)
+    print(f"📈 DRIFT: {len(live):,} actuals after {training_end:%Y-%m-%d} vs. bundle {bundle.version}")
+    print("="*78)
+    print(f"{'Feature':<30}{'Live mean':>11}{'Train mean':>12}{'z-shift':>9}{'PSI':>8}  Status")
+    for name, row in report.head(args.top).iterrows():
+        print(f"{name:<30}{row['live_mean']:>11.2f}{row['train_mean']:>12.2f}{row['z_shift']:>9.2f}"
+              f"{row['psi']:>8.3f}  {row['status']}")
+    print(f"\n{'⚠️ ' if residuals['drifted'] else '✅'} Rolling RMSE ({residuals['first_day']} to "
+          f"{residuals['last_day']}): {residuals['rolling_rmse']:.2f} vs. baseline "
+          f"{residuals['baseline_rmse']:.2f} (x{residuals['ratio']:.2f}, retrain past x{DRIFT_RATIO})")
+    print(f"   {(report['status'] == 'alert').sum()} features in alert, {(report['status'] == 'warn').sum()} warning")
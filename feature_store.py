@@ -0,0 +1,225 @@
+"""
+Online Feature Store
+Constant-time lag and rolling attendance features, updated as daily actuals arrive
+"""
+
+import pickle
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+LAGS = (1, 7, 14)
+ROLLING_WINDOWS = (3, 7, 14)
+EXTREMES_WINDOW = 7
+
+# Feature columns served by the store (notebook 02, cells 4 and 5)
+HISTORY_FEATURES = (
+    [f'students_lag_{lag}' for lag in LAGS] +
+    [f'waste_lag_{lag}' for lag in LAGS] +
+    ['students_same_day_last_week'] +
+    [f'students_roll_{w}d_{stat}' for w in ROLLING_WINDOWS for stat in ('mean', 'std')] +
+    [f'students_roll_{EXTREMES_WINDOW}d_max', f'students_roll_{EXTREMES_WINDOW}d_min']
+)
+
+# ============================================
+# RING BUFFER SERIES
+# ============================================
+
+class RingSeries:
+    """Fixed-size history of one series with O(1) lags and rolling stats
+
+    Keeps the last `size` values in a ring buffer, a running sum and sum of
+    squares per rolling window, and monotonic deques for the rolling
+    max/min. Rolling windows follow pandas `rolling(w, min_periods=1)`:
+    they cover the latest min(w, count) values, std uses ddof=1.
+    """
+
+    def __init__(self, size=max(LAGS), windows=(), extremes_window=None):
+        self.size = size
+        self.values = np.zeros(size)
+        self.count = 0
+        self.windows = tuple(windows)
+        self.sums = {w: 0.0 for w in self.windows}
+        self.sumsq = {w: 0.0 for w in self.windows}
+        self.extremes_window = extremes_window
+        self.max_deque = deque()  # (index, value), values decreasing
+        self.min_deque = deque()  # (index, value), values increasing
+
+    def lag(self, k):
+        """Value k steps back from the latest (k=1 is the latest), NaN if unseen"""
+        if k > self.count or k > self.size:
+            return np.nan
+        return self.values[(self.count - k) % self.size]
+
+    def push(self, x):
+        """Append a value, updating every window in O(1)"""
+        x = float(x)
+        for w in self.windows:
+            if self.count >= w:
+                leaving = self.lag(w)
+                self.sums[w] -= leaving
+                self.sumsq[w] -= leaving * leaving
+            self.sums[w] += x
+            self.sumsq[w] += x * x
+
+        self.values[self.count % self.size] = x
+        index = self.count
+        self.count += 1
+
+        if self.extremes_window:
+            oldest = index - self.extremes_window
+            while self.max_deque and self.max_deque[-1][1] <= x:
+                self.max_deque.pop()
+            self.max_deque.append((index, x))
+            if self.max_deque[0][0] <= oldest:
+                self.max_deque.popleft()
+
+            while self.min_deque and self.min_deque[-1][1] >= x:
+                self.min_deque.pop()
+            self.min_deque.append((index, x))
+            if self.min_deque[0][0] <= oldest:
+                self.min_deque.popleft()
+
+    def mean(self, w):
+        n = min(self.count, w)
+        return self.sums[w] / n if n else np.nan
+
+    def std(self, w):
+        n = min(self.count, w)
+        if n < 2:
+            return np.nan
+        mean = self.sums[w] / n
+        var = (self.sumsq[w] - n * mean * mean) / (n - 1)
+        return float(np.sqrt(max(var, 0.0)))
+
+    def max(self):
+        return self.max_deque[0][1] if self.max_deque else np.nan
+
+    def min(self):
+        return self.min_deque[0][1] if self.min_deque else np.nan
+
+# ============================================
+# FEATURE STORE
+# ============================================
+
+class OnlineFeatureStore:
+    """Per-meal attendance/waste history serving notebook-02 lag and rolling features
+
+    Series are keyed by meal_type, and by (meal_type, day_of_week) for
+    students_same_day_last_week. Ingesting a row and looking up features
+    are both O(1), independent of how much history has been seen.
+    """
+
+    def __init__(self):
+        self.students = {}
+        self.waste = {}
+        self.same_day = {}
+        self.last_date = None
+
+    def _series(self, meal_type):
+        if meal_type not in self.students:
+            self.students[meal_type] = RingSeries(
+                windows=ROLLING_WINDOWS, extremes_window=EXTREMES_WINDOW
+            )
+            self.waste[meal_type] = RingSeries()
+        return self.students[meal_type], self.waste[meal_type]
+
+    def _rolling(self, students):
+        features = {}
+        for w in ROLLING_WINDOWS:
+            features[f'students_roll_{w}d_mean'] = students.mean(w)
+            features[f'students_roll_{w}d_std'] = students.std(w)
+        features[f'students_roll_{EXTREMES_WINDOW}d_max'] = students.max()
+        features[f'students_roll_{EXTREMES_WINDOW}d_min'] = students.min()
+        return features
+
+    def ingest(self, meal_type, day_of_week, students_attended, food_wasted_kg, date=None):
+        """Add one meal's actuals and return that row's features
+
+        The returned dict matches notebook 02 for the row: lags exclude the
+        row itself (groupby.shift), rolling stats include it (rolling).
+        """
+        students, waste = self._series(meal_type)
+
+        features = {}
+        for lag in LAGS:
+            features[f'students_lag_{lag}'] = students.lag(lag)
+            features[f'waste_lag_{lag}'] = waste.lag(lag)
+        features['students_same_day_last_week'] = self.same_day.get(
+            (meal_type, day_of_week), np.nan
+        )
+
+        students.push(students_attended)
+        waste.push(food_wasted_kg)
+        self.same_day[(meal_type, day_of_week)] = float(students_attended)
+        if date is not None:
+            self.last_date = pd.Timestamp(date)
+
+        features.update(self._rolling(students))
+        return features
+
+    def ingest_day(self, day_df):
+        """Ingest one day's actuals (rows with the raw generator columns)"""
+        return [
+            self.ingest(row.meal_type, row.day_of_week, row.students_attended,
+                        row.food_wasted_kg, row.date)
+            for row in day_df.sort_values('meal_type').itertuples(index=False)
+        ]
+
+    def lookup(self, meal_type, day_of_week):
+        """Features for the next, not yet ingested row of this meal
+
+        Lags are shifted onto the upcoming row (students_lag_1 is the latest
+        actual); rolling stats are those of the latest completed window,
+        since the upcoming row's own value is what is being predicted.
+        Unseen history comes back as NaN.
+        """
+        if meal_type not in self.students:
+            return {name: np.nan for name in HISTORY_FEATURES}
+        students, waste = self.students[meal_type], self.waste[meal_type]
+
+        features = {}
+        for lag in LAGS:
+            features[f'students_lag_{lag}'] = students.lag(lag)
+            features[f'waste_lag_{lag}'] = waste.lag(lag)
+        features['students_same_day_last_week'] = self.same_day.get(
+            (meal_type, day_of_week), np.nan
+        )
+        features.update(self._rolling(students))
+        return features
+
+    def lookup_batch(self, meal_types, days_of_week):
+        """Lookup for many rows, as a DataFrame with HISTORY_FEATURES columns"""
+        rows = [self.lookup(m, d) for m, d in zip(meal_types, days_of_week)]
+        return pd.DataFrame(rows, columns=HISTORY_FEATURES)
+
+    @classmethod
+    def from_history(cls, df):
+        """Build a store by replaying raw rows in notebook-02 order (date, meal_type)"""
+        store = cls()
+        store.replay(df)
+        return store
+
+    def replay(self, df):
+        """Ingest many rows; returns their features aligned with df's index"""
+        ordered = df.sort_values(['date', 'meal_type'], kind='stable')
+        rows = [
+            self.ingest(row.meal_type, row.day_of_week, row.students_attended,
+                        row.food_wasted_kg, row.date)
+            for row in ordered.itertuples(index=False)
+        ]
+        return pd.DataFrame(rows, index=ordered.index, columns=HISTORY_FEATURES).reindex(df.index)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
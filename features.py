@@ -0,0 +1,306 @@
+"""
+Feature Engineering Pipeline
+Vectorized version of notebook 02, shared by training and the app
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+LAGS = [1, 7, 14]
+ROLLING_WINDOWS = [3, 7, 14]
+EXTREMES_WINDOW = 7
+
+POPULAR_ITEMS = ['Biryani', 'Chole-Bhature', 'Rice-Chicken', 'Puri-Bhaji', 'Dosa']
+UNPOPULAR_ITEMS = ['Khichdi', 'Rice-Curd-Pickle', 'Upma']
+
+# Label columns encoded for the model (notebook 03) and their encoder keys
+ENCODED_COLUMNS = {'meal_type': ('meal', 'meal_encoded'),
+                   'weather': ('weather', 'weather_encoded')}
+
+# ============================================
+# GROUPED WINDOW PRIMITIVES
+# ============================================
+
+class GroupLayout:
+    """Rows reordered so each group is contiguous, keeping order within groups
+
+    Grouped shift/rolling ops run on the reordered arrays with plain NumPy
+    (cumulative sums and strided windows) and are scattered back, instead
+    of a Python lambda per group.
+    """
+
+    def __init__(self, df, keys):
+        group_id = df.groupby(keys, sort=False, observed=True).ngroup().to_numpy()
+        self.order = np.argsort(group_id, kind='stable')
+        sorted_id = group_id[self.order]
+
+        n = len(sorted_id)
+        index = np.arange(n)
+        is_start = np.ones(n, dtype=bool)
+        is_start[1:] = sorted_id[1:] != sorted_id[:-1]
+        group_start = np.maximum.accumulate(np.where(is_start, index, 0))
+        self.position = index - group_start   # rows before this one in its group
+
+    def take(self, values):
+        return np.asarray(values, dtype=float)[self.order]
+
+    def scatter(self, sorted_values):
+        out = np.empty_like(sorted_values)
+        out[self.order] = sorted_values
+        return out
+
+    def shift(self, sorted_values, k):
+        """groupby(...).shift(k) on group-sorted values"""
+        out = np.full(len(sorted_values), np.nan)
+        out[k:] = sorted_values[:-k]
+        out[self.position < k] = np.nan
+        return out
+
+    def rolling_mean_std(self, sorted_values, window):
+        """groupby(...).rolling(window, min_periods=1) mean and std (ddof=1)
+
+        Window sums come from differences of one cumulative sum, which is
+        exact for integer counts such as students_attended.
+        """
+        n = len(sorted_values)
+        index = np.arange(n)
+        lo = index - np.minimum(self.position, window - 1)
+        count = (index + 1 - lo).astype(float)
+
+        csum = np.concatenate([[0.0], np.cumsum(sorted_values)])
+        csumsq = np.concatenate([[0.0], np.cumsum(sorted_values * sorted_values)])
+        total = csum[index + 1] - csum[lo]
+        total_sq = csumsq[index + 1] - csumsq[lo]
+
+        mean = total / count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = (total_sq - total * mean) / (count - 1)
+        std = np.sqrt(np.maximum(var, 0.0))
+        std[count < 2] = np.nan
+        return mean, std
+
+    def rolling_max_min(self, sorted_values, window):
+        """groupby(...).rolling(window, min_periods=1) max and min via strided windows"""
+        padded = np.concatenate([np.full(window - 1, np.nan), sorted_values])
+        windows = sliding_window_view(padded, window)          # (n, window), no copy
+        steps_back = np.arange(window - 1, -1, -1)
+        in_group = steps_back[None, :] <= self.position[:, None]
+        rolling_max = np.where(in_group, windows, -np.inf).max(axis=1)
+        rolling_min = np.where(in_group, windows, np.inf).min(axis=1)
+        return rolling_max, rolling_min
+
+# ============================================
+# ROW-LEVEL FEATURES
+# ============================================
+
+def row_features(df, temp_mean=None):
+    """Features that depend only on each row's own columns
+
+    Needs date, menu_item, menu_popularity, weather, temperature_c and the
+    is_* condition flags. `temp_mean` is the temperature that
+    temp_deviation is measured from (default: the mean of df, as in
+    notebook 02). Used for both history and prediction rows.
+    """
+    dates = pd.DatetimeIndex(df['date'])
+    dow = dates.dayofweek.to_numpy()
+    day = dates.day.to_numpy()
+    month = dates.month.to_numpy()
+
+    is_weekend = df['is_weekend'].to_numpy().astype(int)
+    is_exam = df['is_exam_period'].to_numpy().astype(int)
+    is_festival = df['is_festival'].to_numpy().astype(int)
+    is_rainy = (df['weather'].to_numpy() == 'Rainy').astype(int)
+    temperature = df['temperature_c'].to_numpy().astype(float)
+    popularity = df['menu_popularity'].to_numpy().astype(float)
+
+    special_conditions_count = (
+        is_exam + is_festival + is_weekend +
+        df['is_start_semester'].to_numpy().astype(int) +
+        df['is_end_semester'].to_numpy().astype(int)
+    )
+    if temp_mean is None:
+        temp_mean = temperature.mean()
+
+    return {
+        # Temporal
+        'year': dates.year.to_numpy(),
+        'month': month,
+        'day': day,
+        'week_of_year': dates.isocalendar().week.to_numpy().astype(int),
+        'day_of_week_num': dow,
+        'is_monday': (dow == 0).astype(int),
+        'is_friday': (dow == 4).astype(int),
+        'day_sin': np.sin(2 * np.pi * day / 31),
+        'day_cos': np.cos(2 * np.pi * day / 31),
+        'month_sin': np.sin(2 * np.pi * month / 12),
+        'month_cos': np.cos(2 * np.pi * month / 12),
+        'dow_sin': np.sin(2 * np.pi * dow / 7),
+        'dow_cos': np.cos(2 * np.pi * dow / 7),
+        # Interactions
+        'weekend_x_exam': is_weekend * is_exam,
+        'weekend_x_festival': is_weekend * is_festival,
+        'rainy_x_weekend': is_rainy * is_weekend,
+        'exam_x_festival': is_exam * is_festival,
+        'popularity_x_weekend': popularity * is_weekend,
+        'temp_x_rainy': temperature * is_rainy,
+        # Menu flags
+        'is_popular_menu': df['menu_item'].isin(POPULAR_ITEMS).to_numpy().astype(int),
+        'is_unpopular_menu': df['menu_item'].isin(UNPOPULAR_ITEMS).to_numpy().astype(int),
+        # Special events
+        'special_conditions_count': special_conditions_count,
+        'has_special_condition': (special_conditions_count > 0).astype(int),
+        'is_normal_day': (special_conditions_count == 0).astype(int),
+        'temp_deviation': temperature - temp_mean,
+    }
+
+# ============================================
+# HISTORY FEATURES
+# ============================================
+
+def _group_keys(df, *keys):
+    """Group keys, scoped per campus when the data has several"""
+    return (['campus_id'] if 'campus_id' in df.columns else []) + list(keys)
+
+
+def _week_year(dates):
+    """dates.dt.strftime('%Y-%W'), formatting each distinct week once"""
+    dates = pd.DatetimeIndex(dates)
+    # %W: weeks start on Monday; days before the year's first Monday are week 00
+    week = (dates.dayofyear.to_numpy() - 1 + 7 - dates.dayofweek.to_numpy()) // 7
+    codes, uniques = pd.factorize(dates.year.to_numpy() * 100 + week)
+    labels = np.array([f'{code // 100}-{code % 100:02d}' for code in uniques], dtype=object)
+    return labels[codes]
+
+
+def history_features(df):
+    """Lag, rolling, menu, aggregate and ratio features over the whole history
+
+    df must already be in time order (date, then meal_type).
+    """
+    meal_layout = GroupLayout(df, _group_keys(df, 'meal_type'))
+    same_day_layout = GroupLayout(df, _group_keys(df, 'meal_type', 'day_of_week'))
+
+    students = meal_layout.take(df['students_attended'])
+    waste = meal_layout.take(df['food_wasted_kg'])
+
+    out = {}
+
+    # Lags (cell 4)
+    for lag in LAGS:
+        out[f'students_lag_{lag}'] = meal_layout.scatter(meal_layout.shift(students, lag))
+        out[f'waste_lag_{lag}'] = meal_layout.scatter(meal_layout.shift(waste, lag))
+    out['students_same_day_last_week'] = same_day_layout.scatter(
+        same_day_layout.shift(same_day_layout.take(df['students_attended']), 1)
+    )
+
+    # Rolling statistics (cell 5)
+    for window in ROLLING_WINDOWS:
+        mean, std = meal_layout.rolling_mean_std(students, window)
+        out[f'students_roll_{window}d_mean'] = meal_layout.scatter(mean)
+        out[f'students_roll_{window}d_std'] = meal_layout.scatter(std)
+    rolling_max, rolling_min = meal_layout.rolling_max_min(students, EXTREMES_WINDOW)
+    out[f'students_roll_{EXTREMES_WINDOW}d_max'] = meal_layout.scatter(rolling_max)
+    out[f'students_roll_{EXTREMES_WINDOW}d_min'] = meal_layout.scatter(rolling_min)
+
+    # Menu statistics (cell 7)
+    menu_group = df.groupby(_group_keys(df, 'menu_item'), observed=True)['students_attended']
+    out['menu_count_last_7days'] = menu_group.cumcount().to_numpy()
+    out['menu_historical_avg'] = menu_group.transform('mean').to_numpy()
+    out['menu_historical_std'] = menu_group.transform('std').to_numpy()
+
+    # Aggregates (cell 8)
+    daily = df.groupby(_group_keys(df, 'date'), observed=True)['students_attended']
+    out['daily_total_attendance'] = daily.transform('sum').to_numpy()
+    out['daily_avg_attendance'] = daily.transform('mean').to_numpy()
+    out['pct_of_daily_attendance'] = (
+        df['students_attended'].to_numpy() / out['daily_total_attendance'] * 100
+    )
+    week_year = _week_year(df['date'])
+    out['week_year'] = week_year
+    out['weekly_avg_attendance'] = (
+        df.assign(week_year=week_year)
+          .groupby(_group_keys(df, 'week_year'), observed=True)['students_attended']
+          .transform('mean').to_numpy()
+    )
+
+    # Ratios (cell 10)
+    meal_avg = df.groupby(_group_keys(df, 'meal_type'), observed=True)['students_attended'].transform('mean')
+    dow_avg = df.groupby(_group_keys(df, 'day_of_week'), observed=True)['students_attended'].transform('mean')
+    out['meal_type_avg'] = meal_avg.to_numpy()
+    out['deviation_from_meal_avg'] = df['students_attended'].to_numpy() - out['meal_type_avg']
+    out['pct_deviation_from_meal_avg'] = out['deviation_from_meal_avg'] / out['meal_type_avg'] * 100
+    out['dow_avg'] = dow_avg.to_numpy()
+    out['deviation_from_dow_avg'] = df['students_attended'].to_numpy() - out['dow_avg']
+    return out
+
+# ============================================
+# ENCODERS
+# ============================================
+
+def fit_label_encoders(df):
+    """LabelEncoders for meal_type and weather, as saved to models/label_encoders.pkl"""
+    from sklearn.preprocessing import LabelEncoder
+
+    return {key: LabelEncoder().fit(df[col]) for col, (key, _) in ENCODED_COLUMNS.items()}
+
+
+def encode_labels(df, encoders):
+    """meal_encoded / weather_encoded columns from fitted encoders"""
+    return {name: encoders[key].transform(np.asarray(df[col], dtype=object))
+            for col, (key, name) in ENCODED_COLUMNS.items()}
+
+# ============================================
+# PIPELINE
+# ============================================
+
+# Column order written by notebook 02
+FEATURE_ORDER = [
+    'day_of_week_num', 'is_monday', 'is_friday',
+    'day_sin', 'day_cos', 'month_sin', 'month_cos', 'dow_sin', 'dow_cos',
+    'students_lag_1', 'waste_lag_1', 'students_lag_7', 'waste_lag_7',
+    'students_lag_14', 'waste_lag_14', 'students_same_day_last_week',
+    'students_roll_3d_mean', 'students_roll_3d_std', 'students_roll_7d_mean', 'students_roll_7d_std',
+    'students_roll_14d_mean', 'students_roll_14d_std', 'students_roll_7d_max', 'students_roll_7d_min',
+    'weekend_x_exam', 'weekend_x_festival', 'rainy_x_weekend', 'exam_x_festival',
+    'popularity_x_weekend', 'temp_x_rainy',
+    'menu_count_last_7days', 'menu_historical_avg', 'menu_historical_std',
+    'is_popular_menu', 'is_unpopular_menu',
+    'daily_total_attendance', 'daily_avg_attendance', 'pct_of_daily_attendance',
+    'week_year', 'weekly_avg_attendance',
+    'special_conditions_count', 'has_special_condition', 'is_normal_day',
+    'meal_type_avg', 'deviation_from_meal_avg', 'pct_deviation_from_meal_avg',
+    'dow_avg', 'deviation_from_dow_avg', 'temp_deviation',
+]
+
+
+def build_features(raw, encoders=None, dropna=True):
+    """Every notebook-02 feature for a raw dataset, in one vectorized pass
+
+    Returns the processed frame in notebook order (sorted by date, then
+    meal_type). With `encoders`, meal_encoded/weather_encoded are added,
+    so the result holds every column in models/feature_names.pkl. With
+    dropna, the warm-up rows lacking lag history are removed (cell 12).
+    """
+    df = raw.copy()
+    df['date'] = pd.to_datetime(df['date'])
+    df = df.sort_values(['date', 'meal_type'], kind='stable').reset_index(drop=True)
+
+    new = row_features(df)
+    new.update(history_features(df))
+    if encoders is not None:
+        new.update(encode_labels(df, encoders))
+
+    # Calendar columns are recomputed from date; overwrite in place
+    for col in ['year', 'month', 'day', 'week_of_year']:
+        df[col] = new.pop(col)
+    order = FEATURE_ORDER + [c for c in new if c not in FEATURE_ORDER]
+    df = pd.concat([df, pd.DataFrame({c: new[c] for c in order}, index=df.index)], axis=1)
+
+    if dropna:
+        df = df.dropna()
+    return df
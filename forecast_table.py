@@ -0,0 +1,189 @@
+"""
+Forecast Table
+Nightly batch forecast of the upcoming days, written to a small keyed Parquet file the app looks up
+"""
+
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import predictor
+from generate_data import MEAL_TYPES, MenuScheduler
+from predictor import MENU_ITEMS, WEATHER_TYPES
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+TABLE_FILE = 'models/forecast_table.parquet'
+HISTORY_FILE = 'data/raw/college_mess_data.csv'
+HORIZON_DAYS = 14
+
+# Scenario the table covers: the app's default temperature, no events, every weather type
+DEFAULT_TEMPERATURE = 28
+METADATA_KEY = b'forecast_table'
+
+# ============================================
+# BATCH JOB
+# ============================================
+
+def menu_candidates():
+    """Per-meal items to precompute: the sidebar's choices plus anything the rotation serves"""
+    weekly_menu = MenuScheduler().weekly_menu
+    candidates = {}
+    for meal in MEAL_TYPES:
+        scheduled = [weekly_menu[day][meal] for day in weekly_menu]
+        candidates[meal] = list(dict.fromkeys(MENU_ITEMS[meal] + scheduled))
+    return candidates
+
+
+def build_table(model, scaler, encoders, feature_names, start_date, n_days=HORIZON_DAYS,
+                weathers=WEATHER_TYPES, feature_store=None):
+    """Predict every (date, meal, menu item, weather) of the horizon in one call
+
+    Inputs match a sidebar Predict at DEFAULT_TEMPERATURE with no flags
+    set, so a table cell equals the live prediction for those inputs.
+    """
+    grid = pd.DataFrame([
+        (date, meal, item, weather)
+        for date in pd.date_range(start=start_date, periods=n_days, freq='D')
+        for meal, items in menu_candidates().items()
+        for item in items
+        for weather in weathers
+    ], columns=['date', 'meal_type', 'menu_item', 'weather'])
+
+    history = None
+    if feature_store is not None:
+        history = feature_store.lookup_batch(grid['meal_type'], grid['date'].dt.day_name())
+    features = predictor.prepare_features_batch(
+        pd.DatetimeIndex(grid['date']), grid['meal_type'].to_numpy(object), grid['menu_item'].to_numpy(object),
+        grid['weather'].to_numpy(object), DEFAULT_TEMPERATURE, False, False, False,
+        encoders, feature_names, history=history
+    )
+    predictions = predictor.predict_batch(model, scaler, features)
+    food_kg, cost = predictor.food_and_cost(predictions)
+    return grid.assign(predicted_students=predictions.astype(np.int16), food_kg=food_kg, cost_rs=cost)
+
+
+def write_table(table, path=TABLE_FILE, **metadata):
+    """Write the table atomically, with `metadata` (bundle version, horizon...) in the file footer"""
+    arrow = pa.Table.from_pandas(table.assign(date=table['date'].dt.date), preserve_index=False)
+    arrow = arrow.replace_schema_metadata({**(arrow.schema.metadata or {}),
+                                           METADATA_KEY: json.dumps(metadata).encode()})
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    pq.write_table(arrow, tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+    return path
+
+
+def run_nightly(start_date=None, n_days=HORIZON_DAYS, path=TABLE_FILE, history_file=HISTORY_FILE):
+    """Forecast tomorrow onwards with the current bundle and latest actuals, and write the table"""
+    from feature_store import OnlineFeatureStore
+    from model_bundle import load_bundle
+
+    bundle = load_bundle()
+    if start_date is None:
+        start_date = pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+    feature_store = None
+    if history_file and os.path.exists(history_file):
+        feature_store = OnlineFeatureStore.from_history(pd.read_csv(history_file, parse_dates=['date']))
+
+    table = build_table(bundle.engine, None, bundle.encoders, bundle.feature_names, start_date, n_days,
+                        feature_store=feature_store)
+    return write_table(
+        table, path,
+        bundle_version=bundle.version,
+        start_date=str(pd.Timestamp(start_date).date()),
+        n_days=n_days,
+        temperature=DEFAULT_TEMPERATURE,
+        history_end=None if feature_store is None else str(feature_store.last_date.date()),
+        generated_at=datetime.now().isoformat(timespec='seconds'),
+    ), table
+
+# ============================================
+# LOOKUP
+# ============================================
+
+class ForecastTable:
+    """In-memory index over a written table: one dict lookup per (date, meal) cell
+
+    lookup() and scheduled() return None whenever the inputs fall outside
+    the precomputed scenario (another temperature, a flag set, a date
+    beyond the horizon), and the caller runs live inference instead.
+    """
+
+    def __init__(self, table, metadata):
+        self.metadata = metadata
+        self.bundle_version = metadata.get('bundle_version')
+        dates = pd.to_datetime(table['date']).dt.strftime('%Y-%m-%d')
+        self._cells = dict(zip(
+            zip(dates, table['meal_type'], table['menu_item'], table['weather']),
+            zip(table['predicted_students'].astype(int), table['food_kg'], table['cost_rs']),
+        ))
+
+    @classmethod
+    def load(cls, path=TABLE_FILE):
+        arrow = pq.read_table(path)
+        metadata = json.loads(arrow.schema.metadata[METADATA_KEY])
+        return cls(arrow.to_pandas(), metadata)
+
+    def __len__(self):
+        return len(self._cells)
+
+    @staticmethod
+    def covers(temperature, is_exam, is_festival, is_start_sem):
+        return temperature == DEFAULT_TEMPERATURE and not (is_exam or is_festival or is_start_sem)
+
+    def lookup(self, date, meal_type, menu_item, weather, temperature=DEFAULT_TEMPERATURE,
+               is_exam=False, is_festival=False, is_start_sem=False):
+        """(predicted students, food kg, cost) for one Predict, or None"""
+        if not self.covers(temperature, is_exam, is_festival, is_start_sem):
+            return None
+        return self._cells.get((pd.Timestamp(date).strftime('%Y-%m-%d'), meal_type, menu_item, weather))
+
+    def scheduled(self, start_date, n_days, weather, temperature=DEFAULT_TEMPERATURE,
+                  is_exam=False, is_festival=False, is_start_sem=False):
+        """predictor.forecast's frame for the rotation menu, or None unless every cell is in the table"""
+        if not self.covers(temperature, is_exam, is_festival, is_start_sem) or np.ndim(weather):
+            return None
+        weekly_menu = MenuScheduler().weekly_menu
+        rows = []
+        for date in pd.date_range(start=start_date, periods=n_days, freq='D'):
+            for meal in MEAL_TYPES:
+                item = weekly_menu[date.day_name()][meal]
+                cell = self._cells.get((date.strftime('%Y-%m-%d'), meal, item, weather))
+                if cell is None:
+                    return None
+                rows.append((date, date.day_name(), meal, item, weather, temperature) + cell)
+        return pd.DataFrame(rows, columns=['date', 'day_of_week', 'meal_type', 'menu_item', 'weather',
+                                           'temperature_c', 'predicted_students', 'food_kg', 'cost_rs'])
+
+
+def table_version(path=TABLE_FILE):
+    """Modification time of the table file (None if absent), for cache keys"""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute the forecast table (run nightly, e.g. from cron)")
+    parser.add_argument('--start-date', default=None, help="first day (default: tomorrow)")
+    parser.add_argument('--days', type=int, default=HORIZON_DAYS)
+    parser.add_argument('--output', default=TABLE_FILE)
+    args = parser.parse_args()
+
+    path, table = run_nightly(args.start_date, args.days, args.output)
+    print(f"✅ Forecast table: {len(table):,} cells "
+          f"({table['date'].min():%Y-%m-%d} to {table['date'].max():%Y-%m-%d}) → {path} "
+          f"({os.path.getsize(path) / 1e3:.1f} KB)")
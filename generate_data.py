@@ -8,14 +8,15 @@ import numpy as np
 from datetime import datetime, timedelta
 import random
 import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 
 # ============================================
 # CONFIGURATION
 # ============================================
 
-# Set random seed for reproducibility
-np.random.seed(42)
-random.seed(42)
+# Random seed for reproducibility
+SEED = 42
 
 # College parameters
 TOTAL_STUDENTS = 800
@@ -30,6 +31,28 @@ LUNCH_ITEMS = ['Rice-Dal-Sabzi', 'Roti-Paneer', 'Biryani', 'Rice-Sambar',
 DINNER_ITEMS = ['Roti-Dal', 'Rice-Rajma', 'Paratha-Paneer', 'Rice-Curd-Pickle', 
                 'Noodles', 'Rice-Chicken', 'Khichdi']
 
+MEAL_TYPES = ['Breakfast', 'Lunch', 'Dinner']
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday',
+             'Saturday', 'Sunday']
+
+# Base attendance by day
+BASE_ATTENDANCE_RATE = {
+    'Monday': 0.75, 'Tuesday': 0.78, 'Wednesday': 0.76,
+    'Thursday': 0.74, 'Friday': 0.65, 'Saturday': 0.55, 
+    'Sunday': 0.50
+}
+
+# Meal-specific rates
+MEAL_MULTIPLIER = {
+    'Breakfast': 0.70,
+    'Lunch': 0.85,
+    'Dinner': 0.75
+}
+
+# Food calculations
+FOOD_PER_PERSON_KG = 0.35  # 350 grams
+BUFFER_PERCENTAGE = 1.10   # 10% extra
+
 # ============================================
 # MENU SCHEDULER
 # ============================================
@@ -99,14 +122,20 @@ class MenuScheduler:
 # DATA GENERATOR
 # ============================================
 
-def generate_college_mess_data():
-    """Generate realistic college mess data"""
+def generate_college_mess_data(start_date=START_DATE, end_date=END_DATE,
+                               total_students=TOTAL_STUDENTS, verbose=True, seed=SEED):
+    """Generate realistic college mess data (row-by-row reference engine)"""
+    
+    # Set random seed for reproducibility
+    np.random.seed(seed)
+    random.seed(seed)
     
-    print("🚀 Starting data generation...")
+    if verbose:
+        print("🚀 Starting data generation...")
     
     # Initialize
     menu_scheduler = MenuScheduler()
-    dates = pd.date_range(start=START_DATE, end=END_DATE, freq='D')
+    dates = pd.date_range(start=start_date, end=end_date, freq='D')
     data = []
     
     # Track menu repetition
@@ -145,31 +174,16 @@ def generate_college_mess_data():
         
         temperature = np.random.normal(28 if not is_monsoon else 24, 3)
         
-        # Base attendance by day
-        base_attendance_rate = {
-            'Monday': 0.75, 'Tuesday': 0.78, 'Wednesday': 0.76,
-            'Thursday': 0.74, 'Friday': 0.65, 'Saturday': 0.55, 
-            'Sunday': 0.50
-        }
-        
         # Generate for each meal
-        for meal_type in ['Breakfast', 'Lunch', 'Dinner']:
+        for meal_type in MEAL_TYPES:
             
             # Get menu
             menu_item = menu_scheduler.get_menu(day_of_week, meal_type)
             popularity = menu_scheduler.get_popularity(menu_item)
             
             # Calculate attendance
-            base_rate = base_attendance_rate[day_of_week]
-            
-            # Meal-specific rates
-            meal_multiplier = {
-                'Breakfast': 0.70,
-                'Lunch': 0.85,
-                'Dinner': 0.75
-            }
-            
-            attendance_rate = base_rate * meal_multiplier[meal_type]
+            base_rate = BASE_ATTENDANCE_RATE[day_of_week]
+            attendance_rate = base_rate * MEAL_MULTIPLIER[meal_type]
             
             # Adjustments
             if is_exam:
@@ -195,19 +209,16 @@ def generate_college_mess_data():
             attendance_rate = min(attendance_rate, 0.95)
             
             # Calculate students
-            expected_students = int(TOTAL_STUDENTS * attendance_rate)
+            expected_students = int(total_students * attendance_rate)
             actual_students = max(0, int(np.random.normal(expected_students, 
                                                           expected_students * 0.08)))
             
             # Food calculations
-            food_per_person_kg = 0.35  # 350 grams
-            buffer_percentage = 1.10   # 10% extra
-            
-            food_prepared_kg = actual_students * food_per_person_kg * buffer_percentage
+            food_prepared_kg = actual_students * FOOD_PER_PERSON_KG * BUFFER_PERCENTAGE
             
             # Consumption rate (not everyone finishes)
             consumption_rate = random.uniform(0.85, 0.95)
-            food_consumed_kg = actual_students * food_per_person_kg * consumption_rate
+            food_consumed_kg = actual_students * FOOD_PER_PERSON_KG * consumption_rate
             
             # Waste
             food_wasted_kg = food_prepared_kg - food_consumed_kg
@@ -245,7 +256,7 @@ def generate_college_mess_data():
                 'is_start_semester': is_start_sem,
                 'is_end_semester': is_end_sem,
                 'is_monsoon': is_monsoon,
-                'total_capacity': TOTAL_STUDENTS,
+                'total_capacity': total_students,
                 'students_attended': actual_students,
                 'attendance_rate': round(attendance_rate * 100, 2),
                 'food_prepared_kg': round(food_prepared_kg, 2),
@@ -266,24 +277,289 @@ def generate_college_mess_data():
                 recent_menus[meal_type].pop(0)
         
         # Progress indicator
-        if (idx + 1) % 30 == 0:
+        if verbose and (idx + 1) % 30 == 0:
             print(f"✓ Generated data for {idx + 1} days...")
     
     return pd.DataFrame(data)
 
+# ============================================
+# VECTORIZED DATA GENERATOR
+# ============================================
+
+def _calendar_flags(month, day_num, dow):
+    """Special-condition flags for arrays of calendar days"""
+    is_exam = (((month == 5) & (day_num > 15)) |
+               ((month == 11) & (day_num > 15)) |
+               ((month == 12) & (day_num < 20)))
+
+    is_festival = (((month == 8) & (day_num >= 13) & (day_num <= 17)) |
+                   ((month == 10) & (day_num >= 20) & (day_num <= 26)) |
+                   ((month == 3) & (day_num >= 6) & (day_num <= 10)) |
+                   ((month == 1) & (day_num == 26)))
+
+    is_start_sem = np.isin(month, [1, 8]) & (day_num <= 14)
+    is_end_sem = (((month == 5) & (day_num > 15)) |
+                  ((month == 11) & (day_num > 15)))
+    is_weekend = dow >= 5
+    is_monsoon = np.isin(month, [6, 7, 8, 9])
+
+    return is_exam, is_festival, is_start_sem, is_end_sem, is_weekend, is_monsoon
+
+
+def _menu_fatigue(menu_codes, window=3):
+    """True where a meal repeats an item served in the previous `window` days.
+
+    `menu_codes` is a (n_days, n_meals) array of menu item codes.
+    """
+    fatigue = np.zeros(menu_codes.shape, dtype=bool)
+    for lag in range(1, window + 1):
+        fatigue[lag:] |= menu_codes[lag:] == menu_codes[:-lag]
+    return fatigue
+
+
+def attendance_rates(dow, is_exam, is_festival, is_rainy, is_start_sem, is_end_sem, popularity, fatigue):
+    """Expected attendance rate per (day, meal), the process of generate_college_mess_data()
+
+    Day-level inputs have shape (..., n_days); `popularity` and `fatigue`
+    are (..., n_days, n_meals). Leading dimensions broadcast, so a batch
+    of simulated weather (n_reps, n_days) gives (n_reps, n_days, n_meals).
+    """
+    base_rate = np.array([BASE_ATTENDANCE_RATE[d] for d in DAY_NAMES])[dow]
+    meal_mult = np.array([MEAL_MULTIPLIER[m] for m in MEAL_TYPES])
+
+    def day_factor(flag, factor):
+        return np.where(flag, factor, 1.0)[..., None]
+
+    rate = base_rate[..., None] * meal_mult
+    rate = rate * day_factor(is_exam, 0.90)
+    rate = rate * day_factor(is_festival, 0.40)
+    rate = rate * day_factor(is_rainy, 1.10)
+    rate = rate * day_factor(is_start_sem, 0.95)
+    rate = rate * day_factor(is_end_sem, 0.85)
+    rate = rate * (1 + (popularity - 3.5) / 5)
+    rate = rate * np.where(fatigue, 0.92, 1.0)
+    return np.minimum(rate, 0.95)
+
+
+def generate_college_mess_data_vectorized(start_date=START_DATE, end_date=END_DATE,
+                                          total_students=TOTAL_STUDENTS, seed=SEED):
+    """Generate college mess data for a whole date range with NumPy arrays
+
+    Follows the same attendance, food and cost process as
+    generate_college_mess_data() and returns the same schema, but draws
+    every random column in one call from a seeded Generator instead of
+    looping over days and meals. Output is reproducible for a given seed;
+    it is not row-for-row identical to the loop engine, which draws from
+    the global `random`/`np.random` state. `seed` may be an int or a
+    np.random.SeedSequence.
+    """
+    rng = np.random.default_rng(seed)
+    menu_scheduler = MenuScheduler()
+
+    # ---- Per-day arrays ----
+    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    n_days = len(dates)
+    n_meals = len(MEAL_TYPES)
+
+    year = dates.year.to_numpy().astype(np.int64)
+    month = dates.month.to_numpy().astype(np.int64)
+    day_num = dates.day.to_numpy().astype(np.int64)
+    dow = dates.dayofweek.to_numpy()
+    week_of_year = dates.isocalendar().week.to_numpy().astype(np.int64)
+
+    (is_exam, is_festival, is_start_sem,
+     is_end_sem, is_weekend, is_monsoon) = _calendar_flags(month, day_num, dow)
+
+    # Weather: inverse-CDF draw with season-dependent weights
+    weather_names = np.array(['Sunny', 'Cloudy', 'Rainy'], dtype=object)
+    u = rng.random(n_days)
+    weather_code = np.where(
+        is_monsoon,
+        np.where(u < 0.5, 2, np.where(u < 0.8, 1, 0)),   # Rainy/Cloudy/Sunny
+        np.where(u < 0.6, 0, np.where(u < 0.9, 1, 2))    # Sunny/Cloudy/Rainy
+    )
+    is_rainy = weather_code == 2
+    temperature = rng.normal(np.where(is_monsoon, 24.0, 28.0), 3.0)
+
+    # ---- Menu lookup tables ----
+    menu_names = np.array(list(menu_scheduler.popularity), dtype=object)
+    menu_index = {item: i for i, item in enumerate(menu_names)}
+    weekly_codes = np.array([
+        [menu_index[menu_scheduler.get_menu(day_name, meal)] for meal in MEAL_TYPES]
+        for day_name in DAY_NAMES
+    ])
+    popularity_table = np.array([menu_scheduler.get_popularity(m) for m in menu_names])
+
+    menu_codes = weekly_codes[dow]                      # (n_days, n_meals)
+    fatigue = _menu_fatigue(menu_codes)
+
+    # ---- Per-row arrays (day-major, meal-minor) ----
+    n_rows = n_days * n_meals
+    day_idx = np.repeat(np.arange(n_days), n_meals)
+    meal_idx = np.tile(np.arange(n_meals), n_days)
+    menu_code = menu_codes.ravel()
+    popularity = popularity_table[menu_code]
+
+    attendance_rate = attendance_rates(
+        dow, is_exam, is_festival, is_rainy, is_start_sem, is_end_sem,
+        popularity_table[menu_codes], fatigue
+    ).ravel()
+
+    expected_students = np.trunc(total_students * attendance_rate)
+    actual_students = np.maximum(
+        0, np.trunc(rng.normal(expected_students, expected_students * 0.08))
+    ).astype(np.int64)
+
+    # Food, waste and cost
+    food_prepared_kg = actual_students * FOOD_PER_PERSON_KG * BUFFER_PERCENTAGE
+    consumption_rate = rng.uniform(0.85, 0.95, n_rows)
+    food_consumed_kg = actual_students * FOOD_PER_PERSON_KG * consumption_rate
+    food_wasted_kg = food_prepared_kg - food_consumed_kg
+    waste_percentage = np.divide(food_wasted_kg * 100, food_prepared_kg,
+                                 out=np.zeros(n_rows), where=food_prepared_kg > 0)
+
+    cost_per_kg = rng.uniform(80, 150, n_rows)
+    total_cost = food_prepared_kg * cost_per_kg
+    waste_cost = food_wasted_kg * cost_per_kg
+
+    staff_count = rng.integers(8, 13, n_rows)
+    serving_duration = rng.integers(45, 91, n_rows)
+    freshness_score = rng.uniform(3.5, 5.0, n_rows)
+    satisfaction_score = popularity * 0.7 + freshness_score * 0.3
+
+    return pd.DataFrame({
+        'date': dates[day_idx],
+        'year': year[day_idx],
+        'month': month[day_idx],
+        'day': day_num[day_idx],
+        'day_of_week': np.array(DAY_NAMES, dtype=object)[dow][day_idx],
+        'week_of_year': week_of_year[day_idx],
+        'meal_type': np.array(MEAL_TYPES, dtype=object)[meal_idx],
+        'menu_item': menu_names[menu_code],
+        'menu_popularity': popularity,
+        'weather': weather_names[weather_code][day_idx],
+        'temperature_c': np.round(temperature, 1)[day_idx],
+        'is_exam_period': is_exam[day_idx],
+        'is_festival': is_festival[day_idx],
+        'is_weekend': is_weekend[day_idx],
+        'is_start_semester': is_start_sem[day_idx],
+        'is_end_semester': is_end_sem[day_idx],
+        'is_monsoon': is_monsoon[day_idx],
+        'total_capacity': np.full(n_rows, total_students, dtype=np.int64),
+        'students_attended': actual_students,
+        'attendance_rate': np.round(attendance_rate * 100, 2),
+        'food_prepared_kg': np.round(food_prepared_kg, 2),
+        'food_consumed_kg': np.round(food_consumed_kg, 2),
+        'food_wasted_kg': np.round(food_wasted_kg, 2),
+        'waste_percentage': np.round(waste_percentage, 2),
+        'cost_per_kg_rs': np.round(cost_per_kg, 2),
+        'total_cost_rs': np.round(total_cost, 2),
+        'waste_cost_rs': np.round(waste_cost, 2),
+        'staff_count': staff_count.astype(np.int64),
+        'serving_duration_mins': serving_duration.astype(np.int64),
+        'student_satisfaction': np.round(satisfaction_score, 2)
+    })
+
+# ============================================
+# SHARDED MULTI-CAMPUS GENERATION
+# ============================================
+
+def make_campuses(n_campuses, min_capacity=300, max_capacity=1500, seed=SEED):
+    """Deterministic {campus_id: capacity} map for n messes of varied size"""
+    rng = np.random.default_rng(seed)
+    capacities = rng.integers(min_capacity, max_capacity + 1, n_campuses)
+    return {f"C{i + 1:02d}": int(cap) for i, cap in enumerate(capacities)}
+
+
+def shard_seed(campus_id, shard_start, base_seed=SEED):
+    """Independent seed for one (campus, date range) shard
+
+    Derived only from the shard's identity, so the data a shard produces
+    does not depend on which worker runs it or how many workers there are.
+    """
+    campus_key = zlib.crc32(str(campus_id).encode('utf-8'))
+    day_key = pd.Timestamp(shard_start).toordinal()
+    return np.random.SeedSequence(base_seed, spawn_key=(campus_key, day_key))
+
+
+def plan_shards(campuses, start_date=START_DATE, end_date=END_DATE,
+                shard_freq='YS', base_seed=SEED):
+    """Split generation into (campus_id, capacity, start, end, seed) shards
+
+    Each campus's date range is cut at `shard_freq` boundaries (yearly by
+    default). Shards are ordered by campus, then date.
+    """
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    cuts = [start] + [b for b in pd.date_range(start, end, freq=shard_freq) if b > start]
+    ranges = [(lo, hi - pd.Timedelta(days=1)) for lo, hi in zip(cuts, cuts[1:])]
+    ranges.append((cuts[-1], end))
+
+    return [
+        (campus_id, capacity, lo, hi, shard_seed(campus_id, lo, base_seed))
+        for campus_id, capacity in campuses.items()
+        for lo, hi in ranges
+    ]
+
+
+def _generate_shard(shard):
+    """Process-pool worker: generate one shard and tag it with campus_id"""
+    campus_id, capacity, lo, hi, seed = shard
+    df = generate_college_mess_data_vectorized(lo, hi, capacity, seed=seed)
+    df.insert(0, 'campus_id', campus_id)
+    return df
+
+
+def iter_sharded_mess_data(campuses, start_date=START_DATE, end_date=END_DATE,
+                           shard_freq='YS', workers=None, base_seed=SEED):
+    """Yield generated shards in plan order as they complete
+
+    `campuses` maps campus_id to capacity (see make_campuses). Shards run
+    in a process pool of `workers` processes (None = all cores, 1 = in
+    process). Consumers such as data_io.write_partitioned can write each
+    shard out without holding the whole dataset in memory.
+    """
+    shards = plan_shards(campuses, start_date, end_date, shard_freq, base_seed)
+
+    if workers == 1:
+        for shard in shards:
+            yield _generate_shard(shard)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(_generate_shard, shards)
+
+
+def generate_sharded_mess_data(campuses, start_date=START_DATE, end_date=END_DATE,
+                               shard_freq='YS', workers=None, base_seed=SEED):
+    """Generate data for several campuses in parallel shards
+
+    Shards are concatenated in plan order, so the result is identical for
+    any worker count.
+    """
+    frames = iter_sharded_mess_data(campuses, start_date, end_date,
+                                    shard_freq, workers, base_seed)
+    df = pd.concat(frames, ignore_index=True)
+    df['campus_id'] = df['campus_id'].astype('category')
+    return df
+
 # ============================================
 # SAVE AND ANALYZE
 # ============================================
 
-def save_and_analyze_data(df):
+def save_and_analyze_data(df, output_format='csv'):
     """Save dataset and print analysis"""
     
     # Create data directory if it doesn't exist
     os.makedirs('data/raw', exist_ok=True)
     
-    # Save to CSV
-    output_file = 'data/raw/college_mess_data.csv'
-    df.to_csv(output_file, index=False)
+    if output_format == 'parquet':
+        # Month-partitioned Parquet dataset
+        from data_io import RAW_DATASET, write_partitioned
+        output_file = RAW_DATASET
+        write_partitioned(df, output_file)
+    else:
+        # Save to CSV
+        output_file = 'data/raw/college_mess_data.csv'
+        df.to_csv(output_file, index=False)
     print(f"\n✅ Dataset saved to: {output_file}")
     
     # Print analysis
@@ -370,15 +646,58 @@ def save_and_analyze_data(df):
 # ============================================
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate synthetic college mess data")
+    parser.add_argument('--engine', choices=['loop', 'vectorized'], default='loop',
+                        help="row-by-row reference engine or batched NumPy engine")
+    parser.add_argument('--start-date', default=START_DATE)
+    parser.add_argument('--end-date', default=END_DATE)
+    parser.add_argument('--students', type=int, default=TOTAL_STUDENTS)
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--campuses', type=int, default=0,
+                        help="generate N campuses of varied capacity in parallel shards")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="process pool size for --campuses (default: all cores)")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                        help="CSV file or month-partitioned Parquet dataset")
+    args = parser.parse_args()
+
     print("\n" + "="*60)
     print("🏫 COLLEGE MESS DATA GENERATOR")
     print("="*60 + "\n")
     
+    # Stream large multi-campus runs straight to Parquet, shard by shard
+    if args.campuses and args.format == 'parquet':
+        from data_io import RAW_DATASET, dataset_size_bytes, write_partitioned
+
+        campuses = make_campuses(args.campuses, seed=args.seed)
+        shards = iter_sharded_mess_data(
+            campuses, args.start_date, args.end_date,
+            workers=args.workers, base_seed=args.seed
+        )
+        n_rows = write_partitioned(shards, RAW_DATASET)
+        print(f"✅ Streamed {n_rows:,} rows for {len(campuses)} campuses to: {RAW_DATASET}")
+        print(f"   On disk: {dataset_size_bytes(RAW_DATASET) / 1e6:.1f} MB")
+        raise SystemExit(0)
+
     # Generate data
-    df = generate_college_mess_data()
+    if args.campuses:
+        campuses = make_campuses(args.campuses, seed=args.seed)
+        df = generate_sharded_mess_data(
+            campuses, args.start_date, args.end_date,
+            workers=args.workers, base_seed=args.seed
+        )
+    elif args.engine == 'vectorized':
+        df = generate_college_mess_data_vectorized(
+            args.start_date, args.end_date, args.students, seed=args.seed
+        )
+    else:
+        df = generate_college_mess_data(args.start_date, args.end_date, args.students,
+                                        seed=args.seed)
     
     # Save and analyze
-    df = save_and_analyze_data(df)
+    df = save_and_analyze_data(df, output_format=args.format)
     
     print(f"\n📁 Next steps:")
     print(f"   1. Check the generated file: data/raw/college_mess_data.csv")
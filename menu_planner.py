@@ -0,0 +1,340 @@
+"""
+Menu Planner
+Searches weekly menu assignments: one batched model call scores every (day, meal, item),
+then local search runs on the score arrays alone
+"""
+
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+import predictor
+from policy_sim import DEFAULT_RMSE
+from predictor import MENU_ITEMS
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+DAYS_PER_WEEK = 7
+FATIGUE_WINDOW = 3         # an item served in any meal rests this many days (generate_data's fatigue window)
+CONSUMPTION_RATE = 0.90    # mean share of prepared food that is eaten (the generator draws 0.85-0.95)
+SAFETY_Z = 1.65            # portions prepared = forecast + z * model RMSE (policy_sim.safety_stock)
+OBJECTIVES = {
+    'waste': 'expected waste cost per student served (Rs)',
+    'spread': 'std. dev. of daily total attendance (students)',
+}
+
+# Search
+N_STARTS = 32              # weeks improved side by side, each round is one array evaluation
+MAX_ROUNDS = 300
+PERTURB_MOVES = 3          # random swaps applied to a week stuck in a local optimum
+VIOLATION_PENALTY = 1e9    # added per fatigue violation, so descent repairs weeks first
+
+# ============================================
+# SLOT SCORES
+# ============================================
+
+class WeekScores:
+    """Predicted attendance for every (meal, day, candidate item) of one week
+
+    A week is an int array of shape (n_meals, max_items): row m is a
+    permutation of positions into menu_items[meal m]. Its first
+    DAYS_PER_WEEK entries are served on `dates` in order, and the rest are
+    left out. Every method takes a batch of weeks with any leading
+    shape, so thousands of candidates are scored with a few array ops.
+    `params` are the mess's parameters (predictor.mess_params), for costs,
+    and `rmse` is the model's forecast error, for the waste objective.
+    """
+
+    def __init__(self, dates, menu_items, predicted, params=None, rmse=DEFAULT_RMSE):
+        self.dates = dates
+        self.params = params
+        self.rmse = rmse
+        self.meal_types = list(menu_items)
+        self.items = [list(menu_items[meal]) for meal in self.meal_types]
+        self.n_items = np.array([len(items) for items in self.items])
+        self.predicted = predicted  # (n_meals, n_days, max_items), NaN where a meal has fewer items
+
+        names = sorted({item for items in self.items for item in items})
+        self.codes = np.full(predicted.shape[::2], -1)
+        for m, items in enumerate(self.items):
+            self.codes[m, :len(items)] = [names.index(item) for item in items]
+
+        n_meals, n_days = predicted.shape[:2]
+        self._meal_index = np.arange(n_meals)[:, None]
+        self._day_index = np.arange(n_days)[None, :]
+
+    def served(self, weeks):
+        """Predicted attendance of the served items, shape (..., n_meals, n_days)"""
+        return self.predicted[self._meal_index, self._day_index, weeks[..., :DAYS_PER_WEEK]]
+
+    def violations(self, weeks, window=FATIGUE_WINDOW):
+        """Times an item is served twice within `window` days, counting across meals
+
+        The week is treated as a repeating rotation, so Sunday is followed by Monday.
+        Only items shared between meal lists can repeat: with the shipped
+        MENU_ITEMS (three separate lists of 7) this is always 0.
+        """
+        codes = self.codes[self._meal_index, weeks[..., :DAYS_PER_WEEK]]
+        n_meals = codes.shape[-2]
+        count = np.zeros(codes.shape[:-2], dtype=int)
+        for lag in range(window + 1):
+            later = np.roll(codes, -lag, axis=-1)
+            same = codes[..., :, None, :] == later[..., None, :, :]
+            if lag == 0:
+                same &= ~np.eye(n_meals, dtype=bool)[:, :, None]
+                count += same.sum(axis=(-3, -2, -1)) // 2
+            else:
+                count += same.sum(axis=(-3, -2, -1))
+        return count
+
+    def cost(self, weeks, objective='waste', window=FATIGUE_WINDOW):
+        """Objective plus VIOLATION_PENALTY per fatigue violation, lower is better"""
+        return (objective_value(self.served(weeks), objective, self.params, self.rmse)
+                + VIOLATION_PENALTY * self.violations(weeks, window))
+
+    def random_weeks(self, n, rng):
+        weeks = np.tile(np.arange(self.predicted.shape[2]), (n, len(self.meal_types), 1))
+        for m, n_items in enumerate(self.n_items):
+            weeks[:, m, :n_items] = rng.permuted(weeks[:, m, :n_items], axis=1)
+        return weeks
+
+    def moves(self):
+        """Every swap of a served position with a later position of the same meal, as (meal, a, b) arrays"""
+        moves = [(m, a, b) for m, n_items in enumerate(self.n_items)
+                 for a in range(DAYS_PER_WEEK) for b in range(a + 1, n_items)]
+        return tuple(np.array(column) for column in zip(*moves))
+
+    def to_frame(self, week):
+        """The week as a forecast-style DataFrame, one row per (day, meal)"""
+        predicted = self.served(week).astype(int)
+        food_kg, cost = predictor.food_and_cost(predicted, self.params)
+        n_meals = len(self.meal_types)
+        frame = pd.DataFrame({
+            'date': self.dates.repeat(n_meals),
+            'day_of_week': self.dates.day_name().repeat(n_meals),
+            'meal_type': np.tile(self.meal_types, DAYS_PER_WEEK),
+            'menu_item': [self.items[m][week[m, d]] for d in range(DAYS_PER_WEEK) for m in range(n_meals)],
+            'predicted_students': predicted.T.ravel(),
+            'food_kg': food_kg.T.ravel(),
+            'cost_rs': cost.T.ravel(),
+            'waste_cost_rs': expected_waste(predicted, self.params, self.rmse)[1].T.ravel(),
+        })
+        return frame
+
+
+def _normal_loss(z):
+    """E[max(X - z, 0)] for a standard normal X"""
+    return math.exp(-z * z / 2) / math.sqrt(2 * math.pi) - z * 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def expected_waste(predicted, params=None, rmse=DEFAULT_RMSE, z=SAFETY_Z):
+    """Expected (students served, waste cost in Rs) per slot under a safety-stock preparation
+
+    The mess cooks the forecast plus z * rmse portions, actual attendance is
+    Normal(predicted, rmse), students beyond the prepared portions go
+    without, and those served eat CONSUMPTION_RATE of their portion.
+    """
+    params = predictor.mess_params(params)
+    predicted = np.asarray(predicted, dtype=float)
+    served = np.maximum(predicted - rmse * _normal_loss(z), 0)
+    waste_kg = (predicted + z * rmse - CONSUMPTION_RATE * served) * params['food_per_person_kg']
+    return served, waste_kg * params['cost_per_kg_rs']
+
+
+def objective_value(served, objective='waste', params=None, rmse=DEFAULT_RMSE):
+    """Objective for predicted attendance of shape (..., n_meals, n_days)
+
+    'waste' is the week's expected waste cost divided by its expected
+    students served, so it measures over-preparation, not attendance.
+    """
+    if objective == 'waste':
+        students, waste = expected_waste(served, params, rmse)
+        return waste.sum(axis=(-2, -1)) / np.maximum(students.sum(axis=(-2, -1)), 1)
+    if objective == 'spread':
+        return served.sum(axis=-2).std(axis=-1)
+    raise ValueError(f"Unknown objective {objective!r}, expected one of {list(OBJECTIVES)}")
+
+
+def score_week(model, scaler, encoders, feature_names, week_start, menu_items=MENU_ITEMS,
+               weather='Sunny', temperature=28, is_exam=False, is_festival=False, is_start_sem=False,
+               feature_store=None, params=None, rmse=DEFAULT_RMSE):
+    """Predict every (day, meal, candidate item) of a week in one predict call
+
+    Inputs follow predictor.forecast: weather, temperature and flags are one
+    value for the week or one per day, a `feature_store` supplies
+    lag/rolling features from the latest actuals, and `params` are the
+    mess's parameters. `rmse` is the model's test RMSE (see WeekScores).
+    """
+    dates = pd.date_range(start=week_start, periods=DAYS_PER_WEEK, freq='D')
+    meal_types = list(menu_items)
+    max_items = max(len(items) for items in menu_items.values())
+    if min(len(items) for items in menu_items.values()) < DAYS_PER_WEEK:
+        raise ValueError(f"Each meal needs at least {DAYS_PER_WEEK} items to fill a week")
+
+    # Rows in (meal, day, item) order
+    day_index, meal_rows, item_rows = [], [], []
+    for meal in meal_types:
+        for d in range(DAYS_PER_WEEK):
+            day_index.extend([d] * len(menu_items[meal]))
+            meal_rows.extend([meal] * len(menu_items[meal]))
+            item_rows.extend(menu_items[meal])
+    day_index = np.array(day_index)
+    row_dates = dates[day_index]
+
+    def per_row(value):
+        value = np.asarray(value)
+        return value[day_index] if value.ndim else value
+
+    meal_rows = np.array(meal_rows, dtype=object)
+    history = None
+    if feature_store is not None:
+        history = feature_store.lookup_batch(meal_rows, row_dates.day_name())
+    features = predictor.prepare_features_batch(
+        row_dates, meal_rows, np.array(item_rows, dtype=object),
+        per_row(np.asarray(weather, dtype=object)), per_row(temperature),
+        per_row(is_exam), per_row(is_festival), per_row(is_start_sem),
+        encoders, feature_names, history=history, params=params
+    )
+    capacity = predictor.mess_params(params)['total_capacity']
+    flat = predictor.predict_batch(model, scaler, features, capacity).astype(float)
+
+    predicted = np.full((len(meal_types), DAYS_PER_WEEK, max_items), np.nan)
+    start = 0
+    for m, meal in enumerate(meal_types):
+        n_items = len(menu_items[meal])
+        predicted[m, :, :n_items] = flat[start:start + DAYS_PER_WEEK * n_items].reshape(DAYS_PER_WEEK, n_items)
+        start += DAYS_PER_WEEK * n_items
+    return WeekScores(dates, menu_items, predicted, params, rmse)
+
+# ============================================
+# LOCAL SEARCH
+# ============================================
+
+def local_search(scores, objective='waste', n_starts=N_STARTS, max_rounds=MAX_ROUNDS,
+                 fatigue_window=FATIGUE_WINDOW, perturb_moves=PERTURB_MOVES, time_limit=None, seed=42):
+    """Iterated best-improvement search over swap moves
+
+    `n_starts` random weeks descend together: each round scores every swap
+    neighbour of every week in one batch and takes the best improving one.
+    Weeks with no improving neighbour are local optima; the best is kept and
+    the week is kicked with `perturb_moves` random swaps. Stops after
+    `max_rounds` or `time_limit` seconds.
+    """
+    rng = np.random.default_rng(seed)
+    meal, a, b = scores.moves()
+    n_moves = len(meal)
+    move_index = np.arange(n_moves)
+
+    weeks = scores.random_weeks(n_starts, rng)
+    cost = scores.cost(weeks, objective, fatigue_window)
+    best = int(cost.argmin())
+    best_week, best_cost = weeks[best].copy(), cost[best]
+    evaluated, local_optima = n_starts, 0
+    start = time.perf_counter()
+
+    for round_ in range(1, max_rounds + 1):
+        neighbours = np.repeat(weeks[:, None], n_moves, axis=1)
+        neighbours[:, move_index, meal, a] = weeks[:, meal, b]
+        neighbours[:, move_index, meal, b] = weeks[:, meal, a]
+        neighbour_cost = scores.cost(neighbours, objective, fatigue_window)
+        evaluated += neighbour_cost.size
+
+        choice = neighbour_cost.argmin(axis=1)
+        choice_cost = neighbour_cost[np.arange(n_starts), choice]
+        improved = choice_cost < cost - 1e-9
+        weeks[improved] = neighbours[improved, choice[improved]]
+        cost[improved] = choice_cost[improved]
+
+        if cost.min() < best_cost:
+            best = int(cost.argmin())
+            best_week, best_cost = weeks[best].copy(), cost[best]
+
+        stuck = np.flatnonzero(~improved)
+        local_optima += len(stuck)
+        for _ in range(perturb_moves):
+            k = rng.integers(n_moves, size=len(stuck))
+            left, right = weeks[stuck, meal[k], a[k]], weeks[stuck, meal[k], b[k]]
+            weeks[stuck, meal[k], a[k]], weeks[stuck, meal[k], b[k]] = right, left
+        cost[stuck] = scores.cost(weeks[stuck], objective, fatigue_window)
+
+        if time_limit is not None and time.perf_counter() - start > time_limit:
+            break
+
+    return {
+        'week': best_week,
+        'cost': float(best_cost),
+        'violations': int(scores.violations(best_week, fatigue_window)),
+        'rounds': round_,
+        'evaluated': evaluated,
+        'local_optima': local_optima,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def plan_week(model, scaler, encoders, feature_names, week_start, objective='waste',
+              menu_items=MENU_ITEMS, weather='Sunny', temperature=28, is_exam=False,
+              is_festival=False, is_start_sem=False, feature_store=None, params=None, rmse=DEFAULT_RMSE,
+              **search):
+    """Best weekly menu found for `objective`, as (plan DataFrame, {day_name: {meal: item}}, search summary)
+
+    The menu dict can be passed to predictor.forecast(weekly_menu=...).
+    """
+    scores = score_week(model, scaler, encoders, feature_names, week_start, menu_items, weather,
+                        temperature, is_exam, is_festival, is_start_sem, feature_store, params, rmse)
+    result = local_search(scores, objective, **search)
+    plan = scores.to_frame(result['week'])
+    weekly_menu = {}
+    for row in plan.itertuples():
+        weekly_menu.setdefault(row.day_of_week, {})[row.meal_type] = row.menu_item
+    return plan, weekly_menu, result
+
+
+def forecast_objective(forecast_df, objective='waste', params=None, rmse=DEFAULT_RMSE):
+    """Objective of a predictor.forecast frame covering one week, e.g. the fixed rotation"""
+    served = forecast_df.pivot(index='meal_type', columns='date', values='predicted_students')
+    return float(objective_value(served.to_numpy(dtype=float), objective, params, rmse))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from feature_store import OnlineFeatureStore
+    from model_bundle import load_bundle
+
+    parser = argparse.ArgumentParser(description="Plan a weekly menu with the attendance model")
+    parser.add_argument('--week-start', default=(pd.Timestamp.today().normalize()
+                                                 + pd.offsets.Week(weekday=0)).strftime('%Y-%m-%d'))
+    parser.add_argument('--objective', choices=list(OBJECTIVES), default='waste')
+    parser.add_argument('--weather', choices=predictor.WEATHER_TYPES, default='Sunny')
+    parser.add_argument('--temperature', type=float, default=28)
+    parser.add_argument('--starts', type=int, default=N_STARTS)
+    parser.add_argument('--rounds', type=int, default=MAX_ROUNDS)
+    parser.add_argument('--history', default='data/raw/college_mess_data.csv')
+    args = parser.parse_args()
+
+    bundle = load_bundle()
+    store = OnlineFeatureStore.from_history(pd.read_csv(args.history, parse_dates=['date']))
+    common = dict(weather=args.weather, temperature=args.temperature, feature_store=store)
+    rmse = bundle.metadata['performance']['test_rmse']
+
+    plan, weekly_menu, result = plan_week(
+        bundle.engine, None, bundle.encoders, bundle.feature_names, args.week_start, args.objective,
+        rmse=rmse, n_starts=args.starts, max_rounds=args.rounds, **common
+    )
+    rotation = predictor.forecast(bundle.engine, None, bundle.encoders, bundle.feature_names,
+                                  args.week_start, **common)
+
+    print("\n" + "="*60)
+    print(f"🗓️  MENU PLAN FOR WEEK OF {args.week_start} ({OBJECTIVES[args.objective]})")
+    print("="*60)
+    print(plan.pivot(index='day_of_week', columns='meal_type', values='menu_item')
+              .reindex(plan['day_of_week'].unique())[list(MENU_ITEMS)].to_string())
+    print(f"\n✅ Objective: {result['cost']:,.2f} vs. "
+          f"{forecast_objective(rotation, args.objective, rmse=rmse):,.2f} "
+          f"for the fixed rotation")
+    print(f"   Searched {result['evaluated']:,} weeks in {result['seconds']:.2f} s "
+          f"({result['rounds']} rounds, {result['violations']} fatigue violations)")
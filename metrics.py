@@ -0,0 +1,176 @@
+"""
+Predictor Metrics
+Timing spans and counters for the prediction hot path, exported in Prometheus text format
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import numpy as np
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+ENV_FLAG = 'MESS_METRICS'                     # set to 1 to collect from startup
+METRICS_FILE = os.environ.get('MESS_METRICS_FILE', 'metrics/predictor.prom')
+PREFIX = 'mess'
+
+# Histogram upper bounds, seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+RECENT_SAMPLES = 1000
+
+COUNTER_HELP = {
+    'requests_total': 'Prediction requests handled',
+    'errors_total': 'Prediction requests that failed',
+    'predictions_clamped_total': 'Predictions clamped to the 0..capacity range',
+    'forecast_table_total': 'Requests answered from (hit) or past (miss) the precomputed forecast table',
+    'registry_loads_total': 'Mess model bundles loaded into the registry',
+    'registry_evictions_total': 'Mess model bundles evicted to stay within the registry memory budget',
+}
+
+# ============================================
+# REGISTRY
+# ============================================
+
+class SpanStats:
+    """Cumulative histogram of one span plus its most recent durations"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+
+
+class _Span:
+    __slots__ = ('registry', 'name', 'start')
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+_NOOP = nullcontext()
+
+
+class Metrics:
+    """Process-wide spans and counters; disabled, span() is one flag check
+
+    Counters are keyed by name and a label tuple, e.g.
+    ('predictions_clamped_total', (('bound', 'high'),)).
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.spans = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self.lock:
+            self.spans.clear()
+            self.counters.clear()
+
+    def span(self, name):
+        """Context manager timing its block into the `name` histogram"""
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name)
+
+    def observe(self, name, seconds):
+        with self.lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                stats = self.spans[name] = SpanStats()
+            stats.observe(seconds)
+
+    def increment(self, name, value=1, **labels):
+        if not self.enabled or not value:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def snapshot(self):
+        """Span summaries (ms) and counter values, for display"""
+        with self.lock:
+            spans = {}
+            for name, stats in self.spans.items():
+                recent_ms = np.array(stats.recent) * 1000
+                spans[name] = {
+                    'count': stats.count,
+                    'mean_ms': stats.total / stats.count * 1000,
+                    'p50_ms': float(np.percentile(recent_ms, 50)),
+                    'p99_ms': float(np.percentile(recent_ms, 99)),
+                    'max_ms': float(recent_ms.max()),
+                }
+            counters = {
+                name + ('{' + ','.join(f'{k}={v}' for k, v in labels) + '}' if labels else ''): value
+                for (name, labels), value in sorted(self.counters.items())
+            }
+        return {'spans': spans, 'counters': counters}
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self.lock:
+            if self.spans:
+                metric = f'{PREFIX}_span_seconds'
+                lines += [f'# HELP {metric} Time spent in instrumented predictor stages',
+                          f'# TYPE {metric} histogram']
+                for name, stats in sorted(self.spans.items()):
+                    for bound, count in zip(BUCKETS, stats.buckets):
+                        lines.append(f'{metric}_bucket{{span="{name}",le="{bound:g}"}} {count}')
+                    lines.append(f'{metric}_bucket{{span="{name}",le="+Inf"}} {stats.count}')
+                    lines.append(f'{metric}_sum{{span="{name}"}} {stats.total:.9f}')
+                    lines.append(f'{metric}_count{{span="{name}"}} {stats.count}')
+
+            for name in sorted({name for name, _ in self.counters}):
+                metric = f'{PREFIX}_{name}'
+                lines += [f'# HELP {metric} {COUNTER_HELP.get(name, name)}', f'# TYPE {metric} counter']
+                for (counter, labels), value in sorted(self.counters.items()):
+                    if counter == name:
+                        label_text = ','.join(f'{k}="{v}"' for k, v in labels)
+                        lines.append(f'{metric}{{{label_text}}} {value}' if labels else f'{metric} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path=METRICS_FILE):
+        """Atomically replace `path` with the current exposition (for a textfile scraper)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+        return path
+
+
+# Shared registry used by the predictor and the app
+METRICS = Metrics(enabled=os.environ.get(ENV_FLAG, '') not in ('', '0'))
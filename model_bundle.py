@@ -0,0 +1,276 @@
+"""
+Model Bundle
+One versioned, content-hashed directory holding everything needed to serve the model
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from tree_engine import TreeEnsemble
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+MODELS_DIR = 'models'
+BUNDLE_DIR = 'models/bundle'
+BUNDLE_FORMAT = 1
+
+MANIFEST_FILE = 'manifest.json'
+MODEL_FILE = 'model.pkl'
+TREES_FILE = 'trees.npz'
+SCALER_MEAN_FILE = 'scaler_mean.npy'
+SCALER_SCALE_FILE = 'scaler_scale.npy'
+SCALER_VAR_FILE = 'scaler_var.npy'
+
+# ============================================
+# ARRAY-BACKED PREPROCESSORS
+# ============================================
+
+class ArrayScaler:
+    """StandardScaler.transform from plain mean/scale arrays (bit-identical)"""
+
+    def __init__(self, mean, scale, var=None, feature_names=None):
+        self.mean_ = mean
+        self.scale_ = scale
+        self.var_ = var
+        self.feature_names_in_ = None if feature_names is None else np.asarray(feature_names, dtype=object)
+        self.n_features_in_ = len(mean)
+
+    def transform(self, X):
+        if self.feature_names_in_ is not None and hasattr(X, 'columns'):
+            if list(X.columns) != list(self.feature_names_in_):
+                raise ValueError("Feature names/order differ from those seen at fit time")
+        X = np.array(X, dtype=np.float64)
+        X -= self.mean_
+        X /= self.scale_
+        return X
+
+
+class ArrayEncoder:
+    """LabelEncoder.transform from a sorted classes_ array"""
+
+    def __init__(self, classes):
+        self.classes_ = classes
+
+    def transform(self, values):
+        values = np.asarray(values).astype(str)
+        codes = np.searchsorted(self.classes_, values)
+        codes = np.minimum(codes, len(self.classes_) - 1)
+        unseen = self.classes_[codes] != values
+        if np.any(unseen):
+            raise ValueError(f"y contains previously unseen labels: {sorted(set(values[unseen].tolist()))}")
+        return codes
+
+# ============================================
+# BUNDLE
+# ============================================
+
+def _sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _content_hash(files, params=None):
+    """Hash of every payload file's hash, in name order, then of the mess parameters if any
+
+    Bundles without parameters hash their files only, as before parameters existed.
+    """
+    digest = hashlib.sha256()
+    for name in sorted(files):
+        digest.update(f'{name}:{files[name]}\n'.encode())
+    if params:
+        digest.update(f'mess:{json.dumps(params, sort_keys=True)}\n'.encode())
+    return digest.hexdigest()
+
+
+class ModelBundle:
+    """A loaded bundle: metadata and preprocessors eagerly, the model on first use
+
+    The scaler and encoders are served from memory-mapped .npy arrays, so
+    opening a bundle imports neither sklearn nor pandas. `engine` is the
+    flat-array TreeEnsemble with the scaler folded in (takes raw features,
+    no sklearn); `model` is the original sklearn estimator. Each is loaded
+    the first time it is accessed, after its file hash is checked against
+    the manifest. `params` are the mess's serving parameters (capacity,
+    staff, costs, menu...) for predictor.mess_params; empty for a bundle
+    built without them, which then serves predictor.MESS_PARAMS.
+    """
+
+    def __init__(self, path, manifest, scaler, encoders):
+        self.path = path
+        self.manifest = manifest
+        self.version = manifest['version']
+        self.content_hash = manifest['content_hash']
+        self.metadata = manifest['metadata']
+        self.feature_names = manifest['feature_names']
+        self.params = manifest.get('mess', {})
+        self.scaler = scaler
+        self.encoders = encoders
+        self._model = None
+        self._engine = None
+        self._lock = threading.Lock()
+
+    def _checked_path(self, name):
+        path = os.path.join(self.path, name)
+        if _sha256(path) != self.manifest['files'][name]:
+            raise ValueError(f"{path} does not match the bundle manifest")
+        return path
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    with open(self._checked_path(MODEL_FILE), 'rb') as f:
+                        self._model = pickle.load(f)
+        return self._model
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = TreeEnsemble.load(self._checked_path(TREES_FILE))
+        return self._engine
+
+    @property
+    def model_loaded(self):
+        return self._model is not None
+
+    def nbytes(self):
+        """Bytes held by what is loaded: preprocessor and engine arrays, plus the model pickle's size"""
+        arrays = [self.scaler.mean_, self.scaler.scale_, self.scaler.var_]
+        arrays += [encoder.classes_ for encoder in self.encoders.values()]
+        if self._engine is not None:
+            arrays += [getattr(self._engine, name) for name in TreeEnsemble.ARRAYS]
+        total = sum(array.nbytes for array in arrays if array is not None)
+        if self._model is not None:
+            total += os.path.getsize(os.path.join(self.path, MODEL_FILE))
+        return total
+
+    def artifacts(self):
+        """(model, scaler, encoders, feature_names), as predictor.load_artifacts"""
+        return self.model, self.scaler, self.encoders, self.feature_names
+
+    def verify(self):
+        """Re-hash every payload file; True if the bundle is intact"""
+        files = {name: _sha256(os.path.join(self.path, name)) for name in self.manifest['files']}
+        content_hash = _content_hash(files, self.manifest.get('mess'))
+        return files == self.manifest['files'] and content_hash == self.content_hash
+
+
+def build_bundle(models_dir=MODELS_DIR, bundle_dir=BUNDLE_DIR):
+    """Pack the training artifacts in models_dir into a bundle directory
+
+    Checks that the model, scaler, feature_names.pkl and
+    model_metadata.json all agree on the feature schema before writing.
+    The metadata's 'mess' entry, if any, becomes the manifest's mess
+    parameters (ModelBundle.params) and is covered by the content hash.
+    Returns the manifest.
+    """
+    with open(f'{models_dir}/best_model.pkl', 'rb') as f:
+        model = pickle.load(f)
+    with open(f'{models_dir}/scaler.pkl', 'rb') as f:
+        scaler = pickle.load(f)
+    with open(f'{models_dir}/label_encoders.pkl', 'rb') as f:
+        encoders = pickle.load(f)
+    with open(f'{models_dir}/feature_names.pkl', 'rb') as f:
+        feature_names = list(pickle.load(f))
+    with open(f'{models_dir}/model_metadata.json') as f:
+        metadata = json.load(f)
+
+    # Schema checks
+    if metadata.get('feature_names', feature_names) != feature_names:
+        raise ValueError("model_metadata.json feature_names differ from feature_names.pkl")
+    if list(getattr(scaler, 'feature_names_in_', feature_names)) != feature_names:
+        raise ValueError("Scaler was fit on a different feature order")
+    for name, n in [('model', model.n_features_in_), ('scaler', scaler.n_features_in_),
+                    ('metadata', metadata.get('n_features', len(feature_names)))]:
+        if n != len(feature_names):
+            raise ValueError(f"{name} expects {n} features, feature_names has {len(feature_names)}")
+
+    os.makedirs(bundle_dir, exist_ok=True)
+    shutil.copyfile(f'{models_dir}/best_model.pkl', os.path.join(bundle_dir, MODEL_FILE))
+    TreeEnsemble.from_model(model, scaler).save(os.path.join(bundle_dir, TREES_FILE))
+    np.save(os.path.join(bundle_dir, SCALER_MEAN_FILE), scaler.mean_)
+    np.save(os.path.join(bundle_dir, SCALER_SCALE_FILE), scaler.scale_)
+    np.save(os.path.join(bundle_dir, SCALER_VAR_FILE), scaler.var_)
+    encoder_files = {}
+    for key, encoder in encoders.items():
+        encoder_files[key] = f'encoder_{key}.npy'
+        np.save(os.path.join(bundle_dir, encoder_files[key]), encoder.classes_.astype(str))
+
+    payload = [MODEL_FILE, TREES_FILE, SCALER_MEAN_FILE, SCALER_SCALE_FILE, SCALER_VAR_FILE] + list(encoder_files.values())
+    files = {name: _sha256(os.path.join(bundle_dir, name)) for name in payload}
+    mess_params = metadata.get('mess')
+    content_hash = _content_hash(files, mess_params)
+
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'version': content_hash[:12],
+        'content_hash': content_hash,
+        'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'feature_names': feature_names,
+        'encoders': encoder_files,
+        'files': files,
+        'metadata': {k: v for k, v in metadata.items() if k not in ('feature_names', 'mess')},
+    }
+    if mess_params:
+        manifest['mess'] = mess_params
+    with open(os.path.join(bundle_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def bundle_version(bundle_dir=BUNDLE_DIR):
+    """Version in the bundle's manifest, without loading anything else (None if absent)"""
+    try:
+        with open(os.path.join(bundle_dir, MANIFEST_FILE)) as f:
+            return json.load(f)['version']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def load_bundle(bundle_dir=BUNDLE_DIR, mmap=True):
+    """Open a bundle; scaler/encoder arrays are memory-mapped unless mmap=False"""
+    with open(os.path.join(bundle_dir, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported bundle format: {manifest.get('format')}")
+
+    mode = 'r' if mmap else None
+    load = lambda name: np.load(os.path.join(bundle_dir, name), mmap_mode=mode)
+    scaler = ArrayScaler(load(SCALER_MEAN_FILE), load(SCALER_SCALE_FILE), load(SCALER_VAR_FILE),
+                         feature_names=manifest['feature_names'])
+    encoders = {key: ArrayEncoder(load(name)) for key, name in manifest['encoders'].items()}
+    return ModelBundle(bundle_dir, manifest, scaler, encoders)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or verify the model bundle")
+    parser.add_argument('--models-dir', default=MODELS_DIR, help="Directory with the training pickles")
+    parser.add_argument('--bundle-dir', default=BUNDLE_DIR, help="Bundle output directory")
+    parser.add_argument('--verify', action='store_true', help="Verify an existing bundle instead")
+    args = parser.parse_args()
+
+    if args.verify:
+        bundle = load_bundle(args.bundle_dir)
+        ok = bundle.verify()
+        print(f"{'✅' if ok else '❌'} Bundle {bundle.version} at {args.bundle_dir}: "
+              f"{'intact' if ok else 'hash mismatch'}")
+        raise SystemExit(0 if ok else 1)
+
+    manifest = build_bundle(args.models_dir, args.bundle_dir)
+    print(f"✅ Bundle {manifest['version']} written to {args.bundle_dir}/")
+    print(f"   Features: {len(manifest['feature_names'])}")
+    print(f"   Content hash: {manifest['content_hash']}")
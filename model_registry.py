@@ -0,0 +1,275 @@
+"""
+Model Registry
+One model bundle per mess, loaded on demand and kept in an LRU bounded by a memory budget
+"""
+
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from metrics import METRICS
+from model_bundle import BUNDLE_DIR, MANIFEST_FILE, MODELS_DIR, build_bundle, bundle_version, load_bundle
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+DEFAULT_MESS = 'main'                  # the original campus: models/ and models/bundle
+REGISTRY_DIR = 'models/messes'         # every other mess: models/messes/<mess_id>/{*.pkl, bundle/}
+HISTORY_FILE = 'data/raw/college_mess_data.csv'
+HISTORY_DIR = 'data/messes'            # <mess_id>.csv, raw attendance for its feature store
+
+# Bundles resident at once are bounded by bytes, not count (override with MESS_REGISTRY_BUDGET_MB)
+BUDGET_MB = float(os.environ.get('MESS_REGISTRY_BUDGET_MB', 16))
+TEST_SIZE = 0.2                        # chronological holdout when training a mess (notebook 03's split)
+
+# ============================================
+# LAYOUT
+# ============================================
+
+def models_dir(mess_id, registry_dir=REGISTRY_DIR):
+    """Training artifacts of a mess (what retrain.py updates)"""
+    return MODELS_DIR if mess_id == DEFAULT_MESS else os.path.join(registry_dir, mess_id)
+
+
+def bundle_dir(mess_id, registry_dir=REGISTRY_DIR):
+    return BUNDLE_DIR if mess_id == DEFAULT_MESS else os.path.join(registry_dir, mess_id, 'bundle')
+
+
+def history_file(mess_id, history_dir=HISTORY_DIR):
+    return HISTORY_FILE if mess_id == DEFAULT_MESS else os.path.join(history_dir, f'{mess_id}.csv')
+
+
+def list_messes(registry_dir=REGISTRY_DIR):
+    """Mess ids with a built bundle, DEFAULT_MESS first"""
+    messes = [DEFAULT_MESS] if os.path.exists(os.path.join(BUNDLE_DIR, MANIFEST_FILE)) else []
+    if os.path.isdir(registry_dir):
+        messes += sorted(name for name in os.listdir(registry_dir)
+                         if os.path.exists(os.path.join(bundle_dir(name, registry_dir), MANIFEST_FILE)))
+    return messes
+
+# ============================================
+# REGISTRY
+# ============================================
+
+class ModelRegistry:
+    """Thread-safe LRU of loaded bundles keyed by mess id, bounded by a memory budget
+
+    get() checks the modification time of the mess's manifest on every
+    call, so a rebuilt bundle replaces the cached one on its next use. Bundles are loaded
+    outside the lock, so a slow load never blocks hits for other messes.
+    After each load the least recently used bundles are evicted until the
+    resident bytes (ModelBundle.nbytes) fit the budget; the bundle just
+    loaded always stays, even if it alone exceeds the budget.
+    """
+
+    def __init__(self, budget_mb=BUDGET_MB, registry_dir=REGISTRY_DIR):
+        self.budget_bytes = int(budget_mb * 1e6)
+        self.registry_dir = registry_dir
+        self.entries = OrderedDict()   # mess_id -> (manifest mtime, bundle)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    def mess_ids(self):
+        return list_messes(self.registry_dir)
+
+    def version(self, mess_id):
+        """Manifest version of a mess's bundle on disk (None if it has none)"""
+        return bundle_version(bundle_dir(mess_id, self.registry_dir))
+
+    def versions(self):
+        """{mess_id: version} of every mess on disk, e.g. to bind a PredictionCache"""
+        return {mess_id: self.version(mess_id) for mess_id in self.mess_ids()}
+
+    def get(self, mess_id):
+        """The mess's bundle with its tree engine loaded, from memory when current"""
+        path = bundle_dir(mess_id, self.registry_dir)
+        try:
+            mtime = os.path.getmtime(os.path.join(path, MANIFEST_FILE))
+        except OSError:
+            raise KeyError(f"No model bundle for mess {mess_id!r}") from None
+        with self.lock:
+            entry = self.entries.get(mess_id)
+            if entry is not None and entry[0] == mtime:
+                self.entries.move_to_end(mess_id)
+                self.hits += 1
+                return entry[1]
+
+        start = time.perf_counter()
+        with METRICS.span('registry.load'):
+            bundle = load_bundle(path)
+            bundle.engine  # load the trees now, so their bytes count toward the budget
+        elapsed = time.perf_counter() - start
+
+        with self.lock:
+            self.entries[mess_id] = (mtime, bundle)
+            self.entries.move_to_end(mess_id)
+            self.loads += 1
+            self.load_seconds += elapsed
+            evicted = self._evict()
+        METRICS.increment('registry_loads_total', mess=mess_id)
+        for evicted_id in evicted:
+            METRICS.increment('registry_evictions_total', mess=evicted_id)
+        return bundle
+
+    def _resident_bytes(self):
+        return sum(bundle.nbytes() for _, bundle in self.entries.values())
+
+    def _evict(self):
+        """Drop least recently used bundles until the rest fit the budget (lock held)"""
+        evicted = []
+        while len(self.entries) > 1 and self._resident_bytes() > self.budget_bytes:
+            mess_id, _ = self.entries.popitem(last=False)
+            evicted.append(mess_id)
+            self.evictions += 1
+        return evicted
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.loads
+            return {
+                'resident': list(self.entries),
+                'resident_bytes': self._resident_bytes(),
+                'budget_bytes': self.budget_bytes,
+                'hits': self.hits,
+                'loads': self.loads,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'mean_load_ms': 1e3 * self.load_seconds / self.loads if self.loads else 0.0,
+            }
+
+# ============================================
+# PER-MESS TRAINING
+# ============================================
+
+def params_from_history(raw):
+    """Serving parameters of a mess from its own raw attendance (see predictor.MESS_PARAMS)
+
+    The candidate menu is not derived: history only shows the rotation
+    actually served, which may repeat an item across meals. A mess with
+    its own menu sets 'menu_items' in its model_metadata.json 'mess' entry.
+    """
+    return {
+        'total_capacity': int(raw['total_capacity'].max()),
+        'staff_count': int(raw['staff_count'].median()),
+        'serving_duration_mins': int(raw['serving_duration_mins'].median()),
+        'student_satisfaction': round(float(raw['student_satisfaction'].mean()), 2),
+        'cost_per_kg_rs': round(float(raw['cost_per_kg_rs'].mean()), 2),
+    }
+
+
+def train_mess(mess_id, raw, base_models_dir=MODELS_DIR, registry_dir=REGISTRY_DIR, test_size=TEST_SIZE):
+    """Fit a model on one mess's raw history and build its bundle
+
+    Uses the base model's hyperparameters, label encoders and feature
+    order. As in notebook 03 the model is fitted on the first 1 - test_size
+    of the rows and scored on the rest, so retrain.py can later add the
+    newer days incrementally. Returns the manifest.
+    """
+    from features import build_features
+    from retrain import STATE_FILE, full_refit
+
+    with open(f'{base_models_dir}/label_encoders.pkl', 'rb') as f:
+        encoders = pickle.load(f)
+    with open(f'{base_models_dir}/feature_names.pkl', 'rb') as f:
+        feature_names = list(pickle.load(f))
+    with open(f'{base_models_dir}/model_metadata.json') as f:
+        base_metadata = json.load(f)
+
+    raw = raw.drop(columns=['campus_id'], errors='ignore')
+    df = build_features(raw, encoders=encoders)
+    n_train = int(len(df) * (1 - test_size))
+    split_date = df['date'].iloc[n_train]
+    test = df[df['date'] >= split_date]
+    model, scaler, state, n_rows = full_refit(raw[pd.to_datetime(raw['date']) < split_date], encoders,
+                                              feature_names, base_metadata['hyperparameters'])
+
+    y_test = test['students_attended'].to_numpy()
+    pred = model.predict(pd.DataFrame(scaler.transform(test[feature_names]), columns=feature_names))
+    errors = pred - y_test
+    metadata = {
+        'model_name': base_metadata['model_name'],
+        'model_type': base_metadata['model_type'],
+        'training_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'training_samples': n_rows,
+        'test_samples': len(test),
+        'n_features': len(feature_names),
+        'performance': {
+            'test_mae': float(np.abs(errors).mean()),
+            'test_rmse': float(np.sqrt(np.mean(errors ** 2))),
+            'test_r2': float(1 - np.sum(errors ** 2) / np.sum((y_test - y_test.mean()) ** 2)),
+            'test_mape': float(np.mean(np.abs(errors) / y_test) * 100),
+        },
+        'hyperparameters': base_metadata['hyperparameters'],
+        'data_end': str(state.data_end.date()),
+        'mess_id': mess_id,
+        'mess': params_from_history(raw),
+        'feature_names': feature_names,
+    }
+
+    target = models_dir(mess_id, registry_dir)
+    os.makedirs(target, exist_ok=True)
+    with open(f'{target}/best_model.pkl', 'wb') as f:
+        pickle.dump(model, f)
+    with open(f'{target}/scaler.pkl', 'wb') as f:
+        pickle.dump(scaler, f)
+    with open(f'{target}/label_encoders.pkl', 'wb') as f:
+        pickle.dump(encoders, f)
+    with open(f'{target}/feature_names.pkl', 'wb') as f:
+        pickle.dump(feature_names, f)
+    with open(f'{target}/model_metadata.json', 'w') as f:
+        json.dump(metadata, f, indent=2)
+    state.save(os.path.join(target, STATE_FILE))
+    return build_bundle(target, bundle_dir(mess_id, registry_dir))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train per-mess bundles, or list the registry")
+    parser.add_argument('--campuses', type=int, default=0,
+                        help="generate this many synthetic messes (generate_data.make_campuses) and train each")
+    parser.add_argument('--start-date', default=None, help="history start (default: generator's)")
+    parser.add_argument('--end-date', default=None, help="history end (default: generator's)")
+    args = parser.parse_args()
+
+    if args.campuses:
+        from generate_data import END_DATE, START_DATE, generate_sharded_mess_data, make_campuses
+
+        campuses = make_campuses(args.campuses)
+        raw = generate_sharded_mess_data(campuses, args.start_date or START_DATE, args.end_date or END_DATE)
+        os.makedirs(HISTORY_DIR, exist_ok=True)
+        print("\n" + "="*60)
+        print(f"🏫 TRAINING {len(campuses)} MESSES")
+        print("="*60)
+        for mess_id, capacity in campuses.items():
+            mess_raw = raw[raw['campus_id'] == mess_id].drop(columns=['campus_id'])
+            mess_raw.to_csv(history_file(mess_id), index=False)
+            start = time.perf_counter()
+            manifest = train_mess(mess_id, mess_raw)
+            print(f"✅ {mess_id}: capacity {capacity:>5}, test RMSE "
+                  f"{manifest['metadata']['performance']['test_rmse']:6.2f}, bundle {manifest['version']} "
+                  f"({time.perf_counter() - start:.1f}s)")
+
+    registry = ModelRegistry()
+    print(f"\n📚 {len(registry.mess_ids())} messes in the registry (budget {registry.budget_bytes / 1e6:.0f} MB):")
+    for mess_id in registry.mess_ids():
+        bundle = registry.get(mess_id)
+        print(f"   {mess_id:<8} {bundle.version}  capacity "
+              f"{bundle.params.get('total_capacity', 'default'):>7}  {bundle.nbytes() / 1e3:,.0f} KB")
+    stats = registry.stats()
+    print(f"   {stats['loads']} loads ({stats['mean_load_ms']:.1f} ms each), {stats['evictions']} evictions")
@@ -0,0 +1,580 @@
+"""
+Offline Pipeline
+generate → features → split → models → artifacts as content-addressed stages: each stage's output
+is cached under a hash of its inputs' contents, its parameters and its code, and skipped when unchanged
+"""
+
+import copy
+import hashlib
+import json
+import os
+import pickle
+import platform
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from generate_data import END_DATE, SEED, START_DATE, TOTAL_STUDENTS
+from model_bundle import BUNDLE_DIR, MODELS_DIR
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+CACHE_DIR = 'models/pipeline_cache'
+RECORD_FILE = 'stage.json'        # written last: its presence marks a complete stage directory
+RUN_FILE = 'pipeline.json'        # in the output directory: the artifacts key it was exported from
+RAW_FILE = 'data/raw/college_mess_data.csv'           # the history the app, retrain and backtest read
+FEATURE_NAMES_FILE = f'{MODELS_DIR}/feature_names.pkl'
+
+# Notebook 03 cell 3: target, raw categoricals, columns derived from the target
+# or the same day, helper columns and data-only columns
+EXCLUDE_COLS = [
+    'students_attended', 'date',
+    'menu_item', 'day_of_week', 'weather', 'meal_type',
+    'food_prepared_kg', 'food_consumed_kg', 'food_wasted_kg',
+    'waste_percentage', 'total_cost_rs', 'waste_cost_rs', 'attendance_rate',
+    'week_year', 'meal_type_avg', 'dow_avg',
+    'daily_total_attendance', 'daily_avg_attendance', 'weekly_avg_attendance',
+    'pct_of_daily_attendance', 'deviation_from_meal_avg', 'pct_deviation_from_meal_avg',
+    'deviation_from_dow_avg',
+    'serving_duration_mins', 'total_capacity', 'student_satisfaction', 'cost_per_kg_rs', 'staff_count',
+]
+
+# Notebook 03 cell 6 baselines as (class path, parameters). n_jobs is left to the
+# stage pool, which already keeps every core busy with whole models.
+BASELINE_MODELS = {
+    'Linear Regression': ('sklearn.linear_model.LinearRegression', {}),
+    'Ridge': ('sklearn.linear_model.Ridge', {'random_state': 42}),
+    'Lasso': ('sklearn.linear_model.Lasso', {'random_state': 42}),
+    'Decision Tree': ('sklearn.tree.DecisionTreeRegressor', {'random_state': 42}),
+    'Random Forest': ('sklearn.ensemble.RandomForestRegressor', {'n_estimators': 100, 'random_state': 42}),
+    'Gradient Boosting': ('sklearn.ensemble.GradientBoostingRegressor', {'random_state': 42}),
+    'XGBoost': ('xgboost.XGBRegressor', {'random_state': 42}),
+    'KNN': ('sklearn.neighbors.KNeighborsRegressor', {'n_neighbors': 5}),
+    'SVR': ('sklearn.svm.SVR', {}),
+}
+
+# By default the shipped model is reproduced: the repo's raw CSV and feature order
+DEFAULT_CONFIG = {
+    'generate': {'engine': 'loop', 'start_date': START_DATE, 'end_date': END_DATE,
+                 'total_students': TOTAL_STUDENTS, 'seed': SEED},
+    'raw': RAW_FILE,              # raw CSV to train on; None generates data from 'generate'
+    # A feature_names.pkl (or one-name-per-line) file, a list, or None for notebook 03's selection
+    'split': {'features': FEATURE_NAMES_FILE, 'test_fraction': 0.2},
+    'model': {'name': 'Gradient Boosting',
+              'hyperparameters': {'subsample': 0.8, 'n_estimators': 300, 'min_samples_split': 5,
+                                  'max_depth': 3, 'learning_rate': 0.05}},
+    'baselines': list(BASELINE_MODELS),
+}
+
+# Source files each stage runs; editing one invalidates that stage (and whatever its output changes).
+# pipeline.py holds EXCLUDE_COLS, BASELINE_MODELS and every stage body, so every stage hashes it.
+STAGE_CODE = {
+    'generate': ['pipeline.py', 'generate_data.py', 'schema.py'],
+    'features': ['pipeline.py', 'features.py'],
+    'split': ['pipeline.py'],
+    'baseline': ['pipeline.py'],
+    'model': ['pipeline.py', 'tuning.py'],
+    'artifacts': ['pipeline.py', 'model_bundle.py', 'tree_engine.py'],
+}
+
+# ============================================
+# CONTENT HASHES
+# ============================================
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _environment():
+    """Library versions every cached output depends on"""
+    import sklearn
+
+    return {'python': platform.python_version(), 'numpy': np.__version__,
+            'pandas': pd.__version__, 'sklearn': sklearn.__version__}
+
+
+def stage_key(stage, params, inputs):
+    """Hash of the stage's code, parameters and input output-hashes
+
+    `inputs` maps upstream stage names to their output hashes, so a
+    stage rerun that writes identical files leaves everything
+    downstream cached.
+    """
+    code = {name: _sha256(name) for name in STAGE_CODE[stage] if os.path.exists(name)}
+    payload = {'stage': stage, 'env': _environment(),
+               'code': code, 'params': params, 'inputs': inputs}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def output_hash(directory):
+    """Hash of every output file's hash, in name order (the record file excluded)"""
+    digest = hashlib.sha256()
+    for root, _, names in sorted(os.walk(directory)):
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            if name != RECORD_FILE:
+                digest.update(f'{os.path.relpath(path, directory)}:{_sha256(path)}\n'.encode())
+    return digest.hexdigest()[:16]
+
+# ============================================
+# STAGE CACHE
+# ============================================
+
+class StageCache:
+    """Stage outputs in <root>/<stage>/<key>/, complete once RECORD_FILE exists
+
+    A stage is computed into a scratch directory and renamed into place,
+    so an interrupted run leaves no half-written entry behind.
+    """
+
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+
+    def path(self, stage, key):
+        return os.path.join(self.root, stage, key)
+
+    def get(self, stage, key):
+        """The stage's record, or None when it has not been computed"""
+        record = os.path.join(self.path(stage, key), RECORD_FILE)
+        if not os.path.exists(record):
+            return None
+        with open(record) as f:
+            return json.load(f)
+
+    def scratch(self, stage, key):
+        directory = f'{self.path(stage, key)}.tmp{os.getpid()}'
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+        return directory
+
+    def commit(self, stage, key, scratch, params, inputs, seconds, summary=None):
+        """Record the scratch directory's outputs and move it into place"""
+        record = {'stage': stage, 'key': key, 'params': params, 'inputs': inputs,
+                  'output_hash': output_hash(scratch), 'seconds': seconds,
+                  'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'summary': summary or {}}
+        with open(os.path.join(scratch, RECORD_FILE), 'w') as f:
+            json.dump(record, f, indent=2, default=str)
+        final = self.path(stage, key)
+        if os.path.exists(final):
+            shutil.rmtree(final)
+        os.replace(scratch, final)
+        return record
+
+# ============================================
+# STAGES
+# ============================================
+
+def _generate(out, inputs, params):
+    from generate_data import generate_college_mess_data, generate_college_mess_data_vectorized
+
+    if params.get('file'):
+        raw = pd.read_csv(params['file'])
+    else:
+        kwargs = {k: params[k] for k in ('start_date', 'end_date', 'total_students', 'seed')}
+        if params['engine'] == 'loop':
+            raw = generate_college_mess_data(verbose=False, **kwargs)
+        else:
+            raw = generate_college_mess_data_vectorized(**kwargs)
+    raw.to_parquet(os.path.join(out, 'raw.parquet'), index=False)
+    return {'rows': len(raw)}
+
+
+def _features(out, inputs, params):
+    """Notebook 02's features, warm-up rows dropped, with notebook 03's encoders"""
+    from features import build_features, encode_labels, fit_label_encoders
+
+    df = build_features(pd.read_parquet(os.path.join(inputs['generate'], 'raw.parquet')))
+    encoders = fit_label_encoders(df)
+    for col, values in encode_labels(df, encoders).items():
+        df[col] = values
+    df.to_parquet(os.path.join(out, 'features.parquet'), index=False)
+    with open(os.path.join(out, 'label_encoders.pkl'), 'wb') as f:
+        pickle.dump(encoders, f)
+    return {'rows': len(df), 'columns': len(df.columns)}
+
+
+def select_features(columns):
+    """Notebook 03's feature columns, in frame order rather than its set() order"""
+    return [col for col in columns if col not in EXCLUDE_COLS]
+
+
+def _split(out, inputs, params):
+    """Chronological train/test split and a StandardScaler fit on the training rows"""
+    from sklearn.preprocessing import StandardScaler
+
+    df = pd.read_parquet(os.path.join(inputs['features'], 'features.parquet'))
+    feature_names = params['features'] or select_features(df.columns)
+    X, y = df[feature_names].astype(np.float64), df['students_attended'].to_numpy(np.float64)
+    n_train = int(len(X) * (1 - params['test_fraction']))
+
+    scaler = StandardScaler().fit(X.iloc[:n_train])
+    scaled = scaler.transform(X)
+    for name, rows in (('train', slice(None, n_train)), ('test', slice(n_train, None))):
+        np.save(os.path.join(out, f'X_{name}.npy'), scaled[rows])
+        np.save(os.path.join(out, f'y_{name}.npy'), y[rows])
+    with open(os.path.join(out, 'scaler.pkl'), 'wb') as f:
+        pickle.dump(scaler, f)
+    with open(os.path.join(out, 'split.json'), 'w') as f:
+        json.dump({'feature_names': feature_names,
+                   'train_dates': [str(df['date'].iloc[0].date()), str(df['date'].iloc[n_train - 1].date())],
+                   'test_dates': [str(df['date'].iloc[n_train].date()), str(df['date'].iloc[-1].date())]}, f)
+    return {'train_rows': n_train, 'test_rows': len(X) - n_train, 'features': len(feature_names)}
+
+
+def make_baseline(name):
+    """Unfitted notebook-03 baseline model `name`"""
+    import importlib
+
+    path, params = BASELINE_MODELS[name]
+    module, cls = path.rsplit('.', 1)
+    return getattr(importlib.import_module(module), cls)(**params)
+
+
+def regression_metrics(y, pred, prefix):
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+    return {f'{prefix}_mae': float(mean_absolute_error(y, pred)),
+            f'{prefix}_rmse': float(np.sqrt(mean_squared_error(y, pred))),
+            f'{prefix}_r2': float(r2_score(y, pred)),
+            f'{prefix}_mape': float(np.mean(np.abs((y - pred) / y)) * 100)}
+
+
+_SPLIT = None
+
+
+def _init_worker(directory):
+    global _SPLIT
+    _SPLIT = _load_split(directory)
+
+
+def _load_split(directory):
+    arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+              for name in ('X_train', 'y_train', 'X_test', 'y_test')}
+    with open(os.path.join(directory, 'split.json')) as f:
+        arrays['feature_names'] = json.load(f)['feature_names']
+    return arrays
+
+
+def _fit(out, params):
+    """Fit a baseline or the final model on the scaled training rows; metrics on both splits"""
+    if 'hyperparameters' in params:
+        from tuning import make_estimator
+
+        hyperparameters = dict(params['hyperparameters'])
+        model = make_estimator(params['name'], hyperparameters, hyperparameters.pop('n_estimators', None))
+    else:
+        model = make_baseline(params['name'])
+
+    # DataFrames, as in the notebook, so the model records feature_names_in_
+    split = _SPLIT
+    X_train = pd.DataFrame(split['X_train'], columns=split['feature_names'])
+    X_test = pd.DataFrame(split['X_test'], columns=split['feature_names'])
+    model.fit(X_train, split['y_train'])
+    metrics = {**regression_metrics(split['y_train'], model.predict(X_train), 'train'),
+               **regression_metrics(split['y_test'], model.predict(X_test), 'test')}
+    with open(os.path.join(out, 'model.pkl'), 'wb') as f:
+        pickle.dump(model, f)
+    with open(os.path.join(out, 'metrics.json'), 'w') as f:
+        json.dump(metrics, f, indent=2)
+    return metrics
+
+
+def _run_fit(task):
+    """Worker entry point: (scratch directory, params) → (metrics, seconds)"""
+    out, params = task
+    start = time.perf_counter()
+    metrics = _fit(out, params)
+    return metrics, time.perf_counter() - start
+
+
+def _artifacts(out, inputs, params):
+    """models/-style artifacts and a serving bundle, as notebook 03 cell 14 saves them"""
+    from model_bundle import build_bundle
+
+    with open(os.path.join(inputs['split'], 'split.json')) as f:
+        feature_names = json.load(f)['feature_names']
+    with open(os.path.join(inputs['model'], 'metrics.json')) as f:
+        metrics = json.load(f)
+    shutil.copyfile(os.path.join(inputs['model'], 'model.pkl'), os.path.join(out, 'best_model.pkl'))
+    shutil.copyfile(os.path.join(inputs['split'], 'scaler.pkl'), os.path.join(out, 'scaler.pkl'))
+    shutil.copyfile(os.path.join(inputs['features'], 'label_encoders.pkl'),
+                    os.path.join(out, 'label_encoders.pkl'))
+    with open(os.path.join(out, 'feature_names.pkl'), 'wb') as f:
+        pickle.dump(feature_names, f)
+
+    with open(os.path.join(out, 'best_model.pkl'), 'rb') as f:
+        model = pickle.load(f)
+    model_params = params['model']
+    metadata = {
+        'model_name': model_params['name'],
+        'model_type': type(model).__name__,
+        'training_date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'training_samples': int(np.load(os.path.join(inputs['split'], 'y_train.npy'), mmap_mode='r').size),
+        'test_samples': int(np.load(os.path.join(inputs['split'], 'y_test.npy'), mmap_mode='r').size),
+        'n_features': len(feature_names),
+        'performance': {k: v for k, v in metrics.items() if k.startswith('test_')},
+        'hyperparameters': model_params['hyperparameters'],
+        'feature_names': feature_names,
+    }
+    with open(os.path.join(out, 'model_metadata.json'), 'w') as f:
+        json.dump(metadata, f, indent=2)
+    manifest = build_bundle(out, os.path.join(out, 'bundle'))
+    return {'bundle_version': manifest['version']}
+
+# ============================================
+# RUNNER
+# ============================================
+
+def _report(stage, record, hit, verbose, label=None):
+    if verbose:
+        name = f'{stage} [{label}]' if label else stage
+        status = '✅ cached' if hit else f"⚙️  ran in {record['seconds']:.2f}s"
+        print(f"   {name:<34}{record['key']}  {status}")
+
+
+def _run_stage(cache, stage, fn, params, inputs, force, verbose):
+    """Cached record of one sequential stage, computing it on a miss"""
+    hashes = {name: record['output_hash'] for name, record in inputs.items()}
+    key = stage_key(stage, params, hashes)
+    record = None if stage in force else cache.get(stage, key)
+    hit = record is not None
+    if not hit:
+        scratch = cache.scratch(stage, key)
+        start = time.perf_counter()
+        dirs = {name: cache.path(name, rec['key']) for name, rec in inputs.items()}
+        summary = fn(scratch, dirs, params)
+        record = cache.commit(stage, key, scratch, params, hashes, time.perf_counter() - start, summary)
+    _report(stage, record, hit, verbose)
+    return record
+
+
+def _run_fits(cache, split, fits, force, n_jobs, verbose):
+    """Cached records of independent model fits, the misses fitted in parallel
+
+    `fits` is a list of (stage, params); each fit depends on the split only.
+    """
+    inputs = {'split': split['output_hash']}
+    split_dir = cache.path('split', split['key'])
+    records, pending = {}, []
+    for stage, params in fits:
+        key = stage_key(stage, params, inputs)
+        record = None if stage in force else cache.get(stage, key)
+        if record is not None:
+            records[params['name'], stage] = record
+            _report(stage, record, True, verbose, params['name'])
+        else:
+            pending.append((stage, params, key, cache.scratch(stage, key)))
+
+    tasks = [(scratch, params) for _, params, _, scratch in pending]
+    if n_jobs == 1 or len(tasks) <= 1:
+        _init_worker(split_dir)
+        results = [_safe_fit(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(split_dir,)) as pool:
+            results = list(pool.map(_safe_fit, tasks))
+
+    for (stage, params, key, scratch), result in zip(pending, results):
+        if isinstance(result, ImportError):
+            # Optional libraries (XGBoost) may be missing; the other models still run
+            shutil.rmtree(scratch, ignore_errors=True)
+            if verbose:
+                name = f"{stage} [{params['name']}]"
+                print(f"   {name:<34}{'':16}  ⚠️  skipped ({result})")
+            continue
+        metrics, seconds = result
+        record = cache.commit(stage, key, scratch, params, inputs, seconds, metrics)
+        records[params['name'], stage] = record
+        _report(stage, record, False, verbose, params['name'])
+    return records
+
+
+def _safe_fit(task):
+    try:
+        return _run_fit(task)
+    except ImportError as exc:
+        return exc
+
+
+def load_feature_names(path):
+    """Feature list from a feature_names.pkl or a text file of one name per line"""
+    if path.endswith('.pkl'):
+        with open(path, 'rb') as f:
+            return list(pickle.load(f))
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def _same_path(a, b):
+    return os.path.abspath(a) == os.path.abspath(b)
+
+
+def resolve_config(overrides=None):
+    """DEFAULT_CONFIG with `overrides` merged in one level deep"""
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    for section, value in copy.deepcopy(overrides or {}).items():
+        if isinstance(value, dict) and isinstance(config.get(section), dict):
+            config[section].update(value)
+        else:
+            config[section] = value
+    return config
+
+
+def run(config=None, cache_dir=CACHE_DIR, output_dir=None, force=(), n_jobs=None, verbose=True):
+    """Run every stage whose inputs changed; returns {stage: record} plus the baseline table
+
+    `force` names stages to recompute even when cached. With output_dir,
+    the artifacts are copied there (skipped when it already holds them).
+    The app, retrain and backtest read RAW_FILE next to MODELS_DIR, so
+    exporting into MODELS_DIR is refused for a model trained on other data.
+    """
+    config = resolve_config(config)
+    trained_on_repo_data = config['raw'] and _same_path(config['raw'], RAW_FILE)
+    if output_dir and _same_path(output_dir, MODELS_DIR) and not trained_on_repo_data:
+        raise ValueError(f"Refusing to overwrite {MODELS_DIR}/ with a model not trained on {RAW_FILE}; "
+                         f"export it to another directory")
+    if isinstance(config['split']['features'], str):
+        config['split']['features'] = load_feature_names(config['split']['features'])
+    cache = StageCache(cache_dir)
+    force = set(force)
+    start = time.perf_counter()
+
+    generate_params = dict(config['generate'])
+    if config['raw']:
+        generate_params = {'file': config['raw'], 'file_sha256': _sha256(config['raw'])}
+    records = {'generate': _run_stage(cache, 'generate', _generate, generate_params, {}, force, verbose)}
+    records['features'] = _run_stage(cache, 'features', _features, {}, {'generate': records['generate']},
+                                     force, verbose)
+    records['split'] = _run_stage(cache, 'split', _split, config['split'], {'features': records['features']},
+                                  force, verbose)
+
+    # The baselines and the final model only share the split: fit them side by side
+    fits = [('baseline', {'name': name}) for name in config['baselines']]
+    fits.append(('model', config['model']))
+    fitted = _run_fits(cache, records['split'], fits, force, n_jobs, verbose)
+    records['model'] = fitted[config['model']['name'], 'model']
+    baselines = {name: record['summary'] for (name, stage), record in fitted.items() if stage == 'baseline'}
+
+    records['artifacts'] = _run_stage(
+        cache, 'artifacts', _artifacts, {'model': config['model']},
+        {name: records[name] for name in ('features', 'split', 'model')}, force, verbose)
+    if output_dir:
+        export(cache.path('artifacts', records['artifacts']['key']), records['artifacts'], output_dir, verbose)
+
+    records['seconds'] = time.perf_counter() - start
+    records['baselines'] = pd.DataFrame(baselines).T.sort_values('test_rmse') if baselines else pd.DataFrame()
+    return records
+
+
+def export(directory, record, output_dir, verbose=True):
+    """Copy an artifacts stage into a models directory (its bundle into BUNDLE_DIR's place)"""
+    run_file = os.path.join(output_dir, RUN_FILE)
+    if os.path.exists(run_file):
+        with open(run_file) as f:
+            if json.load(f).get('key') == record['key']:
+                if verbose:
+                    print(f"   {'export → ' + output_dir:<34}{record['key']}  ✅ up to date")
+                return
+    os.makedirs(output_dir, exist_ok=True)
+    for name in os.listdir(directory):
+        if name == 'bundle':
+            bundle_dir = os.path.join(output_dir, os.path.relpath(BUNDLE_DIR, MODELS_DIR))
+            shutil.copytree(os.path.join(directory, name), bundle_dir, dirs_exist_ok=True)
+        elif name != RECORD_FILE:
+            shutil.copyfile(os.path.join(directory, name), os.path.join(output_dir, name))
+    with open(run_file, 'w') as f:
+        json.dump({'key': record['key'], 'output_hash': record['output_hash'],
+                   'exported': time.strftime('%Y-%m-%d %H:%M:%S')}, f, indent=2)
+    if verbose:
+        print(f"   {'export → ' + output_dir:<34}{record['key']}  📦 copied")
+
+
+def _parse_value(text):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the generate → features → train → artifacts pipeline, "
+                                                 "skipping stages whose inputs are unchanged")
+    parser.add_argument('--config', help="JSON file of DEFAULT_CONFIG sections to override")
+    parser.add_argument('--set', action='append', default=[], metavar='PARAM=VALUE',
+                        help="override one final-model hyperparameter (repeatable), e.g. learning_rate=0.1")
+    parser.add_argument('--raw', help=f"raw CSV to train on (default: {RAW_FILE})")
+    parser.add_argument('--generate', action='store_true',
+                        help="generate data instead of reading a raw CSV (implied by the options below)")
+    parser.add_argument('--engine', choices=['loop', 'vectorized'], help="data generator engine")
+    parser.add_argument('--start-date')
+    parser.add_argument('--end-date')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--features-file',
+                        help=f"feature_names.pkl (or one name per line) to train on (default: {FEATURE_NAMES_FILE})")
+    parser.add_argument('--notebook-features', action='store_true',
+                        help="notebook 03's feature selection, in column order, instead of a feature file")
+    parser.add_argument('--baselines', nargs='*', help="baseline models to fit (default: all; none to skip)")
+    parser.add_argument('--force', nargs='*', default=[], choices=list(STAGE_CODE),
+                        help="recompute these stages even if cached")
+    parser.add_argument('--n-jobs', type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--output', default=None, help="copy the artifacts to this models directory")
+    args = parser.parse_args()
+
+    overrides = {}
+    if args.config:
+        with open(args.config) as f:
+            overrides = json.load(f)
+    config = resolve_config(overrides)
+    for param in ('engine', 'start_date', 'end_date', 'seed'):
+        if getattr(args, param) is not None:
+            config['generate'][param] = getattr(args, param)
+            args.generate = True
+    if args.generate and args.raw:
+        parser.error("--raw and generator options are exclusive")
+    if args.generate:
+        config['raw'] = None
+    elif args.raw:
+        config['raw'] = args.raw
+    if args.features_file and args.notebook_features:
+        parser.error("--features-file and --notebook-features are exclusive")
+    if args.features_file:
+        config['split']['features'] = args.features_file
+    elif args.notebook_features:
+        config['split']['features'] = None
+    if args.baselines is not None:
+        unknown = set(args.baselines) - set(BASELINE_MODELS)
+        if unknown:
+            parser.error(f"unknown baselines {sorted(unknown)}; choose from {list(BASELINE_MODELS)}")
+        config['baselines'] = args.baselines
+    for assignment in args.set:
+        param, _, value = assignment.partition('=')
+        config['model']['hyperparameters'][param] = _parse_value(value)
+
+    print("\n" + "="*70)
+    print(f"🧱 PIPELINE: {config['model']['name']} {json.dumps(config['model']['hyperparameters'], sort_keys=True)}")
+    print("="*70)
+    try:
+        records = run(config, args.cache_dir, args.output, args.force, args.n_jobs)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if len(records['baselines']):
+        print("\n📊 Baselines (test RMSE order)")
+        print(records['baselines'][['train_rmse', 'test_mae', 'test_rmse', 'test_r2']].round(3).to_string())
+    performance = records['model']['summary']
+    print(f"\n🎯 {config['model']['name']}: test RMSE {performance['test_rmse']:.2f}, "
+          f"MAE {performance['test_mae']:.2f}, R² {performance['test_r2']:.4f}")
+    print(f"📦 Bundle {records['artifacts']['summary']['bundle_version']} in "
+          f"{os.path.join(args.cache_dir, 'artifacts', records['artifacts']['key'])}")
+    print(f"⏱️  {records['seconds']:.2f}s")
@@ -0,0 +1,246 @@
+"""
+Food Preparation Policy Simulator
+Monte Carlo replications of the generator's attendance process, scoring buffer policies on waste, shortages and cost
+"""
+
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from generate_data import (DAY_NAMES, MEAL_TYPES, SEED, TOTAL_STUDENTS, MenuScheduler,
+                           _calendar_flags, _menu_fatigue, attendance_rates)
+from predictor import FOOD_PER_PERSON_KG
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+# A monsoon/odd semester: start-of-semester, festival and exam weeks included
+SEMESTER_START = '2024-08-01'
+SEMESTER_END = '2024-12-15'
+
+N_REPLICATIONS = 2000
+CHUNK_REPLICATIONS = 250     # replications per task; fixed, so results do not depend on the worker count
+ATTENDANCE_NOISE = 0.08      # sd of actual around expected students (generate_data)
+CONSUMPTION_RANGE = (0.85, 0.95)
+COST_RANGE_RS = (80, 150)
+
+METADATA_FILE = 'models/model_metadata.json'
+DEFAULT_RMSE = 29.98
+
+# name -> (policy function, keyword arguments)
+POLICIES = {
+    'fixed_10pct': ('fixed_buffer', {'buffer': 0.10}),
+    'fixed_5pct': ('fixed_buffer', {'buffer': 0.05}),
+    'safety_stock_z1.65': ('safety_stock', {'z': 1.65}),
+    'safety_stock_z1.0': ('safety_stock', {'z': 1.0}),
+    'meal_quantile_p95': ('meal_quantile', {'q': 0.95}),
+    'meal_quantile_p90': ('meal_quantile', {'q': 0.90}),
+}
+
+# ============================================
+# POLICIES
+# ============================================
+# Each maps forecast students (..., n_days, n_meals) to kg prepared.
+
+def fixed_buffer(forecast, buffer=0.10):
+    """Current practice: forecast portions plus a fixed percentage"""
+    return forecast * FOOD_PER_PERSON_KG * (1 + buffer)
+
+
+def safety_stock(forecast, z=1.65, rmse=DEFAULT_RMSE):
+    """Forecast plus z standard errors of the model (its test RMSE), in portions"""
+    return (forecast + z * rmse) * FOOD_PER_PERSON_KG
+
+
+def meal_quantile(forecast, q=0.95, ratios=None):
+    """Forecast scaled by the meal's q-quantile of actual/forecast (see calibrate_quantiles)"""
+    return forecast * ratios[q] * FOOD_PER_PERSON_KG
+
+
+POLICY_FUNCTIONS = {'fixed_buffer': fixed_buffer, 'safety_stock': safety_stock, 'meal_quantile': meal_quantile}
+
+# ============================================
+# ATTENDANCE PROCESS
+# ============================================
+
+class Semester:
+    """Deterministic calendar of a date range: flags, menu, and attendance rates for dry and rainy days"""
+
+    def __init__(self, start_date=SEMESTER_START, end_date=SEMESTER_END, total_students=TOTAL_STUDENTS):
+        dates = pd.date_range(start=start_date, end=end_date, freq='D')
+        self.dates = dates
+        self.total_students = total_students
+        month, day_num = dates.month.to_numpy(), dates.day.to_numpy()
+        dow = dates.dayofweek.to_numpy()
+        (is_exam, is_festival, is_start_sem,
+         is_end_sem, _, self.is_monsoon) = _calendar_flags(month, day_num, dow)
+
+        menu = MenuScheduler()
+        menu_names = list(menu.popularity)
+        weekly_codes = np.array([[menu_names.index(menu.get_menu(day, meal)) for meal in MEAL_TYPES]
+                                 for day in DAY_NAMES])
+        menu_codes = weekly_codes[dow]
+        popularity = np.array([menu.get_popularity(m) for m in menu_names])[menu_codes]
+        fatigue = _menu_fatigue(menu_codes)
+
+        # Weather is the only random input to the rate, so both outcomes are precomputed
+        self.rates = np.stack([
+            attendance_rates(dow, is_exam, is_festival, rainy, is_start_sem, is_end_sem, popularity, fatigue)
+            for rainy in (False, True)
+        ])  # (2, n_days, n_meals)
+
+    @property
+    def n_days(self):
+        return len(self.dates)
+
+    def simulate(self, n_reps, rng):
+        """Draw n_reps semesters: (expected students, actual students, consumption, cost per kg)
+
+        Draws follow generate_college_mess_data_vectorized: season-weighted
+        weather, actual ~ Normal(expected, 8%) truncated at 0, uniform
+        consumption and ingredient cost. Arrays are (n_reps, n_days, n_meals).
+        """
+        u = rng.random((n_reps, self.n_days))
+        rainy = np.where(self.is_monsoon, u < 0.5, u >= 0.9)
+        expected = np.trunc(self.total_students * self.rates[rainy.astype(int), np.arange(self.n_days)])
+        actual = np.maximum(0, np.trunc(rng.normal(expected, expected * ATTENDANCE_NOISE)))
+        consumption = rng.uniform(*CONSUMPTION_RANGE, expected.shape)
+        cost_per_kg = rng.uniform(*COST_RANGE_RS, expected.shape)
+        return expected, actual, consumption, cost_per_kg
+
+# ============================================
+# SIMULATION
+# ============================================
+
+def evaluate(prepared_kg, actual, consumption, cost_per_kg):
+    """Per-replication totals for one policy
+
+    Students are served up to what was prepared; they eat `consumption` of
+    what they are served, and everything else is waste. A shortage is a
+    meal where prepared food ran out before every student was served.
+    """
+    demand_kg = actual * FOOD_PER_PERSON_KG
+    served_kg = np.minimum(prepared_kg, demand_kg)
+    waste_kg = prepared_kg - served_kg * consumption
+    shortage_kg = demand_kg - served_kg
+    return {
+        'waste_kg': waste_kg.sum(axis=(1, 2)),
+        'shortage_meals': (shortage_kg > 0).sum(axis=(1, 2)),
+        'shortage_kg': shortage_kg.sum(axis=(1, 2)),
+        'food_cost_rs': (prepared_kg * cost_per_kg).sum(axis=(1, 2)),
+        'waste_cost_rs': (waste_kg * cost_per_kg).sum(axis=(1, 2)),
+    }
+
+
+def _run_chunk(task):
+    """Process-pool worker: simulate one chunk and score every policy on the same draws"""
+    semester_args, n_reps, seed, policies = task
+    semester = Semester(*semester_args)
+    expected, actual, consumption, cost_per_kg = semester.simulate(n_reps, np.random.default_rng(seed))
+    # The forecast is the process mean given the day's weather: an unbiased model whose error
+    # is the attendance noise itself (~8%, close to the model's test RMSE)
+    results = {}
+    for name, (function, kwargs) in policies.items():
+        prepared = POLICY_FUNCTIONS[function](expected, **kwargs)
+        results[name] = evaluate(prepared, actual, consumption, cost_per_kg)
+    return results
+
+
+def calibrate_quantiles(semester, quantiles, n_reps=500, seed=SEED + 1):
+    """{q: per-meal q-quantile of actual/forecast}, from a calibration run with its own seed"""
+    expected, actual, _, _ = semester.simulate(n_reps, np.random.default_rng(seed))
+    ratio = np.divide(actual, expected, out=np.ones_like(actual), where=expected > 0)
+    return {q: np.quantile(ratio.reshape(-1, ratio.shape[-1]), q, axis=0) for q in quantiles}
+
+
+def model_rmse(metadata_file=METADATA_FILE):
+    try:
+        with open(metadata_file) as f:
+            return json.load(f)['performance']['test_rmse']
+    except (OSError, KeyError, ValueError):
+        return DEFAULT_RMSE
+
+
+def run(n_reps=N_REPLICATIONS, start_date=SEMESTER_START, end_date=SEMESTER_END, policies=POLICIES,
+        workers=None, chunk_reps=CHUNK_REPLICATIONS, seed=SEED):
+    """Simulate n_reps semesters under every policy, in parallel chunks
+
+    Each chunk gets its own SeedSequence child, so the results are the same
+    for any worker count. Returns ({policy: {metric: per-replication array}},
+    stats), where stats holds the elapsed time and meal-days per second.
+    """
+    semester = Semester(start_date, end_date)
+    policies = {name: (function, dict(kwargs)) for name, (function, kwargs) in policies.items()}
+    rmse = model_rmse()
+    quantiles = sorted({kwargs['q'] for function, kwargs in policies.values() if function == 'meal_quantile'})
+    ratios = calibrate_quantiles(semester, quantiles) if quantiles else {}
+    for function, kwargs in policies.values():
+        if function == 'safety_stock':
+            kwargs.setdefault('rmse', rmse)
+        elif function == 'meal_quantile':
+            kwargs['ratios'] = ratios
+
+    sizes = [min(chunk_reps, n_reps - start) for start in range(0, n_reps, chunk_reps)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [((start_date, end_date), size, child, policies) for size, child in zip(sizes, seeds)]
+
+    start = time.perf_counter()
+    if workers == 1:
+        chunks = list(map(_run_chunk, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_run_chunk, tasks))
+    elapsed = time.perf_counter() - start
+
+    results = {name: {metric: np.concatenate([chunk[name][metric] for chunk in chunks])
+                      for metric in chunks[0][name]}
+               for name in policies}
+    meal_days = n_reps * semester.n_days * len(MEAL_TYPES)
+    stats = {'seconds': elapsed, 'meal_days': meal_days, 'meal_days_per_sec': meal_days / elapsed,
+             'n_days': semester.n_days, 'rmse': rmse}
+    return results, stats
+
+
+def summarize(results):
+    """One row per policy: mean and 5th/95th percentiles over replications"""
+    rows = {}
+    for name, metrics in results.items():
+        row = {}
+        for metric, values in metrics.items():
+            row[f'{metric}_mean'] = values.mean()
+            row[f'{metric}_p5'], row[f'{metric}_p95'] = np.percentile(values, [5, 95])
+        rows[name] = row
+    return pd.DataFrame(rows).T
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare food-preparation buffer policies by simulation")
+    parser.add_argument('--reps', type=int, default=N_REPLICATIONS)
+    parser.add_argument('--start-date', default=SEMESTER_START)
+    parser.add_argument('--end-date', default=SEMESTER_END)
+    parser.add_argument('--workers', type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument('--seed', type=int, default=SEED)
+    args = parser.parse_args()
+
+    results, stats = run(args.reps, args.start_date, args.end_date, workers=args.workers, seed=args.seed)
+    summary = summarize(results)
+
+    print("\n" + "="*86)
+    print(f"🎲 {args.reps:,} SEMESTERS ({args.start_date} to {args.end_date}, {stats['n_days']} days), "
+          f"per semester: mean [p5, p95]")
+    print("="*86)
+    print(f"{'Policy':<20}{'Waste (kg)':>22}{'Shortage meals':>20}{'Food cost (₹ lakh)':>24}")
+    for name, row in summary.iterrows():
+        print(f"{name:<20}"
+              f"{row['waste_kg_mean']:>8,.0f} [{row['waste_kg_p5']:,.0f}, {row['waste_kg_p95']:,.0f}]"
+              f"{row['shortage_meals_mean']:>8.1f} [{row['shortage_meals_p5']:.0f}, {row['shortage_meals_p95']:.0f}]"
+              f"{row['food_cost_rs_mean'] / 1e5:>12.2f} [{row['food_cost_rs_p5'] / 1e5:.2f}, "
+              f"{row['food_cost_rs_p95'] / 1e5:.2f}]")
+    print(f"\n✅ {stats['meal_days']:,} meal-days in {stats['seconds']:.2f} s "
+          f"({stats['meal_days_per_sec']:,.0f} meal-days/s)")
@@ -0,0 +1,103 @@
+"""
+Prediction Cache
+Bounded, thread-safe LRU of predictions keyed on normalized inputs and the model bundle version
+"""
+
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+MAX_ENTRIES = 4096
+
+# ============================================
+# CACHE
+# ============================================
+
+def make_key(version, date, meal_type, menu_item, weather, temperature,
+             is_exam, is_festival, is_start_sem, history_token=None):
+    """Normalized input tuple: equal inputs give equal keys whatever their types
+
+    `history_token` identifies the lag/rolling history the prediction was
+    made with (e.g. the feature store's last ingested date).
+    """
+    return (
+        str(version),
+        pd.Timestamp(date).strftime('%Y-%m-%d'),
+        str(meal_type),
+        str(menu_item),
+        str(weather),
+        round(float(temperature), 2),
+        bool(is_exam),
+        bool(is_festival),
+        bool(is_start_sem),
+        None if history_token is None else str(history_token),
+    )
+
+
+class PredictionCache:
+    """LRU cache shared by every session, cleared when the bundle version changes
+
+    Keys embed the bundle version, so a stale entry can never be served.
+    bind() also drops every entry as soon as a new version is seen, to
+    free the space. Values are computed outside the lock, so a slow miss
+    never blocks hits from other sessions.
+    """
+
+    def __init__(self, maxsize=MAX_ENTRIES):
+        self.maxsize = maxsize
+        self.version = None
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def bind(self, version):
+        """Use entries for `version` only; clears the cache if it changed"""
+        with self.lock:
+            if version != self.version:
+                if self.version is not None:
+                    self.invalidations += 1
+                self.entries.clear()
+                self.version = version
+
+    def get_or_compute(self, key, compute):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+
+        value = compute()
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'version': self.version,
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
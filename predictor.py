@@ -0,0 +1,298 @@
+"""
+Attendance Predictor
+Vectorized feature preparation and batch forecasting shared by the app and scripts
+"""
+
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from features import encode_labels, row_features
+from generate_data import MEAL_TYPES, MenuScheduler
+from metrics import METRICS
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+MODELS_DIR = 'models'
+
+MENU_ITEMS = {
+    'Breakfast': ['Idli-Sambar', 'Poha', 'Upma', 'Dosa', 'Paratha-Curry', 'Bread-Omelette', 'Puri-Bhaji'],
+    'Lunch': ['Rice-Dal-Sabzi', 'Roti-Paneer', 'Biryani', 'Rice-Sambar', 'Chole-Bhature', 'Fried Rice', 'Pulao'],
+    'Dinner': ['Roti-Dal', 'Rice-Rajma', 'Paratha-Paneer', 'Rice-Curd-Pickle', 'Noodles', 'Rice-Chicken', 'Khichdi']
+}
+
+MENU_POPULARITY = {
+    'Biryani': 4.8, 'Chole-Bhature': 4.5, 'Dosa': 4.6, 'Rice-Chicken': 4.7,
+    'Puri-Bhaji': 4.3, 'Fried Rice': 4.2, 'Roti-Paneer': 4.0, 'Paratha-Paneer': 4.1,
+    'Noodles': 4.2, 'Idli-Sambar': 3.9, 'Poha': 3.7, 'Upma': 3.5,
+    'Rice-Dal-Sabzi': 3.4, 'Roti-Dal': 3.3, 'Rice-Rajma': 3.8, 'Rice-Sambar': 3.6,
+    'Rice-Curd-Pickle': 3.2, 'Khichdi': 3.0, 'Bread-Omelette': 3.9, 'Paratha-Curry': 3.7, 'Pulao': 4.0
+}
+
+WEATHER_TYPES = ['Sunny', 'Cloudy', 'Rainy']
+
+# Lag/rolling features used when no real history is available
+DEFAULT_HISTORY = {
+    'students_lag_1': 440,
+    'students_lag_7': 435,
+    'students_lag_14': 430,
+    'waste_lag_1': 15,
+    'waste_lag_7': 16,
+    'waste_lag_14': 15,
+    'students_same_day_last_week': 438,
+    'students_roll_3d_mean': 440,
+    'students_roll_3d_std': 20,
+    'students_roll_7d_mean': 438,
+    'students_roll_7d_std': 25,
+    'students_roll_14d_mean': 435,
+    'students_roll_14d_std': 28,
+    'students_roll_7d_max': 480,
+    'students_roll_7d_min': 400
+}
+
+# Serving assumptions
+TOTAL_CAPACITY = 800
+FOOD_PER_PERSON_KG = 0.35
+FOOD_BUFFER = 1.1
+COST_PER_KG_RS = 100
+
+# Per-mess parameters. A bundle's manifest may override any of them (ModelBundle.params);
+# these defaults are the single campus the shipped model was trained on.
+MESS_PARAMS = {
+    'total_capacity': TOTAL_CAPACITY,
+    'staff_count': 10,
+    'serving_duration_mins': 60,
+    'student_satisfaction': 4.0,
+    'cost_per_kg_rs': COST_PER_KG_RS,
+    'food_per_person_kg': FOOD_PER_PERSON_KG,
+    'food_buffer': FOOD_BUFFER,
+    'menu_items': MENU_ITEMS,
+}
+
+# Mean temperature of the training data, the reference for temp_deviation
+TRAINING_TEMP_MEAN_C = 26.4977
+
+# What-if sweep grid (the app's temperature slider range and its three event flags)
+SWEEP_TEMPERATURES = np.arange(15, 41)
+SWEEP_FLAGS = ['is_exam', 'is_festival', 'is_start_sem']
+
+# ============================================
+# ARTIFACTS
+# ============================================
+
+def load_artifacts(models_dir=MODELS_DIR):
+    """Load model, scaler, label encoders and feature order from models_dir"""
+    with METRICS.span('load_artifacts'):
+        with open(f'{models_dir}/best_model.pkl', 'rb') as f:
+            model = pickle.load(f)
+        with open(f'{models_dir}/scaler.pkl', 'rb') as f:
+            scaler = pickle.load(f)
+        with open(f'{models_dir}/label_encoders.pkl', 'rb') as f:
+            encoders = pickle.load(f)
+        with open(f'{models_dir}/feature_names.pkl', 'rb') as f:
+            feature_names = pickle.load(f)
+    return model, scaler, encoders, feature_names
+
+
+def mess_params(params=None):
+    """MESS_PARAMS with a mess's own values (e.g. ModelBundle.params) applied on top"""
+    return {**MESS_PARAMS, **(params or {})}
+
+# ============================================
+# FEATURE PREPARATION
+# ============================================
+
+def prepare_features_batch(dates, meal_types, menu_items, weather, temperature,
+                           is_exam, is_festival, is_start_sem, encoders, feature_names,
+                           history=None, params=None):
+    """Build the model feature matrix for many (date, meal) rows at once
+
+    Every input may be a scalar or an array-like of the row count; scalars
+    are broadcast. Calendar, interaction and event features come from
+    features.row_features, the same code that builds the training data.
+    `history` optionally supplies real lag/rolling features (e.g.
+    OnlineFeatureStore.lookup_batch) as a DataFrame or dict of columns;
+    missing columns and NaNs fall back to DEFAULT_HISTORY, scaled to the
+    mess's capacity. `params` are the mess's parameters (see mess_params).
+    Returns the features in `feature_names` order.
+    """
+    with METRICS.span('prepare_features'):
+        n = max(np.size(value) for value in (dates, meal_types, menu_items, weather, temperature,
+                                             is_exam, is_festival, is_start_sem))
+
+        def column(value, dtype=None):
+            return np.broadcast_to(np.asarray(value, dtype=dtype), (n,))
+
+        dates = pd.DatetimeIndex(column(pd.to_datetime(np.atleast_1d(dates)).values))
+        meal_types = column(meal_types, object)
+        menu_items = column(menu_items, object)
+        weather = column(weather, object)
+        temperature = column(temperature, float)
+        is_exam = column(is_exam, int)
+        is_festival = column(is_festival, int)
+        is_start_sem = column(is_start_sem, int)
+
+        is_weekend = (dates.dayofweek.to_numpy() >= 5).astype(int)
+        menu_popularity = np.array([MENU_POPULARITY.get(item, 3.5) for item in menu_items])
+        inputs = pd.DataFrame({
+            'date': dates,
+            'meal_type': meal_types,
+            'menu_item': menu_items,
+            'menu_popularity': menu_popularity,
+            'weather': weather,
+            'temperature_c': temperature,
+            'is_exam_period': is_exam,
+            'is_festival': is_festival,
+            'is_weekend': is_weekend,
+            'is_start_semester': is_start_sem,
+            'is_end_semester': 0,
+            'is_monsoon': np.isin(dates.month.to_numpy(), [6, 7, 8, 9]).astype(int),
+        }, index=pd.RangeIndex(n))
+
+        params = mess_params(params)
+        # Headcount approximations are for a TOTAL_CAPACITY mess
+        size = params['total_capacity'] / TOTAL_CAPACITY
+
+        # Lag and rolling features: real history where given, approximations otherwise
+        lag_features = {}
+        for name, default in DEFAULT_HISTORY.items():
+            default = default * size
+            values = None if history is None or name not in history else history[name]
+            if values is None:
+                lag_features[name] = default
+            else:
+                values = column(values, float)
+                lag_features[name] = np.where(np.isnan(values), default, values)
+
+        features = pd.DataFrame({
+            **inputs.drop(columns=['date', 'meal_type', 'menu_item', 'weather']),
+            **row_features(inputs, temp_mean=TRAINING_TEMP_MEAN_C),
+            **encode_labels(inputs, encoders),
+            **lag_features,
+            'menu_count_last_7days': 1,
+            'menu_historical_avg': np.where(menu_popularity > 4.0, 400, 350) * size,
+            'menu_historical_std': 50 * size,
+            # Not used in prediction, but model expects them
+            'serving_duration_mins': params['serving_duration_mins'],
+            'total_capacity': params['total_capacity'],
+            'student_satisfaction': params['student_satisfaction'],
+            'cost_per_kg_rs': params['cost_per_kg_rs'],
+            'staff_count': params['staff_count'],
+        }, index=pd.RangeIndex(n))
+
+        return features[feature_names]  # Ensure correct order
+
+# ============================================
+# PREDICTION
+# ============================================
+
+def predict_batch(model, scaler, features_df, capacity=TOTAL_CAPACITY):
+    """Scale and predict a whole feature matrix in one call, clamped to the mess's capacity
+
+    Pass scaler=None for models that take raw features, such as a
+    tree_engine.TreeEnsemble with the scaler folded in.
+    """
+    X = features_df
+    if scaler is not None:
+        with METRICS.span('scaler.transform'):
+            X = scaler.transform(features_df)
+    with METRICS.span('model.predict'):
+        predictions = np.rint(model.predict(X))
+
+    if METRICS.enabled:
+        METRICS.increment('predictions_clamped_total', int((predictions < 0).sum()), bound='low')
+        METRICS.increment('predictions_clamped_total', int((predictions > capacity).sum()),
+                          bound='high')
+    return np.clip(predictions, 0, capacity).astype(int)
+
+
+def food_and_cost(predictions, params=None):
+    """Food to prepare (kg, with buffer) and its estimated cost for predicted headcounts"""
+    params = mess_params(params)
+    with METRICS.span('food_and_cost'):
+        food_kg = np.asarray(predictions) * params['food_per_person_kg'] * params['food_buffer']
+        return food_kg, food_kg * params['cost_per_kg_rs']
+
+
+def forecast(model, scaler, encoders, feature_names, start_date, n_days=7,
+             meal_types=MEAL_TYPES, weekly_menu=None, weather='Sunny', temperature=28,
+             is_exam=False, is_festival=False, is_start_sem=False, feature_store=None, params=None):
+    """Forecast attendance, food and cost for n_days x meal_types in one predict call
+
+    `weekly_menu` is a {day_name: {meal_type: menu_item}} rotation and
+    defaults to MenuScheduler's. `weather`, `temperature` and the flags are
+    either one value for the whole horizon or one value per day. With a
+    `feature_store`, lag/rolling features come from its latest actuals.
+    `params` are the mess's parameters (see mess_params).
+    """
+    dates = pd.date_range(start=start_date, periods=n_days, freq='D')
+    if weekly_menu is None:
+        weekly_menu = MenuScheduler().weekly_menu
+    meal_types = list(meal_types)
+    n_meals = len(meal_types)
+
+    def per_row(value):
+        value = np.asarray(value)
+        return np.repeat(value, n_meals) if value.ndim else value
+
+    row_dates = dates.repeat(n_meals)
+    row_meals = np.tile(np.array(meal_types, dtype=object), n_days)
+    row_menus = np.array([weekly_menu[d.day_name()][m] for d, m in zip(row_dates, row_meals)],
+                         dtype=object)
+    row_weather = per_row(np.asarray(weather, dtype=object))
+    row_temperature = per_row(temperature)
+    history = None
+    if feature_store is not None:
+        history = feature_store.lookup_batch(row_meals, row_dates.day_name())
+
+    features = prepare_features_batch(
+        row_dates, row_meals, row_menus, row_weather, row_temperature,
+        per_row(is_exam), per_row(is_festival), per_row(is_start_sem),
+        encoders, feature_names, history=history, params=params
+    )
+    predictions = predict_batch(model, scaler, features, mess_params(params)['total_capacity'])
+    food_kg, cost = food_and_cost(predictions, params)
+
+    return pd.DataFrame({
+        'date': row_dates,
+        'day_of_week': row_dates.day_name(),
+        'meal_type': row_meals,
+        'menu_item': row_menus,
+        'weather': np.broadcast_to(row_weather, predictions.shape),
+        'temperature_c': np.broadcast_to(row_temperature, predictions.shape),
+        'predicted_students': predictions,
+        'food_kg': food_kg,
+        'cost_rs': cost
+    })
+
+
+def scenario_sweep(model, scaler, encoders, feature_names, date, meal_type, menu_items,
+                   weathers=WEATHER_TYPES, temperatures=SWEEP_TEMPERATURES, feature_store=None, params=None):
+    """Predict the Cartesian grid of menu item x weather x temperature x event flags in one call
+
+    Returns one row per scenario, in grid order (menu item slowest, then
+    weather, temperature and the SWEEP_FLAGS on/off), so a column reshapes
+    to (n_items, n_weathers, n_temperatures, 2, 2, 2). `params` are the
+    mess's parameters (see mess_params).
+    """
+    grid = pd.MultiIndex.from_product(
+        [np.atleast_1d(menu_items), weathers, temperatures] + [[False, True]] * len(SWEEP_FLAGS),
+        names=['menu_item', 'weather', 'temperature_c'] + SWEEP_FLAGS
+    ).to_frame(index=False)
+
+    # Every scenario shares the date and meal, so one history lookup serves the whole grid
+    history = None
+    if feature_store is not None:
+        history = feature_store.lookup_batch([meal_type], [pd.Timestamp(date).day_name()]).iloc[0].to_dict()
+
+    features = prepare_features_batch(
+        date, meal_type, grid['menu_item'].to_numpy(object), grid['weather'].to_numpy(object),
+        grid['temperature_c'].to_numpy(float), grid['is_exam'], grid['is_festival'], grid['is_start_sem'],
+        encoders, feature_names, history=history, params=params
+    )
+    predictions = predict_batch(model, scaler, features, mess_params(params)['total_capacity'])
+    food_kg, cost = food_and_cost(predictions, params)
+    return grid.assign(predicted_students=predictions, food_kg=food_kg, cost_rs=cost)
@@ -0,0 +1,355 @@
+"""
+Incremental Retraining
+Adds boosting stages for days newer than the model's data, with a full refit when validation error drifts
+"""
+
+import copy
+import json
+import os
+import pickle
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from feature_store import HISTORY_FEATURES, OnlineFeatureStore
+from features import build_features, encode_labels, row_features
+from model_bundle import BUNDLE_DIR, MODELS_DIR, build_bundle
+from tree_engine import fold_thresholds
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+RAW_FILE = 'data/raw/college_mess_data.csv'
+STATE_FILE = 'training_state.pkl'      # in the models directory
+
+MAX_NEW_TREES = 50        # boosting stages tried per update; validation keeps the best prefix
+VALIDATION_DAYS = 7       # most recent new days held out to pick the tree count and check drift
+DRIFT_RATIO = 1.25        # full refit when validation RMSE exceeds this x the stored test RMSE
+TEST_SIZE = 0.2           # latest share of rows a full refit is scored on first (notebook 03's split)
+
+# ============================================
+# TRAINING STATE
+# ============================================
+
+class TrainingState:
+    """Running statistics behind the whole-history features, as of `data_end`
+
+    build_features computes menu_count_last_7days, menu_historical_avg/std
+    and temp_deviation over the whole dataset, and lags/rolling stats over
+    each meal's history. Here those come from an OnlineFeatureStore,
+    per-menu (count, mean, M2) and a running temperature sum, so features
+    for new days cost O(new rows). Menu and temperature statistics cover
+    every row up to the end of the batch, not later ones.
+    """
+
+    def __init__(self):
+        self.feature_store = OnlineFeatureStore()
+        self.menu = {}                 # menu_item -> [count, mean, M2]
+        self.temp_count = 0
+        self.temp_sum = 0.0
+        self.data_end = None
+
+    @classmethod
+    def from_history(cls, raw):
+        state = cls()
+        state.consume(raw)
+        return state
+
+    def consume(self, raw, encoders=None):
+        """Ingest raw rows (all newer than data_end); returns them with every model feature
+
+        As with build_features, meal/weather codes are added given `encoders`.
+        """
+        df = raw.copy()
+        df['date'] = pd.to_datetime(df['date'])
+        df = df.sort_values(['date', 'meal_type'], kind='stable').reset_index(drop=True)
+        if self.data_end is not None and (df['date'] <= self.data_end).any():
+            raise ValueError(f"Rows on or before {self.data_end.date()} were already ingested")
+
+        history = self.feature_store.replay(df)
+
+        self.temp_count += len(df)
+        self.temp_sum += float(df['temperature_c'].sum())
+
+        # Rows of the same menu seen before each row (cumcount over all history)
+        seen = df['menu_item'].map(lambda item: self.menu.get(item, (0,))[0]).to_numpy()
+        menu_count = seen + df.groupby('menu_item').cumcount().to_numpy()
+        for item, values in df.groupby('menu_item')['students_attended']:
+            self._merge_menu(item, values.to_numpy(dtype=np.float64))
+        menu_stats = np.array([self._menu_stats(item) for item in df['menu_item']]).reshape(-1, 2)
+
+        new = row_features(df, temp_mean=self.temp_sum / self.temp_count)
+        for col in ['year', 'month', 'day', 'week_of_year']:
+            df[col] = new.pop(col)
+        new.update({name: history[name].to_numpy() for name in HISTORY_FEATURES})
+        new['menu_count_last_7days'] = menu_count
+        new['menu_historical_avg'] = menu_stats[:, 0]
+        new['menu_historical_std'] = menu_stats[:, 1]
+        if encoders is not None:
+            new.update(encode_labels(df, encoders))
+
+        self.data_end = df['date'].max()
+        return pd.concat([df, pd.DataFrame(new, index=df.index)], axis=1)
+
+    def _merge_menu(self, item, values):
+        """Chan et al. merge of a batch into the item's running count/mean/M2"""
+        count, mean, m2 = self.menu.get(item, (0, 0.0, 0.0))
+        n = len(values)
+        batch_mean = values.mean()
+        delta = batch_mean - mean
+        total = count + n
+        self.menu[item] = [total, mean + delta * n / total,
+                           m2 + ((values - batch_mean) ** 2).sum() + delta ** 2 * count * n / total]
+
+    def _menu_stats(self, item):
+        count, mean, m2 = self.menu[item]
+        return mean, np.sqrt(m2 / (count - 1)) if count > 1 else np.nan
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+# ============================================
+# MODEL UPDATES
+# ============================================
+
+def rescale_thresholds(model, old_mean, old_scale, new_mean, new_scale):
+    """Re-express a fitted model's split thresholds for an updated StandardScaler
+
+    Each threshold is folded back to raw feature units (exactly, see
+    tree_engine.fold_thresholds) and mapped through the new scaling, so
+    the existing trees keep routing rows as before. The one exception is
+    a value within a float32 step of a split, which the new scale may
+    not separate (e.g. a rolling mean of 442.99999999999994 vs 443).
+    """
+    for tree in model.estimators_[:, 0]:
+        nodes = tree.tree_
+        split = nodes.feature >= 0
+        feature = nodes.feature[split]
+        raw = fold_thresholds(nodes.threshold[split], old_mean[feature], old_scale[feature])
+        nodes.threshold[split] = ((raw - new_mean[feature]) / new_scale[feature]).astype(np.float32)
+
+
+def add_trees(model, X, y, n_trees):
+    """Copy of `model` with n_trees more boosting stages fitted on the residuals of X, y"""
+    model = copy.deepcopy(model)
+    model.set_params(warm_start=True, n_estimators=model.n_estimators_ + n_trees)
+    model.fit(X, y)
+    model.set_params(warm_start=False)
+    return model
+
+
+def _rmse(pred, y):
+    return float(np.sqrt(np.mean((np.asarray(pred) - np.asarray(y)) ** 2)))
+
+
+def test_performance(pred, y):
+    """metadata['performance'] entries for predictions of held-out rows"""
+    y = np.asarray(y, dtype=float)
+    errors = np.asarray(pred, dtype=float) - y
+    return {
+        'test_mae': float(np.abs(errors).mean()),
+        'test_rmse': float(np.sqrt(np.mean(errors ** 2))),
+        'test_r2': float(1 - np.sum(errors ** 2) / np.sum((y - y.mean()) ** 2)),
+        'test_mape': float(np.mean(np.abs(errors) / y) * 100),
+    }
+
+
+def holdout_performance(raw, encoders, feature_names, hyperparameters, test_size=TEST_SIZE):
+    """Test metrics of a full refit on the days before the latest test_size of rows, scored on those rows"""
+    df = build_features(raw, encoders=encoders)
+    split_date = df['date'].iloc[int(len(df) * (1 - test_size))]
+    test = df[df['date'] >= split_date]
+    model, scaler, _, _ = full_refit(raw[pd.to_datetime(raw['date']) < split_date], encoders,
+                                     feature_names, hyperparameters)
+    pred = model.predict(pd.DataFrame(scaler.transform(test[feature_names]), columns=feature_names))
+    return test_performance(pred, test['students_attended']), len(test)
+
+
+def full_refit(raw, encoders, feature_names, hyperparameters):
+    """Scaler and model fitted from scratch on every row, plus a fresh TrainingState"""
+    from sklearn.ensemble import GradientBoostingRegressor
+    from sklearn.preprocessing import StandardScaler
+
+    df = build_features(raw, encoders=encoders)
+    X, y = df[feature_names], df['students_attended']
+    scaler = StandardScaler().fit(X)
+    model = GradientBoostingRegressor(**hyperparameters, random_state=42)
+    model.fit(pd.DataFrame(scaler.transform(X), columns=feature_names), y)
+    return model, scaler, TrainingState.from_history(raw), len(df)
+
+
+def _initial_state(raw, metadata, encoders):
+    """TrainingState for the current model, replayed from the raw history it was trained on
+
+    Bundles built before incremental retraining record no data_end; it
+    is then the last row of notebook 03's training split.
+    """
+    data_end = metadata.get('data_end')
+    if data_end is None:
+        df = build_features(raw, encoders=encoders)
+        data_end = df['date'].iloc[metadata['training_samples'] - 1]
+    data_end = pd.Timestamp(data_end)
+    dates = pd.to_datetime(raw['date'])
+    return TrainingState.from_history(raw[dates <= data_end])
+
+# ============================================
+# RETRAIN
+# ============================================
+
+def retrain(raw_file=RAW_FILE, models_dir=MODELS_DIR, bundle_dir=BUNDLE_DIR, max_new_trees=MAX_NEW_TREES,
+            validation_days=VALIDATION_DAYS, drift_ratio=DRIFT_RATIO, force_full=False, verbose=True):
+    """Update the model in models_dir with raw rows newer than its data, then rebuild the bundle
+
+    The scaler's statistics absorb the new rows (StandardScaler.partial_fit)
+    and the existing trees are rescaled to match. Up to max_new_trees
+    stages are fitted on the new rows outside the last validation_days,
+    and the count scoring best on those days is refitted on all new rows.
+    If even the best count's validation RMSE exceeds drift_ratio x the
+    stored test RMSE, everything is refitted from scratch instead.
+    A full refit replaces metadata['performance'] with the scores of a
+    refit on a chronological hold-out (holdout_performance). An
+    incremental update keeps the previous hold-out scores: its
+    validation days also chose the tree count, so their RMSE is biased
+    low and goes to last_retrain only, never into the next drift limit.
+    Returns a summary dict (mode 'none', 'incremental' or 'full'), also
+    stored as metadata['last_retrain']; metadata['hyperparameters'] stay
+    the settings a full refit uses.
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
+    start = time.perf_counter()
+
+    with open(f'{models_dir}/best_model.pkl', 'rb') as f:
+        model = pickle.load(f)
+    with open(f'{models_dir}/scaler.pkl', 'rb') as f:
+        scaler = pickle.load(f)
+    with open(f'{models_dir}/label_encoders.pkl', 'rb') as f:
+        encoders = pickle.load(f)
+    with open(f'{models_dir}/feature_names.pkl', 'rb') as f:
+        feature_names = list(pickle.load(f))
+    with open(f'{models_dir}/model_metadata.json') as f:
+        metadata = json.load(f)
+
+    raw = pd.read_csv(raw_file)
+    state_path = os.path.join(models_dir, STATE_FILE)
+    state = TrainingState.load(state_path) if os.path.exists(state_path) else None
+    if state is None or str(state.data_end.date()) != metadata.get('data_end', str(state.data_end.date())):
+        log("🧮 Building training state from history (first incremental retrain)...")
+        state = _initial_state(raw, metadata, encoders)
+
+    new_raw = raw[pd.to_datetime(raw['date']) > state.data_end]
+    summary = {'mode': 'none', 'data_end': str(state.data_end.date()), 'new_rows': len(new_raw)}
+    if new_raw.empty and not force_full:
+        log(f"✅ Model is up to date (data through {summary['data_end']})")
+        return summary
+
+    baseline_rmse = metadata['performance']['test_rmse']
+    trees_before = model.n_estimators_
+    mode = 'full' if force_full else 'incremental'
+
+    if not force_full:
+        new = state.consume(new_raw, encoders).dropna(subset=feature_names)
+        X_new, y_new = new[feature_names], new['students_attended']
+        holdout = (new['date'] > new['date'].max() - pd.Timedelta(days=validation_days)).to_numpy()
+        if holdout.all():
+            raise ValueError(f"Need more than {validation_days} new days to retrain incrementally")
+        log(f"📥 {len(new):,} new rows ({new['date'].min().date()} to {new['date'].max().date()}), "
+            f"{holdout.sum()} held out for validation")
+
+        # Scaler statistics absorb the new rows; existing trees follow the new scale
+        old_mean, old_scale = scaler.mean_.copy(), scaler.scale_.copy()
+        scaler.partial_fit(X_new)
+        rescale_thresholds(model, old_mean, old_scale, scaler.mean_, scaler.scale_)
+        X_scaled = pd.DataFrame(scaler.transform(X_new), columns=feature_names, index=new.index)
+
+        X_val, y_val = X_scaled[holdout], y_new[holdout]
+        rmse_before = _rmse(model.predict(X_val), y_val)
+        trial = add_trees(model, X_scaled[~holdout], y_new[~holdout], max_new_trees)
+        staged = list(trial.staged_predict(X_val))[trees_before - 1:]
+        curve = [_rmse(pred, y_val) for pred in staged]
+        n_trees = int(np.argmin(curve))
+        rmse_after = curve[n_trees]
+        log(f"🌲 Validation RMSE {rmse_before:.2f} → {rmse_after:.2f} with {n_trees} new trees "
+            f"(drift limit {drift_ratio * baseline_rmse:.2f})")
+
+        if rmse_after > drift_ratio * baseline_rmse:
+            log("⚠️  Validation error drifted past the limit: refitting from scratch")
+            mode = 'full'
+        else:
+            if n_trees:
+                model = add_trees(model, X_scaled, y_new, n_trees)
+            training_samples = metadata['training_samples'] + len(new)
+            # The validation days picked n_trees, so they are no hold-out: keep the stored scores
+            performance, test_samples = metadata['performance'], metadata['test_samples']
+            summary.update({'validation_rmse_before': rmse_before, 'validation_rmse': rmse_after,
+                            'validation_performance': test_performance(staged[n_trees], y_val)})
+
+    if mode == 'full':
+        log(f"🧪 Scoring a refit on the latest {TEST_SIZE:.0%} of rows before refitting on all of them...")
+        performance, test_samples = holdout_performance(raw, encoders, feature_names, metadata['hyperparameters'])
+        model, scaler, state, training_samples = full_refit(raw, encoders, feature_names,
+                                                            metadata['hyperparameters'])
+
+    metadata.update({
+        'training_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'training_samples': training_samples,
+        'test_samples': test_samples,
+        'performance': performance,
+        'data_end': str(state.data_end.date()),
+    })
+    summary.update({'mode': mode, 'data_end': metadata['data_end'], 'trees_before': trees_before,
+                    'trees_after': int(model.n_estimators_), 'training_samples': training_samples,
+                    'test_rmse_before': baseline_rmse, 'test_rmse': performance['test_rmse']})
+    metadata['last_retrain'] = {k: v for k, v in summary.items() if k != 'data_end'}
+
+    with open(f'{models_dir}/best_model.pkl', 'wb') as f:
+        pickle.dump(model, f)
+    with open(f'{models_dir}/scaler.pkl', 'wb') as f:
+        pickle.dump(scaler, f)
+    with open(f'{models_dir}/model_metadata.json', 'w') as f:
+        json.dump(metadata, f, indent=2)
+    state.save(state_path)
+    manifest = build_bundle(models_dir, bundle_dir)
+
+    summary.update({'bundle_version': manifest['version'], 'seconds': time.perf_counter() - start})
+    log(f"✅ {mode.capitalize()} retrain: {summary['trees_before']} → {summary['trees_after']} trees, "
+        f"data through {summary['data_end']}, bundle {manifest['version']} ({summary['seconds']:.1f}s)")
+    if mode == 'full':
+        log(f"📊 Test RMSE {baseline_rmse:.2f} → {performance['test_rmse']:.2f} "
+            f"(on the latest {TEST_SIZE:.0%} of rows)")
+    else:
+        log(f"📊 Test RMSE kept at {baseline_rmse:.2f}; validation RMSE {rmse_after:.2f} chose the tree count "
+            f"and is stored under last_retrain only")
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Retrain the model on days newer than its training data")
+    parser.add_argument('--input', default=RAW_FILE, help="Raw attendance CSV (full history)")
+    parser.add_argument('--models-dir', default=MODELS_DIR)
+    parser.add_argument('--bundle-dir', default=BUNDLE_DIR)
+    parser.add_argument('--max-new-trees', type=int, default=MAX_NEW_TREES)
+    parser.add_argument('--validation-days', type=int, default=VALIDATION_DAYS)
+    parser.add_argument('--drift-ratio', type=float, default=DRIFT_RATIO,
+                        help="Full refit when validation RMSE exceeds this x the stored test RMSE")
+    parser.add_argument('--full', action='store_true', help="Refit from scratch on all history")
+    args = parser.parse_args()
+
+    # Through the importable module, so the pickled state is retrain.TrainingState, not __main__'s
+    from retrain import retrain
+
+    print("\n" + "="*60)
+    print("🔁 RETRAINING")
+    print("="*60)
+    retrain(args.input, args.models_dir, args.bundle_dir, args.max_new_trees,
+            args.validation_days, args.drift_ratio, args.full)
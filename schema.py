@@ -0,0 +1,209 @@
+"""
+Column Schema
+One dtype per raw and engineered column, a CSV loader that applies it while reading,
+and a memory report against pandas' defaults
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# ============================================
+# SCHEMA REGISTRY
+# ============================================
+
+# Generator output (generate_data.py); campus_id only in multi-campus runs
+RAW_SCHEMA = {
+    'campus_id': 'category',
+    'date': 'datetime64[ns]',
+    'year': 'int16',
+    'month': 'int8',
+    'day': 'int8',
+    'day_of_week': 'category',
+    'week_of_year': 'int8',
+    'meal_type': 'category',
+    'menu_item': 'category',
+    'menu_popularity': 'float32',
+    'weather': 'category',
+    'temperature_c': 'float32',
+    'is_exam_period': 'bool',
+    'is_festival': 'bool',
+    'is_weekend': 'bool',
+    'is_start_semester': 'bool',
+    'is_end_semester': 'bool',
+    'is_monsoon': 'bool',
+    'total_capacity': 'int16',
+    'students_attended': 'int16',
+    'attendance_rate': 'float32',
+    'food_prepared_kg': 'float32',
+    'food_consumed_kg': 'float32',
+    'food_wasted_kg': 'float32',
+    'waste_percentage': 'float32',
+    'cost_per_kg_rs': 'float32',
+    'total_cost_rs': 'float32',
+    'waste_cost_rs': 'float32',
+    'staff_count': 'int8',
+    'serving_duration_mins': 'int16',
+    'student_satisfaction': 'float32',
+}
+
+# features.build_features / notebook 02 output. Lag and rolling columns are
+# float32 because the first rows of each meal are NaN.
+FEATURE_SCHEMA = {
+    'day_of_week_num': 'int8',
+    'is_monday': 'int8',
+    'is_friday': 'int8',
+    'day_sin': 'float32',
+    'day_cos': 'float32',
+    'month_sin': 'float32',
+    'month_cos': 'float32',
+    'dow_sin': 'float32',
+    'dow_cos': 'float32',
+    'weather_encoded': 'int8',
+    'meal_encoded': 'int8',
+    **{f'{prefix}_lag_{lag}': 'float32' for lag in (1, 7, 14) for prefix in ('students', 'waste')},
+    'students_same_day_last_week': 'float32',
+    **{f'students_roll_{window}d_{stat}': 'float32' for window in (3, 7, 14) for stat in ('mean', 'std')},
+    'students_roll_7d_max': 'float32',
+    'students_roll_7d_min': 'float32',
+    'weekend_x_exam': 'int8',
+    'weekend_x_festival': 'int8',
+    'rainy_x_weekend': 'int8',
+    'exam_x_festival': 'int8',
+    'popularity_x_weekend': 'float32',
+    'temp_x_rainy': 'float32',
+    'menu_count_last_7days': 'int32',
+    'menu_historical_avg': 'float32',
+    'menu_historical_std': 'float32',
+    'is_popular_menu': 'int8',
+    'is_unpopular_menu': 'int8',
+    'daily_total_attendance': 'int32',
+    'daily_avg_attendance': 'float32',
+    'pct_of_daily_attendance': 'float32',
+    'week_year': 'category',
+    'weekly_avg_attendance': 'float32',
+    'special_conditions_count': 'int8',
+    'has_special_condition': 'int8',
+    'is_normal_day': 'int8',
+    'meal_type_avg': 'float32',
+    'deviation_from_meal_avg': 'float32',
+    'pct_deviation_from_meal_avg': 'float32',
+    'dow_avg': 'float32',
+    'deviation_from_dow_avg': 'float32',
+    'temp_deviation': 'float32',
+}
+
+SCHEMA = {**RAW_SCHEMA, **FEATURE_SCHEMA}
+DATE_COLS = [col for col, dtype in SCHEMA.items() if dtype.startswith('datetime64')]
+
+
+def dtype_for(col, dtype, schema=SCHEMA):
+    """Declared dtype of a column, else a compact default from its current dtype kind
+
+    The fallback depends only on the dtype kind, never on values, so every
+    chunk of a stream gets the same dtype.
+    """
+    if col in schema:
+        return schema[col]
+    kind = np.dtype(dtype).kind if not isinstance(dtype, pd.CategoricalDtype) else 'O'
+    if kind == 'O':
+        return 'category'
+    if kind in 'iu':
+        return 'int32'
+    if kind == 'f':
+        return 'float32'
+    return dtype
+
+# ============================================
+# APPLY / LOAD
+# ============================================
+
+def apply_schema(df, schema=SCHEMA):
+    """Return df with every column cast to its schema dtype"""
+    out = {}
+    for col in df.columns:
+        series = df[col]
+        dtype = dtype_for(col, series.dtype, schema)
+        if str(dtype).startswith('datetime64') and series.dtype.kind != 'M':
+            series = pd.to_datetime(series)
+        out[col] = series if str(series.dtype) == str(dtype) else series.astype(dtype)
+    return pd.DataFrame(out, index=df.index)
+
+
+def concat_chunks(chunks):
+    """Concatenate typed chunks, merging categoricals instead of falling back to object"""
+    chunks = list(chunks)
+    if len(chunks) == 1:
+        return chunks[0]
+    categorical = [col for col, dtype in chunks[0].dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    merged = {col: union_categoricals([chunk[col] for chunk in chunks]) for col in categorical}
+    df = pd.concat([chunk.drop(columns=categorical) for chunk in chunks], ignore_index=True)
+    for col in categorical:
+        df[col] = pd.Categorical(merged[col])
+    return df[chunks[0].columns]
+
+
+def load_csv(path, columns=None, chunksize=100_000, schema=SCHEMA):
+    """Read a mess CSV straight into schema dtypes
+
+    Declared columns are parsed into their dtype by read_csv itself, and
+    dates are parsed once. The file is read in `chunksize`-row chunks, so
+    the default int64/float64/object columns are never all in memory at once.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = list(header) if columns is None else [col for col in header if col in set(columns)]
+    dtypes = {col: schema[col] for col in usecols if col in schema and col not in DATE_COLS}
+    parse_dates = [col for col in usecols if col in DATE_COLS]
+
+    reader = pd.read_csv(path, usecols=usecols, dtype=dtypes, parse_dates=parse_dates, chunksize=chunksize)
+    return concat_chunks(apply_schema(chunk, schema) for chunk in reader)
+
+# ============================================
+# MEMORY REPORT
+# ============================================
+
+def memory_report(path, columns=None, chunksize=100_000):
+    """Per-column memory of a plain pd.read_csv vs. load_csv, largest savings first
+
+    Returns (report, typed DataFrame). The default read is measured chunk by
+    chunk, so it never has to fit in memory.
+    """
+    default = None
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize):
+        usage = chunk.memory_usage(deep=True, index=False)
+        default = usage if default is None else default + usage
+    default_dtypes = chunk.dtypes
+
+    df = load_csv(path, columns, chunksize)
+    report = pd.DataFrame({
+        'default_dtype': default_dtypes.astype(str),
+        'dtype': df.dtypes.astype(str),
+        'default_bytes': default,
+        'bytes': df.memory_usage(deep=True, index=False),
+    })
+    report['saved_bytes'] = report['default_bytes'] - report['bytes']
+    return report.sort_values('saved_bytes', ascending=False), df
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Memory saved by loading a mess CSV with the column schema")
+    parser.add_argument('csv', nargs='?', default='data/processed/mess_data_with_features.csv')
+    parser.add_argument('--top', type=int, default=15, help="columns to list")
+    args = parser.parse_args()
+
+    report, df = memory_report(args.csv)
+    total_default, total = report['default_bytes'].sum(), report['bytes'].sum()
+
+    print("\n" + "="*73)
+    print(f"🧮 MEMORY REPORT: {args.csv} ({len(df):,} rows, {os.path.getsize(args.csv) / 1e6:.1f} MB CSV)")
+    print("="*73)
+    print(f"{'Column':<28}{'Default':>9}{'Schema':>16}{'Default KB':>11}{'KB':>9}")
+    for col, row in report.head(args.top).iterrows():
+        print(f"{col:<28}{row['default_dtype']:>9}{row['dtype']:>16}"
+              f"{row['default_bytes'] / 1e3:>11.1f}{row['bytes'] / 1e3:>9.1f}")
+    print(f"\n✅ {total_default / len(df):,.0f} → {total / len(df):,.0f} bytes per row "
+          f"({total_default / total:.1f}x less memory, {(total_default - total) / 1e6:.2f} MB saved)")
@@ -0,0 +1,335 @@
+"""
+Prediction Service
+Asyncio HTTP API that coalesces concurrent requests into micro-batches
+"""
+
+import asyncio
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import predictor
+from drift_monitor import DriftMonitor, DriftReference, ingest_actuals, validate_actuals
+from feature_store import OnlineFeatureStore
+from generate_data import MenuScheduler
+from model_bundle import BUNDLE_DIR, load_bundle
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+HOST = '127.0.0.1'
+PORT = 8600
+MAX_BATCH_SIZE = 32
+MAX_WAIT_MS = 2.0
+HISTORY_FILE = 'data/raw/college_mess_data.csv'
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+# ============================================
+# MICRO-BATCHING
+# ============================================
+
+class MicroBatcher:
+    """Collects concurrent submissions into batches for one predict call
+
+    A batch is dispatched when it reaches max_batch_size or max_wait_ms
+    after its first row arrived, whichever comes first. Batches run one at
+    a time on a worker thread, so rows arriving meanwhile queue up for the
+    next batch instead of blocking the event loop.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.batches = 0
+        self.rows = 0
+
+    async def submit(self, row):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((row, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            rows = [row for row, _ in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self.predict_fn, rows)
+            except Exception as e:
+                results = [e] * len(batch)
+            self.batches += 1
+            self.rows += len(batch)
+
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+# ============================================
+# PREDICTION SERVICE
+# ============================================
+
+class PredictionService:
+    """Model bundle, feature store and batcher behind a small HTTP/1.1 API
+
+    POST /predict  {"date": "2024-11-01", "meal_type": "Lunch", ...}
+    POST /actuals  [{"date": ..., "meal_type": ..., "students_attended": ..., ...}, ...]
+    GET  /health   bundle version and batching counters
+    GET  /drift    drift summary and a DriftMonitor snapshot (for merging across workers)
+    """
+
+    def __init__(self, bundle_dir=BUNDLE_DIR, history_file=HISTORY_FILE,
+                 max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.bundle = load_bundle(bundle_dir)
+        self.engine = self.bundle.engine
+        self.params = predictor.mess_params(self.bundle.params)
+        self.feature_store = None
+        self.monitor = None
+        if history_file:
+            history = pd.read_csv(history_file, parse_dates=['date'])
+            self.feature_store = OnlineFeatureStore.from_history(history)
+            self.monitor = DriftMonitor(DriftReference.from_bundle(self.bundle, history))
+        self.weekly_menu = MenuScheduler().weekly_menu
+        self.batcher = MicroBatcher(self.predict_rows, max_batch_size, max_wait_ms)
+        self.requests = 0
+        self.errors = 0
+
+    def parse_row(self, payload):
+        """Validate one request body, filling defaults; raises ValueError"""
+        if not isinstance(payload, dict):
+            raise ValueError("Body must be a JSON object")
+        if payload.get('date') is None or 'meal_type' not in payload:
+            raise ValueError("'date' and 'meal_type' are required")
+        date = pd.to_datetime(payload['date'], errors='coerce') if isinstance(payload['date'], str) else pd.NaT
+        if pd.isna(date):
+            raise ValueError(f"Invalid date: {payload['date']!r} (use YYYY-MM-DD)")
+        row = {
+            'date': date,
+            'meal_type': payload['meal_type'],
+            'menu_item': payload.get('menu_item'),
+            'weather': payload.get('weather', 'Sunny'),
+            'temperature': payload.get('temperature', 28),
+        }
+        if (isinstance(row['temperature'], bool) or not isinstance(row['temperature'], (int, float))
+                or not math.isfinite(row['temperature'])):
+            raise ValueError(f"Invalid temperature: {row['temperature']!r} (use a finite number)")
+        row['temperature'] = float(row['temperature'])
+        for flag in ['is_exam', 'is_festival', 'is_start_sem']:
+            value = payload.get(flag, False)
+            if not isinstance(value, (bool, int)) or value not in (0, 1):
+                raise ValueError(f"Invalid {flag}: {value!r} (use true/false or 0/1)")
+            row[flag] = bool(value)
+        for key, encoder in [('meal_type', 'meal'), ('weather', 'weather')]:
+            if row[key] not in self.bundle.encoders[encoder].classes_:
+                raise ValueError(f"Unknown {key}: {row[key]!r}")
+        if row['menu_item'] is None:
+            row['menu_item'] = self.weekly_menu[date.day_name()][row['meal_type']]
+        elif row['menu_item'] not in self.params['menu_items'].get(row['meal_type'], ()):
+            raise ValueError(f"Unknown {row['meal_type']} menu_item: {row['menu_item']!r}")
+        return row
+
+    def predict_rows(self, rows):
+        """Predictions for a batch; a row that fails gets its exception, not the whole batch"""
+        try:
+            return self._predict_batch(rows)
+        except Exception:
+            if len(rows) == 1:
+                raise
+        results = []
+        for row in rows:
+            try:
+                results.extend(self._predict_batch([row]))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _predict_batch(self, rows):
+        """One feature build and one engine call for a whole batch"""
+        dates = pd.DatetimeIndex([row['date'] for row in rows])
+        meal_types = [row['meal_type'] for row in rows]
+        history = None
+        if self.feature_store is not None:
+            history = self.feature_store.lookup_batch(meal_types, dates.day_name())
+
+        features = predictor.prepare_features_batch(
+            dates, meal_types, [row['menu_item'] for row in rows],
+            [row['weather'] for row in rows], [row['temperature'] for row in rows],
+            [row['is_exam'] for row in rows], [row['is_festival'] for row in rows],
+            [row['is_start_sem'] for row in rows],
+            self.bundle.encoders, self.bundle.feature_names, history=history, params=self.params
+        )
+        predictions = predictor.predict_batch(self.engine, None, features, self.params['total_capacity'])
+        food_kg, cost = predictor.food_and_cost(predictions, self.params)
+        results = [{
+            'date': row['date'].strftime('%Y-%m-%d'),
+            'meal_type': row['meal_type'],
+            'menu_item': row['menu_item'],
+            'predicted_students': int(p),
+            'food_kg': round(float(f), 2),
+            'cost_rs': round(float(c), 2),
+            'bundle_version': self.bundle.version,
+        } for row, p, f, c in zip(rows, predictions, food_kg, cost)]
+
+        # Only once the batch succeeded, so a retried row is not observed twice
+        if self.monitor is not None:
+            self.monitor.observe(features)
+        return results
+
+    def ingest_actuals(self, payload):
+        """Score a day's actual rows (raw generator columns) for drift, then add them to the feature store"""
+        if self.monitor is None:
+            raise ValueError("Service was started without history; actuals are not tracked")
+        rows = payload if isinstance(payload, list) else [payload]
+        if not all(isinstance(row, dict) for row in rows):
+            raise ValueError("Actuals must be a JSON object or a list of objects")
+        # Checked in full before the store or monitor changes, so a rejected payload can be retried
+        rows = validate_actuals(pd.DataFrame(rows), self.bundle.encoders)
+        if rows['date'].min() <= self.feature_store.last_date:
+            raise ValueError(f"Actuals through {self.feature_store.last_date.date()} were already ingested")
+        predictions = ingest_actuals(self.monitor, rows, self.engine, self.bundle.encoders,
+                                     self.bundle.feature_names, self.feature_store, self.params)
+        return {'ingested': len(rows), 'last_date': str(self.feature_store.last_date.date()),
+                'predicted_students': predictions.tolist()}
+
+    def health(self):
+        return {
+            'status': 'ok',
+            'bundle_version': self.bundle.version,
+            'requests': self.requests,
+            'errors': self.errors,
+            'batches': self.batcher.batches,
+            'mean_batch_size': self.batcher.rows / self.batcher.batches if self.batcher.batches else 0.0,
+        }
+
+    async def route(self, method, path, body):
+        if path == '/health':
+            return (200, self.health()) if method == 'GET' else (405, {'error': 'Use GET'})
+        if path == '/drift':
+            if method != 'GET':
+                return 405, {'error': 'Use GET'}
+            if self.monitor is None:
+                return 404, {'error': 'Drift monitoring needs --history'}
+            return 200, {**self.monitor.summary(), 'snapshot': self.monitor.snapshot()}
+        if path == '/actuals':
+            if method != 'POST':
+                return 405, {'error': 'Use POST'}
+            # On the batcher's single worker: the feature store and monitor are never used by
+            # ingestion and a predict batch at once, and the event loop keeps serving
+            loop = asyncio.get_running_loop()
+            try:
+                payload = json.loads(body or b'null')
+                return 200, await loop.run_in_executor(self.batcher.executor, self.ingest_actuals, payload)
+            except (ValueError, TypeError, KeyError) as e:
+                return 400, {'error': str(e)}
+        if path != '/predict':
+            return 404, {'error': f'No route {path}'}
+        if method != 'POST':
+            return 405, {'error': 'Use POST'}
+
+        self.requests += 1
+        try:
+            row = self.parse_row(json.loads(body or b'null'))
+        except (ValueError, TypeError, KeyError) as e:
+            self.errors += 1
+            return 400, {'error': str(e)}
+        try:
+            return 200, await self.batcher.submit(row)
+        except Exception as e:
+            self.errors += 1
+            return 500, {'error': str(e)}
+
+    async def handle_connection(self, reader, writer):
+        """Serve keep-alive HTTP/1.1 requests on one connection"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                status, payload = await self.route(method, path, body)
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f'HTTP/1.1 {status} {REASONS[status]}\r\n'
+                    f'Content-Type: application/json\r\n'
+                    f'Content-Length: {len(data)}\r\n\r\n'.encode('latin-1') + data
+                )
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close' or version == 'HTTP/1.0':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=HOST, port=PORT):
+        batch_task = asyncio.create_task(self.batcher.run())
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"✅ Serving bundle {self.bundle.version} on http://{host}:{port} "
+              f"(max batch {self.batcher.max_batch_size}, max wait {self.batcher.max_wait * 1000:g} ms)",
+              flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batch_task.cancel()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the attendance prediction service")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--max-batch-size', type=int, default=MAX_BATCH_SIZE,
+                        help="Most requests coalesced into one predict call")
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT_MS,
+                        help="Longest a request waits for its batch to fill")
+    parser.add_argument('--bundle-dir', default=BUNDLE_DIR)
+    parser.add_argument('--history', default=HISTORY_FILE,
+                        help="Raw attendance CSV for lag features ('' to use approximations)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    service = PredictionService(args.bundle_dir, args.history, args.max_batch_size, args.max_wait_ms)
+    print(f"⏱️  Startup: {time.perf_counter() - start:.2f}s")
+    asyncio.run(service.serve(args.host, args.port))
@@ -0,0 +1,171 @@
+"""
+Tree Engine
+Flat-array evaluator for the GradientBoostingRegressor, with the scaler folded into the thresholds
+"""
+
+import numpy as np
+
+# ============================================
+# SCALER FOLDING
+# ============================================
+
+_SIGN_BIT = np.int64(-2**63)
+_MAGNITUDE = np.int64(2**63 - 1)
+
+
+def _order_key(x):
+    """float64 -> int64 with the same ordering (-0.0 and 0.0 share a key)"""
+    bits = np.asarray(x, dtype=np.float64).view(np.int64)
+    return np.where(bits >= 0, bits, -(bits & _MAGNITUDE))
+
+
+def _from_order_key(key):
+    bits = np.where(key >= 0, key, (-key) | _SIGN_BIT)
+    return bits.view(np.float64)
+
+
+def fold_thresholds(threshold, mean, scale):
+    """Raw-feature thresholds equivalent to sklearn's split on scaled features
+
+    sklearn routes a row left when float32((x - mean) / scale) <= t. That
+    map is monotone in x, so the left branch is exactly x <= T for the
+    largest float64 T still going left; T is found by bisecting on the
+    bit patterns of float64, which makes folded routing bit-identical.
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    mean = np.asarray(mean, dtype=np.float64)
+    scale = np.asarray(scale, dtype=np.float64)
+
+    def goes_left(key):
+        x = _from_order_key(key)
+        with np.errstate(over='ignore'):
+            return ((x - mean) / scale).astype(np.float32) <= threshold
+
+    max_double = np.finfo(np.float64).max
+    lo = np.full(threshold.shape, _order_key(-max_double))   # always left
+    hi = np.full(threshold.shape, _order_key(max_double))    # always right
+    while np.any(lo + 1 < hi):
+        mid = (lo & hi) + ((lo ^ hi) >> 1)   # overflow-free floor average
+        left = goes_left(mid)
+        lo = np.where(left, mid, lo)
+        hi = np.where(left, hi, mid)
+    return _from_order_key(lo)
+
+# ============================================
+# FLAT TREE ENSEMBLE
+# ============================================
+
+class TreeEnsemble:
+    """A fitted GradientBoostingRegressor as contiguous node arrays
+
+    All trees share one set of node arrays (feature, threshold, left,
+    right, value); leaves point to themselves with an infinite threshold,
+    so every row walks exactly `depth` steps through every tree at once.
+    Leaf values are pre-multiplied by the learning rate and summed in tree
+    order, matching sklearn's predict bit for bit.
+    """
+
+    ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'roots')
+
+    def __init__(self, feature, threshold, left, right, value, roots, init, depth,
+                 n_features, feature_names=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.init = float(init)
+        self.depth = int(depth)
+        self.n_features = int(n_features)
+        self.feature_names = None if feature_names is None else [str(f) for f in feature_names]
+
+    @classmethod
+    def from_model(cls, model, scaler=None):
+        """Export a fitted single-output GradientBoostingRegressor
+
+        With a StandardScaler-like `scaler` (mean_, scale_), its transform
+        is folded into the thresholds and the engine takes raw features.
+        """
+        if model.estimators_.shape[1] != 1:
+            raise ValueError("Only single-output regressors are supported")
+        if model.init_ == 'zero':
+            init = 0.0
+        else:
+            init = float(model.init_.predict(np.zeros((1, model.n_features_in_)))[0])
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset, depth = 0, 0
+        for estimator in model.estimators_[:, 0]:
+            tree = estimator.tree_
+            index = np.arange(tree.node_count) + offset
+            is_leaf = tree.children_left < 0
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, index, tree.children_left + offset))
+            rights.append(np.where(is_leaf, index, tree.children_right + offset))
+            values.append(model.learning_rate * tree.value[:, 0, 0])
+            roots.append(offset)
+            offset += tree.node_count
+            depth = max(depth, tree.max_depth)
+
+        feature = np.concatenate(features).astype(np.intp)
+        threshold = np.concatenate(thresholds)
+        if scaler is not None:
+            split = np.isfinite(threshold)
+            threshold[split] = fold_thresholds(threshold[split], scaler.mean_[feature[split]],
+                                               scaler.scale_[feature[split]])
+
+        feature_names = getattr(scaler, 'feature_names_in_', getattr(model, 'feature_names_in_', None))
+        return cls(feature, threshold, np.concatenate(lefts).astype(np.intp),
+                   np.concatenate(rights).astype(np.intp), np.concatenate(values),
+                   np.asarray(roots, dtype=np.intp), init, depth, model.n_features_in_,
+                   feature_names)
+
+    def _check(self, X):
+        if self.feature_names is not None and hasattr(X, 'columns'):
+            if list(X.columns) != self.feature_names:
+                raise ValueError("Feature names/order differ from those seen at fit time")
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[1]} features, expected {self.n_features}")
+        return X
+
+    def apply(self, X):
+        """Leaf index reached in every tree, shape (n_rows, n_trees)"""
+        X = self._check(X)
+        flat = X.ravel()
+        row_start = (np.arange(len(X)) * X.shape[1])[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.depth):
+            go_left = flat.take(row_start + self.feature.take(node)) <= self.threshold.take(node)
+            node = np.where(go_left, self.left.take(node), self.right.take(node))
+        return node
+
+    def predict(self, X):
+        """Raw-space predictions for one row (1-D) or a batch (2-D / DataFrame)
+
+        Built for serving-sized batches: it beats sklearn's Cython predict
+        up to a few hundred rows and falls behind it on large batches.
+        """
+        leaf_values = self.value.take(self.apply(X))
+        stages = np.empty((len(leaf_values), leaf_values.shape[1] + 1))
+        stages[:, 0] = self.init
+        stages[:, 1:] = leaf_values
+        # Sequential sum in tree order, as sklearn's predict_stages
+        return np.add.accumulate(stages, axis=1)[:, -1]
+
+    def save(self, path):
+        np.savez(path, **{name: getattr(self, name) for name in self.ARRAYS},
+                 meta=np.array([self.init, self.depth, self.n_features]),
+                 feature_names=np.array(self.feature_names or [], dtype=str))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            init, depth, n_features = data['meta']
+            feature_names = data['feature_names'].tolist() or None
+            return cls(*(data[name] for name in cls.ARRAYS), init, depth, n_features, feature_names)
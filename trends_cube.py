@@ -0,0 +1,353 @@
+"""
+Trends Cube
+Pre-aggregated attendance, waste and cost by (campus, meal, menu item, day of week, month),
+updated incrementally as days are ingested
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from attendance_db import DEFAULT_CAMPUS
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+CUBE_FILE = 'data/trends_cube.parquet'
+METADATA_KEY = b'trends_cube'
+
+# One cell per key combination; year and month together give both trends and seasonality
+KEYS = ['campus_id', 'meal_type', 'menu_item', 'day_of_week', 'year', 'month']
+# Coarser rollups kept alongside the full cells, one per dashboard dimension; a query reads the
+# first (smallest) one holding every level it groups or filters by, else the full cells
+VIEWS = [
+    ['campus_id', 'meal_type'],
+    ['campus_id', 'day_of_week'],
+    ['campus_id', 'menu_item'],
+    ['campus_id', 'year', 'month'],
+    ['campus_id', 'meal_type', 'day_of_week', 'year', 'month'],
+]
+# Distinct days per (campus, day of week, month), for per-day totals such as daily waste cost
+DAY_KEYS = ['campus_id', 'day_of_week', 'year', 'month']
+
+MEASURES = ['students_attended', 'attendance_rate', 'food_wasted_kg', 'waste_percentage',
+            'total_cost_rs', 'waste_cost_rs']
+SUMS = ['rows'] + [f'{m}_{s}' for m in MEASURES for s in ('sum', 'sumsq')]
+MINS = [f'{m}_min' for m in MEASURES]
+MAXES = [f'{m}_max' for m in MEASURES]
+
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# ============================================
+# AGGREGATION
+# ============================================
+
+def _keyed(df):
+    """Raw rows with every key column (campus_id defaults to DEFAULT_CAMPUS)"""
+    dates = pd.to_datetime(df['date'])
+    return df.assign(
+        campus_id=df['campus_id'].astype(str) if 'campus_id' in df else DEFAULT_CAMPUS,
+        date=dates,
+        day_of_week=dates.dt.day_name(),
+        year=dates.dt.year,
+        month=dates.dt.month,
+    )
+
+
+def aggregate(df):
+    """(cells, days) of raw rows: one groupby pass for the cube, one for the day counts"""
+    return _aggregate(_keyed(df))
+
+
+def _aggregate(df):
+    values = df[MEASURES].to_numpy(float)
+    frame = pd.DataFrame(np.column_stack([np.ones(len(df)), np.repeat(values, 2, axis=1), values, values]),
+                         columns=SUMS + MINS + MAXES, index=df.index)
+    frame[SUMS[2::2]] **= 2   # the sumsq columns
+    cells = _combine_groups(frame.groupby([df[k] for k in KEYS], observed=True, sort=False))
+
+    day_rows = df[['date'] + DAY_KEYS].drop_duplicates()
+    days = day_rows.groupby(DAY_KEYS, observed=True, sort=False).size().to_frame('days')
+    return cells, days
+
+
+def _combine_groups(grouped):
+    return pd.concat([grouped[SUMS].sum(), grouped[MINS].min(), grouped[MAXES].max()], axis=1)
+
+
+def coarsen(cells, keys):
+    """Cells (indexed by KEYS) rolled up to a subset of their key levels"""
+    return _combine_groups(cells.groupby(level=keys, observed=True, sort=False))
+
+# ============================================
+# CELL STORE
+# ============================================
+
+class CellStore:
+    """Append-or-update table of aggregate cells over coded key levels
+
+    Each key level's labels get integer codes in order of first sight, and
+    a dict maps a cell's code tuple to its row. Adding aggregates touches
+    only the cells they cover (sums add, mins and maxes combine); queries
+    filter and group the code arrays with numpy, never the raw rows.
+    """
+
+    def __init__(self, keys, sums, mins=(), maxes=()):
+        self.keys = list(keys)
+        self.columns = (list(sums), list(mins), list(maxes))
+        self.labels = {k: [] for k in self.keys}      # level -> labels, by code
+        self.vocab = {k: {} for k in self.keys}       # level -> {label: code}
+        self.positions = {}                           # code tuple -> row
+        self.codes = np.empty((0, len(self.keys)), dtype=np.int64)
+        self.sums = np.empty((0, len(sums)))
+        self.mins = np.empty((0, len(mins)))
+        self.maxes = np.empty((0, len(maxes)))
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _encode(self, level, values):
+        vocab, labels = self.vocab[level], self.labels[level]
+        for label in pd.unique(values):
+            if label not in vocab:
+                vocab[label] = len(labels)
+                labels.append(label)
+        return pd.Index(labels).get_indexer(values)
+
+    def add(self, frame):
+        """Fold aggregates (indexed by every key level, one row per cell) into the store"""
+        codes = np.column_stack([self._encode(k, frame.index.get_level_values(k)) for k in self.keys])
+        n_old = len(self.positions)
+        rows = np.fromiter((self.positions.setdefault(key, len(self.positions)) for key in map(tuple, codes.tolist())),
+                           dtype=np.int64, count=len(codes))
+        n_new = len(self.positions) - n_old
+        if n_new:
+            new = rows >= n_old
+            self.codes = np.concatenate([self.codes, codes[new][np.argsort(rows[new])]])
+            self.sums = np.concatenate([self.sums, np.zeros((n_new, self.sums.shape[1]))])
+            self.mins = np.concatenate([self.mins, np.full((n_new, self.mins.shape[1]), np.inf)])
+            self.maxes = np.concatenate([self.maxes, np.full((n_new, self.maxes.shape[1]), -np.inf)])
+        sums, mins, maxes = self.columns
+        self.sums[rows] += frame[sums].to_numpy(float)
+        self.mins[rows] = np.fmin(self.mins[rows], frame[mins].to_numpy(float))
+        self.maxes[rows] = np.fmax(self.maxes[rows], frame[maxes].to_numpy(float))
+
+    def select(self, filters):
+        """Boolean mask of cells whose key levels match filters ({level: value or list}, None = all)"""
+        mask = np.ones(len(self), dtype=bool)
+        for level, value in filters.items():
+            if value is None or level not in self.vocab:
+                continue
+            wanted = [self.vocab[level][v] for v in np.atleast_1d(value) if v in self.vocab[level]]
+            mask &= np.isin(self.codes[:, self.keys.index(level)], wanted)
+        return mask
+
+    def group(self, by, mask):
+        """(index of groups, group number of each selected cell) for `by` levels"""
+        columns = [self.keys.index(level) for level in by]
+        sizes = [len(self.labels[level]) for level in by]
+        group_ids, inverse = np.unique(np.ravel_multi_index(tuple(self.codes[mask][:, columns].T), sizes),
+                                       return_inverse=True)
+        group_codes = np.unravel_index(group_ids, sizes)
+        arrays = [np.asarray(self.labels[level], dtype=object)[codes] for level, codes in zip(by, group_codes)]
+        index = pd.Index(arrays[0], name=by[0]) if len(by) == 1 else pd.MultiIndex.from_arrays(arrays, names=by)
+        return index, inverse
+
+    def reduce(self, by, mask):
+        """(index, sums, mins, maxes) of the selected cells per group of `by` levels"""
+        index, inverse = self.group(by, mask)
+        n_groups = len(index)
+        sums = np.column_stack([np.bincount(inverse, weights=column, minlength=n_groups)
+                                for column in self.sums[mask].T])
+        mins = np.full((n_groups, self.mins.shape[1]), np.inf)
+        np.fmin.at(mins, inverse, self.mins[mask])
+        maxes = np.full((n_groups, self.maxes.shape[1]), -np.inf)
+        np.fmax.at(maxes, inverse, self.maxes[mask])
+        return index, sums, mins, maxes
+
+    def to_frame(self):
+        levels = [np.asarray(self.labels[k], dtype=object)[self.codes[:, i]] for i, k in enumerate(self.keys)]
+        sums, mins, maxes = self.columns
+        return pd.DataFrame(np.column_stack([self.sums, self.mins, self.maxes]), columns=sums + mins + maxes,
+                            index=pd.MultiIndex.from_arrays(levels, names=self.keys))
+
+# ============================================
+# CUBE
+# ============================================
+
+class TrendsCube:
+    """Aggregate cells, coarser views of them and per-day counts; every dashboard number is a rollup
+
+    Each ingest aggregates the new rows once and folds them into the full
+    cells and every view, so all stay consistent. Ingestion is append-only
+    per campus, as in attendance_db: rows on or before a campus's last
+    ingested date raise ValueError. A query reads the smallest view that
+    covers it, a few cells per campus however many years they summarize.
+    """
+
+    def __init__(self, last_dates=None):
+        self.views = [CellStore(keys, SUMS, MINS, MAXES) for keys in VIEWS + [KEYS]]
+        self.cells = self.views[-1]
+        self.days = CellStore(DAY_KEYS, ['days'])
+        self.last_dates = dict(last_dates or {})   # campus_id -> 'YYYY-MM-DD'
+
+    @classmethod
+    def from_history(cls, df):
+        cube = cls()
+        cube.ingest(df)
+        return cube
+
+    def __len__(self):
+        return len(self.cells)
+
+    @property
+    def campuses(self):
+        return sorted(self.last_dates)
+
+    def ingest(self, df):
+        """Add raw rows (any number of days, one or more campuses) newer than each campus's last date"""
+        if df.empty:
+            return 0
+        keyed = _keyed(df)
+        span = keyed.groupby('campus_id', observed=True)['date'].agg(['min', 'max'])
+        for campus, first in span['min'].items():
+            last = self.last_dates.get(campus)
+            if last is not None and first <= pd.Timestamp(last):
+                raise ValueError(f"Rows on or before {last} were already ingested for campus {campus!r}")
+        cells, days = _aggregate(keyed)
+        self._add(cells)
+        self.days.add(days)
+        for campus, last in span['max'].items():
+            self.last_dates[campus] = last.strftime('%Y-%m-%d')
+        return len(df)
+
+    def _add(self, cells):
+        for view in self.views[:-1]:
+            view.add(coarsen(cells, view.keys))
+        self.cells.add(cells)
+
+    # ---------- queries ----------
+
+    def view(self, levels):
+        """Smallest store holding every key level in `levels`"""
+        return next(view for view in self.views if set(levels) <= set(view.keys))
+
+    @staticmethod
+    def _ordered(result, by):
+        if by == ['day_of_week']:
+            return result.reindex([d for d in DAY_ORDER if d in result.index])
+        return result.sort_index()
+
+    def rollup(self, by, **filters):
+        """Mean, std, min, max and total of every measure per `by` key level(s), over matching cells
+
+        `filters` select key levels, e.g. campus_id='main' or meal_type=['Lunch', 'Dinner'].
+        Columns are '<measure>_<mean|std|min|max|sum>', plus 'rows'.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        view = self.view(by + [level for level, value in filters.items() if value is not None])
+        index, totals, mins, maxes = view.reduce(by, view.select(filters))
+        rows = totals[:, :1]
+        sums, sumsqs = totals[:, 1::2], totals[:, 2::2]
+        means = sums / rows
+        # Sample std (ddof=1, as pandas) from the sums; NaN for single-row groups
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stds = np.where(rows > 1, np.sqrt(np.maximum((sumsqs - rows * means ** 2) / (rows - 1), 0)), np.nan)
+        stats = {'mean': means, 'std': stds, 'min': mins, 'max': maxes, 'sum': sums}
+        out = {'rows': rows[:, 0]}
+        for j, m in enumerate(MEASURES):
+            for stat, values in stats.items():
+                out[f'{m}_{stat}'] = values[:, j]
+        return self._ordered(pd.DataFrame(out, index=index), by)
+
+    def per_day(self, measure, by=(), **filters):
+        """Average daily total of a measure (e.g. waste_cost_rs) per `by` level(s) of DAY_KEYS
+
+        Meal and menu filters narrow the total, not the days it is spread over.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        column = SUMS.index(f'{measure}_sum')
+        view = self.view(by + [level for level, value in filters.items() if value is not None])
+        cells_mask, days_mask = view.select(filters), self.days.select(filters)
+        if not by:
+            n_days = self.days.sums[days_mask, 0].sum()
+            return view.sums[cells_mask, column].sum() / n_days if n_days else np.nan
+        index, totals, _, _ = view.reduce(by, cells_mask)
+        day_index, days, _, _ = self.days.reduce(by, days_mask)
+        result = pd.Series(totals[:, column], index=index) / pd.Series(days[:, 0], index=day_index)
+        return self._ordered(result, by)
+
+    # ---------- persistence ----------
+
+    def save(self, path=CUBE_FILE):
+        """Write the cells atomically as Parquet, with day counts and last dates in the footer"""
+        arrow = pa.Table.from_pandas(self.cells.to_frame().reset_index(), preserve_index=False)
+        metadata = {
+            'last_dates': self.last_dates,
+            'days': self.days.to_frame().reset_index().to_numpy().tolist(),
+        }
+        arrow = arrow.replace_schema_metadata({**(arrow.schema.metadata or {}),
+                                               METADATA_KEY: json.dumps(metadata).encode()})
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        pq.write_table(arrow, tmp_path, compression='zstd')
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path=CUBE_FILE):
+        arrow = pq.read_table(path)
+        metadata = json.loads(arrow.schema.metadata[METADATA_KEY])
+        cube = cls(metadata['last_dates'])
+        cube._add(arrow.to_pandas().set_index(KEYS))
+        cube.days.add(pd.DataFrame(metadata['days'], columns=DAY_KEYS + ['days']).set_index(DAY_KEYS))
+        return cube
+
+
+def cube_version(path=CUBE_FILE):
+    """Modification time of the cube file (None if absent), for cache keys"""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from model_registry import HISTORY_DIR, history_file
+
+    parser = argparse.ArgumentParser(description="Build the trends cube from mess histories, or ingest new days")
+    parser.add_argument('--ingest', default=None, help="raw CSV of days after the cube's last date")
+    parser.add_argument('--campus', default=DEFAULT_CAMPUS,
+                        help="campus id of --ingest rows without a campus_id column")
+    parser.add_argument('--output', default=CUBE_FILE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.ingest:
+        cube = TrendsCube.load(args.output) if os.path.exists(args.output) else TrendsCube()
+        df = pd.read_csv(args.ingest)
+        if 'campus_id' not in df:
+            df['campus_id'] = args.campus
+        n_rows = cube.ingest(df)
+    else:
+        # Every mess history: the original campus plus data/messes/<mess_id>.csv
+        campuses = [DEFAULT_CAMPUS]
+        if os.path.isdir(HISTORY_DIR):
+            campuses += sorted(os.path.splitext(name)[0] for name in os.listdir(HISTORY_DIR) if name.endswith('.csv'))
+        cube = TrendsCube()
+        n_rows = sum(cube.ingest(pd.read_csv(history_file(campus)).assign(campus_id=campus)) for campus in campuses)
+    cube.save(args.output)
+
+    print(f"✅ Trends cube: {n_rows:,} rows → {len(cube):,} cells for {len(cube.campuses)} campus(es) "
+          f"in {time.perf_counter() - start:.2f}s → {args.output} ({os.path.getsize(args.output) / 1e3:.1f} KB)")
+    for campus in cube.campuses:
+        print(f"   {campus}: data through {cube.last_dates[campus]}")
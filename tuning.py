@@ -0,0 +1,374 @@
+"""
+Hyperparameter Tuning
+Successive halving over rolling-origin folds, with staged-prediction early stopping and a process pool
+"""
+
+import hashlib
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+CACHE_DIR = 'models/tuning_cache'
+N_SPLITS = 5
+FACTOR = 3
+MIN_FOLDS = 2                 # folds in the first rung; one fold alone is too noisy a cut
+
+# Notebook 03 grids. n_estimators is not a grid axis: each trial fits the
+# largest count once and scores every smaller count from staged predictions.
+MAX_ESTIMATORS = 300
+PATIENCE = 50                 # stop a boosting trial after this many trees without improvement
+PARAM_GRIDS = {
+    'Gradient Boosting': {
+        'learning_rate': [0.01, 0.05, 0.1],
+        'max_depth': [3, 5, 7],
+        'subsample': [0.8, 0.9, 1.0],
+        'min_samples_split': [2, 5, 10],
+    },
+    'Random Forest': {
+        'max_depth': [10, 20, 30, None],
+        'min_samples_split': [2, 5, 10],
+        'min_samples_leaf': [1, 2, 4],
+        'max_features': ['sqrt', 'log2'],
+    },
+    'XGBoost': {
+        'learning_rate': [0.01, 0.05, 0.1],
+        'max_depth': [3, 5, 7],
+        'subsample': [0.8, 0.9, 1.0],
+        'colsample_bytree': [0.8, 0.9, 1.0],
+        'min_child_weight': [1, 3, 5],
+    },
+    'Decision Tree': {
+        'max_depth': [5, 10, 15, 20, None],
+        'min_samples_split': [2, 5, 10, 20],
+        'min_samples_leaf': [1, 2, 4, 8],
+        'max_features': ['sqrt', 'log2', None],
+    },
+}
+
+# ============================================
+# TIME-SERIES SPLITS
+# ============================================
+
+def rolling_origin_splits(n_samples, n_splits=N_SPLITS, test_size=None, dates=None):
+    """Expanding-window (train_idx, val_idx) pairs over time-ordered rows, oldest first
+
+    Each fold validates on the block right after its training window, so
+    no fold trains on the future. With `dates` (sorted), fold boundaries
+    move back to the first row of their day, keeping a day's meals
+    together.
+    """
+    test_size = test_size or n_samples // (n_splits + 1)
+    if test_size * n_splits >= n_samples:
+        raise ValueError(f"{n_splits} folds of {test_size} rows need more than {n_samples} rows")
+
+    dates = None if dates is None else np.asarray(dates)
+    bounds = [n_samples - (n_splits - i) * test_size for i in range(n_splits + 1)]
+    if dates is not None:
+        bounds = [b if b == n_samples else int(np.searchsorted(dates, dates[b], side='left'))
+                  for b in bounds]
+
+    indices = np.arange(n_samples)
+    return [(indices[:start], indices[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
+
+# ============================================
+# FOLD MATRIX CACHE
+# ============================================
+
+class FoldMatrices:
+    """Scaled train/validation arrays of every fold, built once and memory-mapped
+
+    Each fold's StandardScaler is fit on its own training rows, as in
+    notebook 03. Arrays are stored as float32, the dtype sklearn trees
+    and XGBoost convert to anyway, so trials load them without a copy.
+    Directories are keyed by a hash of the data and splits: rebuilding
+    for the same inputs reuses them.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'folds.json')) as f:
+            self.info = json.load(f)
+        self.n_folds = self.info['n_folds']
+        self._loaded = {}
+
+    @staticmethod
+    def key(X, y, splits):
+        digest = hashlib.sha256()
+        digest.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+        digest.update(np.ascontiguousarray(y, dtype=np.float64).tobytes())
+        for train_idx, val_idx in splits:
+            digest.update(np.asarray([train_idx[0], train_idx[-1], val_idx[0], val_idx[-1]]).tobytes())
+        return digest.hexdigest()[:16]
+
+    @classmethod
+    def build(cls, X, y, splits, cache_dir=CACHE_DIR):
+        from sklearn.preprocessing import StandardScaler
+
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        directory = os.path.join(cache_dir, cls.key(X, y, splits))
+        if os.path.exists(os.path.join(directory, 'folds.json')):
+            return cls(directory)
+
+        os.makedirs(directory, exist_ok=True)
+        for i, (train_idx, val_idx) in enumerate(splits):
+            scaler = StandardScaler().fit(X[train_idx])
+            np.save(os.path.join(directory, f'fold{i}_X_train.npy'),
+                    scaler.transform(X[train_idx]).astype(np.float32))
+            np.save(os.path.join(directory, f'fold{i}_X_val.npy'),
+                    scaler.transform(X[val_idx]).astype(np.float32))
+            np.save(os.path.join(directory, f'fold{i}_y_train.npy'), y[train_idx])
+            np.save(os.path.join(directory, f'fold{i}_y_val.npy'), y[val_idx])
+
+        # Written last: its presence marks a complete directory
+        with open(os.path.join(directory, 'folds.json'), 'w') as f:
+            json.dump({'n_folds': len(splits),
+                       'train_sizes': [len(t) for t, _ in splits],
+                       'val_sizes': [len(v) for _, v in splits]}, f)
+        return cls(directory)
+
+    def fold(self, i):
+        """(X_train, y_train, X_val, y_val) for fold i"""
+        if i not in self._loaded:
+            self._loaded[i] = tuple(
+                np.load(os.path.join(self.directory, f'fold{i}_{name}.npy'), mmap_mode='r')
+                for name in ('X_train', 'y_train', 'X_val', 'y_val')
+            )
+        return self._loaded[i]
+
+# ============================================
+# TRIALS
+# ============================================
+
+def make_estimator(name, params, n_estimators=MAX_ESTIMATORS, random_state=42):
+    """Unfitted model `name` with `params`; n_estimators is ignored by single trees"""
+    if name == 'Gradient Boosting':
+        from sklearn.ensemble import GradientBoostingRegressor
+        return GradientBoostingRegressor(n_estimators=n_estimators, random_state=random_state, **params)
+    if name == 'Random Forest':
+        from sklearn.ensemble import RandomForestRegressor
+        return RandomForestRegressor(n_estimators=n_estimators, random_state=random_state, **params)
+    if name == 'XGBoost':
+        from xgboost import XGBRegressor
+        return XGBRegressor(n_estimators=n_estimators, random_state=random_state, **params)
+    if name == 'Decision Tree':
+        from sklearn.tree import DecisionTreeRegressor
+        return DecisionTreeRegressor(random_state=random_state, **params)
+    raise ValueError(f"No tuning support for {name!r}; choose from {list(PARAM_GRIDS)}")
+
+
+class _EarlyStopping:
+    """GradientBoosting fit monitor: tracks validation RMSE per stage, stops after `patience` flat stages"""
+
+    def __init__(self, X_val, y_val, patience=PATIENCE):
+        self.X_val = X_val
+        self.y_val = np.asarray(y_val)
+        self.patience = patience
+        self.raw = None
+        self.rmse = []
+
+    def __call__(self, i, model, _locals):
+        if self.raw is None:
+            self.raw = model.init_.predict(self.X_val).astype(np.float64)
+        self.raw += model.learning_rate * model.estimators_[i, 0].predict(self.X_val)
+        self.rmse.append(np.sqrt(np.mean((self.raw - self.y_val) ** 2)))
+        return i - int(np.argmin(self.rmse)) >= self.patience
+
+
+def staged_rmse(name, params, X_train, y_train, X_val, y_val, n_estimators=MAX_ESTIMATORS,
+                patience=PATIENCE):
+    """Validation RMSE after each of 1..n_estimators trees, from one fit
+
+    Boosting trials stop once `patience` trees pass without a new best;
+    the stopped stages repeat the last score, so curves from different
+    folds still line up.
+    """
+    model = make_estimator(name, params, n_estimators)
+    if name == 'XGBoost':
+        model.set_params(eval_metric='rmse', early_stopping_rounds=patience)
+        model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+        curve = np.asarray(model.evals_result()['validation_0']['rmse'])
+    elif name == 'Gradient Boosting':
+        monitor = _EarlyStopping(X_val, y_val, patience)
+        model.fit(X_train, y_train, monitor=monitor)
+        curve = np.asarray(monitor.rmse)
+    elif name == 'Random Forest':
+        # The forest's prediction with k trees is the mean of the first k
+        model.fit(X_train, y_train)
+        per_tree = np.array([tree.predict(X_val) for tree in model.estimators_])
+        staged = np.cumsum(per_tree, axis=0) / np.arange(1, len(per_tree) + 1)[:, None]
+        curve = np.sqrt(np.mean((staged - np.asarray(y_val)) ** 2, axis=1))
+    else:
+        model.fit(X_train, y_train)
+        return np.sqrt(np.mean((model.predict(X_val) - np.asarray(y_val)) ** 2))[None]
+    return np.pad(curve, (0, n_estimators - len(curve)), mode='edge')
+
+
+_FOLDS = None
+
+
+def _init_worker(directory):
+    global _FOLDS
+    _FOLDS = FoldMatrices(directory)
+
+
+def _run_trial(task):
+    name, params, fold, n_estimators, patience = task
+    return staged_rmse(name, params, *_FOLDS.fold(fold), n_estimators=n_estimators, patience=patience)
+
+# ============================================
+# SUCCESSIVE HALVING
+# ============================================
+
+def param_candidates(grid, n_candidates=None, seed=42):
+    """Every combination of `grid`, or a random sample of n_candidates of them"""
+    keys = list(grid)
+    candidates = [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+    if n_candidates is not None and n_candidates < len(candidates):
+        rng = np.random.default_rng(seed)
+        candidates = [candidates[i] for i in sorted(rng.choice(len(candidates), n_candidates, replace=False))]
+    return candidates
+
+
+def successive_halving(folds, name, candidates, factor=FACTOR, n_estimators=MAX_ESTIMATORS,
+                       patience=PATIENCE, min_folds=MIN_FOLDS, n_jobs=None, verbose=True):
+    """Score candidates on a growing number of folds, keeping the best 1/factor each rung
+
+    Rungs add folds from the most recent backwards, so the first cut is
+    made on the folds closest to deployment. Scores already computed are
+    reused as a candidate moves up, so each (candidate, fold) pair is
+    fitted at most once. A candidate's score is the minimum over tree
+    counts of its fold-averaged staged RMSE; that count is its
+    early-stopped n_estimators.
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    order = list(reversed(range(folds.n_folds)))
+    curves = {}
+    alive = list(range(len(candidates)))
+    n_used = min(min_folds, folds.n_folds)
+    rungs = []
+
+    pool = None
+    if n_jobs > 1:
+        pool = ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                   initargs=(folds.directory,))
+    else:
+        _init_worker(folds.directory)
+
+    try:
+        while True:
+            start = time.perf_counter()
+            tasks = [(c, f) for c in alive for f in order[:n_used] if (c, f) not in curves]
+            jobs = [(name, candidates[c], f, n_estimators, patience) for c, f in tasks]
+            results = (pool.map(_run_trial, jobs, chunksize=max(1, len(jobs) // (4 * n_jobs)))
+                       if pool else map(_run_trial, jobs))
+            for task, curve in zip(tasks, results):
+                curves[task] = curve
+
+            scores = {}
+            for c in alive:
+                mean_curve = np.mean([curves[(c, f)] for f in order[:n_used]], axis=0)
+                best = int(np.argmin(mean_curve))
+                scores[c] = (float(mean_curve[best]), best + 1)
+            alive.sort(key=lambda c: scores[c][0])
+
+            rungs.append({
+                'rung': len(rungs),
+                'candidates': len(alive),
+                'folds': n_used,
+                'fits': len(tasks),
+                'best_rmse': scores[alive[0]][0],
+                'seconds': time.perf_counter() - start,
+            })
+            if verbose:
+                r = rungs[-1]
+                print(f"   Rung {r['rung']}: {r['candidates']:>4} candidates x {r['folds']} folds, "
+                      f"{r['fits']:>4} fits in {r['seconds']:.1f}s, best CV RMSE {r['best_rmse']:.2f}",
+                      flush=True)
+
+            if n_used == folds.n_folds or len(alive) == 1:
+                break
+            alive = alive[:max(1, math.ceil(len(alive) / factor))]
+            n_used = min(folds.n_folds, n_used * factor)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    leaderboard = pd.DataFrame([
+        {**candidates[c], 'n_estimators': scores[c][1], 'cv_rmse': scores[c][0]} for c in alive
+    ])
+    best = alive[0]
+    return {
+        'model_name': name,
+        'best_params': {**candidates[best], 'n_estimators': scores[best][1]}
+        if name != 'Decision Tree' else dict(candidates[best]),
+        'best_cv_rmse': scores[best][0],
+        'rungs': rungs,
+        'fits': len(curves),
+        'leaderboard': leaderboard,
+    }
+
+
+def tune(X, y, name='Gradient Boosting', dates=None, n_splits=N_SPLITS, factor=FACTOR,
+         n_candidates=None, n_estimators=MAX_ESTIMATORS, patience=PATIENCE, min_folds=MIN_FOLDS,
+         n_jobs=None, cache_dir=CACHE_DIR, verbose=True):
+    """Search PARAM_GRIDS[name] on time-ordered X, y; returns successive_halving's result"""
+    splits = rolling_origin_splits(len(X), n_splits, dates=dates)
+    folds = FoldMatrices.build(X, y, splits, cache_dir)
+    candidates = param_candidates(PARAM_GRIDS[name], n_candidates)
+    if verbose:
+        print(f"🔍 {name}: {len(candidates)} candidates, {n_splits} rolling-origin folds "
+              f"(train {splits[0][0].size}-{splits[-1][0].size} rows), halving by {factor}")
+    start = time.perf_counter()
+    result = successive_halving(folds, name, candidates, factor, n_estimators, patience,
+                                min_folds, n_jobs=n_jobs, verbose=verbose)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from features import build_features
+    from model_bundle import load_bundle
+
+    parser = argparse.ArgumentParser(description="Tune a model on the training split with successive halving")
+    parser.add_argument('--model', default='Gradient Boosting', choices=list(PARAM_GRIDS))
+    parser.add_argument('--splits', type=int, default=N_SPLITS, help="Rolling-origin folds")
+    parser.add_argument('--factor', type=int, default=FACTOR, help="Keep 1/factor candidates per rung")
+    parser.add_argument('--candidates', type=int, default=None, help="Random sample of the grid (default: all)")
+    parser.add_argument('--min-folds', type=int, default=MIN_FOLDS, help="Folds scored in the first rung")
+    parser.add_argument('--patience', type=int, default=PATIENCE,
+                        help="Stop a boosting trial after this many trees without improvement")
+    parser.add_argument('--n-jobs', type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument('--input', default='data/raw/college_mess_data.csv')
+    args = parser.parse_args()
+
+    bundle = load_bundle()
+    df = build_features(pd.read_csv(args.input), encoders=bundle.encoders)
+    split = int(len(df) * 0.8)                     # notebook 03's train/test split
+    train = df.iloc[:split]
+
+    print("\n" + "="*60)
+    print("⚙️  HYPERPARAMETER TUNING")
+    print("="*60)
+    result = tune(train[bundle.feature_names], train['students_attended'], args.model,
+                  dates=train['date'], n_splits=args.splits, factor=args.factor,
+                  n_candidates=args.candidates, patience=args.patience,
+                  min_folds=args.min_folds, n_jobs=args.n_jobs)
+
+    print(f"\n✅ {result['fits']} fits in {result['seconds']:.1f}s")
+    print(f"🎯 Best parameters (CV RMSE {result['best_cv_rmse']:.2f}):")
+    for param, value in result['best_params'].items():
+        print(f"   • {param}: {value}")
+    print("\n" + result['leaderboard'].head(10).round(3).to_string(index=False))